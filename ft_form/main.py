@@ -934,7 +934,8 @@ class Test(Scene):
 
 
 if __name__ == "__main__":
-    runner = video_utils.ManimRunner(
+    # python ft_form/main.py --segments --checkpoint --retries 1 --wrapper hold
+    runner = video_utils.ManimRunner.from_command_line(
         scenes={
             # "Intro": [
             # "DataAndSubjectOfStudy": [
@@ -34,10 +34,11 @@ class England(MovingCameraScene):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self.timeline = presets.TimeLine(**configs.timeline_config)
-        self.timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        self.timeline.preload_for_scene(
-            target_time="Imperio Romano", scene=self  # pass the scene as parameter
+        self.timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="Imperio Romano",
+            scene=self,  # pass the scene as parameter
         )
 
         current_time = self.timeline.get_current_time()
@@ -130,10 +131,11 @@ class XVICentury(GraphScene):
         frame_height = self.camera.frame_height
         frame_width = self.camera.frame_width
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="1066", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="1066",
+            scene=self,  # pass the scene as parameter
         )
 
         self.play(timeline.next_time_scroll())
@@ -181,10 +183,11 @@ class Colombia1500(GraphScene):
         frame_height = self.camera.frame_height
         frame_width = self.camera.frame_width
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="Siglo XVI", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="Siglo XVI",
+            scene=self,  # pass the scene as parameter
         )
 
         # self.play(timeline.next_time_scroll())
@@ -231,10 +234,11 @@ class Colombia1800(GraphScene):
         frame_height = self.camera.frame_height
         frame_width = self.camera.frame_width
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="Siglo XVI", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="Siglo XVI",
+            scene=self,  # pass the scene as parameter
         )
 
         self.play(timeline.next_time_scroll())
@@ -312,10 +316,11 @@ class XXCentury(GraphScene):
         line_length = 40
         paragraph_width = frame_width / 2.2
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="1800", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="1800",
+            scene=self,  # pass the scene as parameter
         )
 
         self.play(timeline.next_time_scroll())
@@ -395,10 +400,11 @@ class Colombia1900(GraphScene):
         frame_height = self.camera.frame_height
         frame_width = self.camera.frame_width
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="Siglo XX", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="Siglo XX",
+            scene=self,  # pass the scene as parameter
         )
 
         # self.play(timeline.next_time_scroll())
@@ -480,10 +486,11 @@ class Colombia2000(GraphScene):
         line_length = 40
         paragraph_width = frame_width / 2.2
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="Siglo XX", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="Siglo XX",
+            scene=self,  # pass the scene as parameter
         )
 
         self.play(timeline.next_time_scroll())
@@ -559,10 +566,11 @@ class Colombia2020(GraphScene):
         line_length = 40
         paragraph_width = frame_width / 2.2
 
-        timeline = presets.TimeLine(**configs.timeline_config)
-        timeline.next_to(REFERENCE_POINT, DOWN, buff=0)
-        timeline.preload_for_scene(
-            target_time="2000", scene=self  # pass the scene as parameter
+        timeline = presets.TimeLine.prebuilt(
+            configs.timeline_config,
+            next_to=(REFERENCE_POINT, DOWN, 0),
+            target_time="2000",
+            scene=self,  # pass the scene as parameter
         )
 
         self.play(timeline.next_time_scroll())
@@ -38,7 +38,9 @@ timeline_config = {
         VIOLET,
         DARK_SKY_BLUE,
         SKY_BLUE
-    ]
+    ],
+    # times scroll with the dots without an updater each
+    "rigid_scroll": True
 }
 
 default_text_config = {
@@ -210,6 +210,8 @@ class FirstChapter(MovingCameraScene):
             "time_buff": 0.25,
             "time_scale": 0.4,
             "dot_colors": [PURPLE, LIGHT_PURPLE, VIOLET, DARK_SKY_BLUE, SKY_BLUE],
+            # times scroll with the dots without an updater each
+            "rigid_scroll": True,
         }
 
         self.points = {
@@ -239,8 +241,9 @@ class FirstChapter(MovingCameraScene):
 
         # time line
 
-        timeline = presets.TimeLine(**self.timeline_config)
-        timeline.next_to(self.points["reference"], DOWN, buff=0)
+        timeline = presets.TimeLine.prebuilt(
+            self.timeline_config, next_to=(self.points["reference"], DOWN, 0)
+        )
         timeline.times[0].shift(RIGHT * 0.08)
 
         header = Tex("Historia de la ", "Estadística", **self.main_title_config).scale(
@@ -386,10 +389,13 @@ class FirstChapter(MovingCameraScene):
 class AncientTime(FirstChapter):
     def __init__(self, start_time="Epoca antigua", *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.timeline = presets.TimeLine(**self.timeline_config)
-        self.timeline.next_to(self.points["reference"], DOWN, buff=0)
-
-        self.timeline.preload_for_scene(target_time=start_time, scene=self)
+        # built once for every chapter scene, then loaded from its pickle
+        self.timeline = presets.TimeLine.prebuilt(
+            self.timeline_config,
+            next_to=(self.points["reference"], DOWN, 0),
+            target_time=start_time,
+            scene=self,
+        )
 
         self.cur_time = self.timeline.get_current_time()
 
@@ -1297,7 +1303,10 @@ def coord(x: float, y: float) -> "ndarray":
 
 
 if __name__ == "__main__":
-    runner = video_utils.ManimRunner(
+    # the history scenes load full resolution photos, four of them at
+    # once don't fit in 8G, title cards fill the gaps:
+    #   python main.py --workers 4 --memory_budget 8G --checkpoint --retries 1 --wrapper hold
+    runner = video_utils.ManimRunner.from_command_line(
         scenes={
             # 'FirstChapterIntro': [
             #     '-ql',
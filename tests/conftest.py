@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the tests import the utils package from the repository folder
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
@@ -0,0 +1,55 @@
+from utils.ffmpeg_utils import parse_transition, plan_transitions
+
+
+CUT = ("cut", 0.0)
+CROSSFADE = ("crossfade", 0.5)
+
+
+def test_parse_transition():
+    assert parse_transition("crossfade") == CROSSFADE
+    assert parse_transition("fadeblack:1") == ("fadeblack", 1.0)
+
+
+def test_cuts_copy_every_video():
+    plan = plan_transitions(
+        ["a.mp4", "b.mp4"], [5.0, 3.0], [[0.0, 2.0, 4.0], [0.0, 2.0]], [CUT])
+
+    assert plan == [("copy", 0, 0.0, 5.0), ("copy", 1, 0.0, 3.0)]
+
+
+def test_transition_is_encoded_between_keyframes():
+    plan = plan_transitions(
+        ["a.mp4", "b.mp4"], [5.0, 5.0],
+        [[0.0, 2.0, 4.0], [0.0, 2.0, 4.0]], [CROSSFADE])
+
+    assert plan == [
+        ("copy", 0, 0.0, 4.0),
+        ("chunk", [("a.mp4", 4.0, 5.0), ("b.mp4", 0.0, 2.0)], [CROSSFADE]),
+        ("copy", 1, 2.0, 5.0),
+    ]
+
+
+def test_keyframe_at_the_transition_start_is_copied_up_to():
+    plan = plan_transitions(
+        ["a.mp4", "b.mp4"], [5.0, 5.0],
+        [[0.0, 4.5], [0.0, 0.5]], [CROSSFADE])
+
+    assert plan == [
+        ("copy", 0, 0.0, 4.5),
+        ("chunk", [("a.mp4", 4.5, 5.0), ("b.mp4", 0.0, 0.5)], [CROSSFADE]),
+        ("copy", 1, 0.5, 5.0),
+    ]
+
+
+def test_short_video_is_whole_inside_the_chunk():
+    plan = plan_transitions(
+        ["a.mp4", "b.mp4", "c.mp4"], [5.0, 1.0, 5.0],
+        [[0.0, 2.0, 4.0], [0.0], [0.0, 2.0, 4.0]], [CROSSFADE, CROSSFADE])
+
+    assert plan == [
+        ("copy", 0, 0.0, 4.0),
+        ("chunk",
+         [("a.mp4", 4.0, 5.0), ("b.mp4", 0.0, 1.0), ("c.mp4", 0.0, 2.0)],
+         [CROSSFADE, CROSSFADE]),
+        ("copy", 2, 2.0, 5.0),
+    ]
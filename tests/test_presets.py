@@ -0,0 +1,133 @@
+import shutil
+
+import numpy as np
+import pytest
+
+pytest.importorskip("manim")
+
+from manim import DOWN, RIGHT, UP, Scene, tempconfig
+
+from utils.presets import DatedTimeLine, TimeLine
+
+
+TIMES = ["3000 A.C.", "2000 A.C.", "1000 A.C.", "0", "1000"]
+
+DATES = [-3000, -1000, -500, 0, 1000, 1500, 2000]
+
+# the times of the timelines are compiled with LaTeX
+needs_latex = pytest.mark.skipif(shutil.which("latex") is None, reason="needs LaTeX")
+
+
+def render(scene_class, media_dir):
+    """
+    renders 'scene_class' without writing any file, small and slow
+    """
+    options = {
+        "dry_run": True,
+        "media_dir": str(media_dir),
+        "frame_rate": 5,
+        "pixel_width": 160,
+        "pixel_height": 90,
+    }
+    with tempconfig(options):
+        scene = scene_class()
+        scene.render()
+    return scene
+
+
+@needs_latex
+def test_entries_start_on_the_line():
+    timeline = TimeLine(TIMES, direction=RIGHT)
+    positions = timeline.get_positions()
+
+    for dot, time, position in zip(timeline.get_dots(), timeline.get_times(), positions):
+        assert np.allclose(dot.get_center(), position)
+        # next to the edge of the dot, like Mobject.next_to
+        expected = time.copy().next_to(dot, DOWN, buff=timeline.time_buff)
+        assert np.allclose(time.get_center(), expected.get_center())
+
+
+@needs_latex
+def test_next_to_lays_the_entries_out_again():
+    timeline = TimeLine(TIMES, direction=RIGHT)
+
+    timeline.next_to(UP * 2, DOWN, 0)
+    positions = timeline.get_positions()
+
+    assert np.allclose(positions[:, 1], timeline.get_line().get_center()[1])
+    for dot, time, position in zip(timeline.get_dots(), timeline.get_times(), positions):
+        assert np.allclose(dot.get_center(), position)
+        expected = time.copy().next_to(position, DOWN, buff=timeline.time_buff)
+        assert np.allclose(time.get_center(), expected.get_center())
+
+
+def test_format_date():
+    assert DatedTimeLine.format_date(-3000) == "3000 A.C."
+    assert DatedTimeLine.format_date(1492.0) == "1492"
+
+
+@needs_latex
+def test_dates_are_spaced_by_elapsed_time():
+    timeline = DatedTimeLine(DATES, direction=RIGHT)
+    x = timeline.get_positions()[:, 0]
+
+    assert [dot.get_x() for dot in timeline.get_dots()] == pytest.approx(x.tolist())
+    # 3000 of the 5000 years are before 0
+    assert (x[3] - x[0]) / (x[-1] - x[0]) == pytest.approx(0.6)
+
+
+@needs_latex
+def test_log_spacing_compresses_the_distant_past():
+    linear = DatedTimeLine(DATES, direction=RIGHT).get_positions()[:, 0]
+    log = DatedTimeLine(DATES, direction=RIGHT, spacing="log", log_unit=100).get_positions()[:, 0]
+
+    assert log[0] == pytest.approx(linear[0])
+    assert log[-1] == pytest.approx(linear[-1])
+    assert all(earlier < later for earlier, later in zip(log, log[1:]))
+    # the last gap takes more of the line, the first one less
+    assert log[-1] - log[-2] > linear[-1] - linear[-2]
+    assert log[1] - log[0] < linear[1] - linear[0]
+
+
+def test_unsorted_dates():
+    with pytest.raises(Exception):
+        DatedTimeLine([0, -1000], direction=RIGHT)
+
+
+@needs_latex
+def test_date_lookups():
+    timeline = DatedTimeLine(DATES, direction=RIGHT)
+
+    assert timeline.get_time_index(-2999) == 0
+    assert timeline.get_time_index(0) == 3
+    assert timeline.get_time_index(1499) == 4
+    assert timeline.get_time_index("1000") == 4
+    assert list(timeline.get_range(-1000, 0)) == [1, 2, 3]
+    assert list(timeline.get_range(2500, 3000)) == []
+    with pytest.raises(Exception):
+        timeline.get_time_index(-3001)
+
+
+@needs_latex
+@pytest.mark.parametrize("rigid_scroll", [False, True])
+def test_seek_scrolls_to_the_date(tmp_path, rigid_scroll):
+    class Seek(Scene):
+        def construct(self):
+            self.timeline = DatedTimeLine(
+                DATES, direction=RIGHT, spacing="log", log_unit=100,
+                rigid_scroll=rigid_scroll)
+            self.start = self.timeline.get_dot(0).get_center()
+            self.timeline.add_preloaded(self)
+            self.play(self.timeline.seek(0))
+
+    scene = render(Seek, tmp_path)
+    timeline = scene.timeline
+
+    assert timeline.index_reference == {"times": 4, "dots": 4}
+    # the date sought is where the first one was
+    assert np.allclose(timeline.get_dot(3).get_center(), scene.start)
+    for index in range(4):
+        assert timeline.get_time(index) in scene.mobjects
+        assert timeline.get_time(index).get_x() == pytest.approx(timeline.get_dot(index).get_x())
+    with pytest.raises(Exception):
+        timeline.seek(-500)
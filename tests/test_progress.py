@@ -0,0 +1,37 @@
+from utils.progress import ProgressWriter, read_last_event
+
+
+def render(path, durations, frame_rate=10):
+    writer = ProgressWriter(path, "Intro", frame_rate)
+    totals = []
+    scene_time = 0.0
+    for index, duration in enumerate(durations):
+        writer.start_animation(index, int(duration * frame_rate), scene_time)
+        totals.append(writer.total_frames)
+        scene_time += duration
+        writer.update(scene_time)
+    writer.finish()
+    return totals
+
+
+def test_first_render_counts_the_animations_started(tmp_path):
+    path = tmp_path / "Intro.jsonl"
+
+    totals = render(path, [1, 2, 0.5])
+
+    assert totals == [10, 30, 35]
+    assert read_last_event(path, "done")["frames"] == 35
+
+
+def test_total_of_the_last_render(tmp_path):
+    path = tmp_path / "Intro.jsonl"
+    render(path, [1, 2, 0.5])
+
+    assert render(path, [1, 2, 0.5]) == [35, 35, 35]
+
+
+def test_longer_scene_passes_the_last_total(tmp_path):
+    path = tmp_path / "Intro.jsonl"
+    render(path, [1, 2])
+
+    assert render(path, [1, 2, 3]) == [30, 30, 60]
@@ -0,0 +1,52 @@
+from utils.render_cache import RenderCache
+
+
+def write_scene(tmp_path):
+    file_path = tmp_path / "main.py"
+    file_path.write_text("from manim import *\n\nclass Intro(Scene):\n    pass\n")
+    return file_path
+
+
+def render(tmp_path, cache, file_path, args, quality_folder):
+    video_path = tmp_path / quality_folder / "Intro.mp4"
+    video_path.parent.mkdir(parents=True, exist_ok=True)
+    video_path.write_bytes(b"video")
+    fingerprint = cache.get_fingerprint(file_path, "Intro", args)
+    cache.update(file_path, "Intro", fingerprint, video_path)
+    return fingerprint
+
+
+def test_draft_and_final_stay_fresh(tmp_path):
+    file_path = write_scene(tmp_path)
+    cache = RenderCache(tmp_path / "render_cache.json")
+
+    draft = render(tmp_path, cache, file_path, ["-ql"], "480p15")
+    final = render(tmp_path, cache, file_path, ["-qh"], "1080p60")
+    cache.save()
+
+    cache = RenderCache(tmp_path / "render_cache.json")
+    assert cache.is_fresh(file_path, "Intro", draft)
+    assert cache.is_fresh(file_path, "Intro", final)
+
+
+def test_changed_source_is_not_fresh(tmp_path):
+    file_path = write_scene(tmp_path)
+    cache = RenderCache(tmp_path / "render_cache.json")
+    old = render(tmp_path, cache, file_path, ["-ql"], "480p15")
+
+    file_path.write_text("from manim import *\n\nclass Intro(Scene):\n    x = 1\n")
+    cache.refresh()
+
+    assert cache.get_fingerprint(file_path, "Intro", ["-ql"]) != old
+    assert not cache.is_fresh(
+        file_path, "Intro", cache.get_fingerprint(file_path, "Intro", ["-ql"]))
+
+
+def test_missing_video_is_not_fresh(tmp_path):
+    file_path = write_scene(tmp_path)
+    cache = RenderCache(tmp_path / "render_cache.json")
+    fingerprint = render(tmp_path, cache, file_path, ["-ql"], "480p15")
+
+    (tmp_path / "480p15" / "Intro.mp4").unlink()
+
+    assert not cache.is_fresh(file_path, "Intro", fingerprint)
@@ -0,0 +1,101 @@
+import sys
+
+import pytest
+
+from utils.render_process import SceneResult
+from utils.render_queue import RenderQueue, render_job
+
+
+def submit(queue, tmp_path, scene_name, priority=0):
+    return queue.submit(
+        tmp_path / "main.py", scene_name, ["-ql"], tmp_path,
+        fingerprint=f"{scene_name}-fingerprint", priority=priority)
+
+
+def test_jobs_are_claimed_once(tmp_path):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    other = RenderQueue(tmp_path / "render_queue.db")
+    submit(queue, tmp_path, "Intro")
+    submit(queue, tmp_path, "Outro")
+
+    first = queue.claim("worker-1")
+    second = other.claim("worker-2")
+
+    assert {first["scene"], second["scene"]} == {"Intro", "Outro"}
+    assert queue.claim("worker-1") is None
+    assert not queue.is_drained()
+
+
+def test_submitting_again_keeps_the_job(tmp_path):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    job = submit(queue, tmp_path, "Intro")
+    claimed = queue.claim("worker-1")
+    queue.finish(claimed["id"], "worker-1", SceneResult("Intro", wall_time=1.0))
+
+    again = submit(queue, tmp_path, "Intro")
+
+    assert again["id"] == job["id"]
+    assert again["status"] == "done"
+    assert queue.is_drained()
+
+
+def test_failed_jobs_are_queued_again(tmp_path):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    submit(queue, tmp_path, "Intro")
+    claimed = queue.claim("worker-1")
+    queue.finish(claimed["id"], "worker-1",
+                 SceneResult("Intro", status="failed", exit_code=1))
+
+    assert submit(queue, tmp_path, "Intro")["status"] == "pending"
+    assert queue.claim("worker-2")["attempts"] == 2
+
+
+def test_expired_lease_is_claimed_by_another_worker(tmp_path):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    submit(queue, tmp_path, "Intro")
+    job = queue.claim("worker-1", lease=-1)
+
+    assert queue.claim("worker-2")["id"] == job["id"]
+    # the first worker doesn't own it any more
+    assert not queue.heartbeat(job["id"], "worker-1")
+    assert queue.heartbeat(job["id"], "worker-2")
+
+
+def test_lower_priority_values_go_first(tmp_path):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    submit(queue, tmp_path, "Outro", priority=2)
+    submit(queue, tmp_path, "Intro", priority=1)
+
+    assert queue.claim("worker-1")["scene"] == "Intro"
+
+
+def claim_render(tmp_path, scene_name="Intro"):
+    queue = RenderQueue(tmp_path / "render_queue.db")
+    submit(queue, tmp_path, scene_name)
+    return queue.claim("worker-1")
+
+
+def test_render_job_without_manim(tmp_path, monkeypatch):
+    job = claim_render(tmp_path)
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+
+    result = render_job(job)
+
+    assert result.status == "failed"
+    assert result.stderr_tail
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="the fake manim is a shell script")
+def test_render_job_without_video(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    manim = bin_dir / "manim"
+    manim.write_text("#!/bin/sh\nexit 0\n")
+    manim.chmod(0o755)
+    monkeypatch.setenv("PATH", str(bin_dir))
+    job = claim_render(tmp_path)
+
+    result = render_job(job)
+
+    assert result.status == "failed"
+    assert "did not produce" in result.stderr_tail[-1]
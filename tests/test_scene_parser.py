@@ -0,0 +1,89 @@
+import textwrap
+
+from utils.scene_parser import discover_scenes, select_scenes
+
+
+def write(path, source):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(source), encoding="utf-8")
+    return path
+
+
+def test_bases_of_the_same_file(tmp_path):
+    main = write(tmp_path / "project" / "main.py", """
+        from manim import *
+
+        class FirstChapter(MovingCameraScene):
+            pass
+
+        class AncientTime(FirstChapter):
+            pass
+
+        class BC3000(AncientTime):
+            pass
+
+        class Helper(object):
+            pass
+    """)
+
+    scenes = {scene.name: scene for scene in discover_scenes(main)}
+
+    assert list(scenes) == ["FirstChapter", "AncientTime", "BC3000"]
+    assert scenes["BC3000"].bases == ["AncientTime", "FirstChapter", "MovingCameraScene"]
+    assert scenes["BC3000"].scene_base == "MovingCameraScene"
+
+
+def test_bases_of_local_modules(tmp_path):
+    write(tmp_path / "project" / "chapters.py", """
+        import manim
+
+        class Chapter(manim.Scene):
+            pass
+    """)
+    main = write(tmp_path / "project" / "main.py", """
+        from chapters import Chapter
+
+        class Intro(Chapter):
+            pass
+    """)
+
+    scenes = discover_scenes(main)
+
+    assert [scene.name for scene in scenes] == ["Intro"]
+    assert scenes[0].bases == ["Chapter", "Scene"]
+
+
+def test_classes_without_a_scene_base(tmp_path):
+    main = write(tmp_path / "project" / "main.py", """
+        class Loop(Loop):
+            pass
+
+        class Table(VGroup):
+            pass
+    """)
+
+    assert discover_scenes(main) == []
+
+
+def test_select_scenes_by_changed_module(tmp_path):
+    chapters = write(tmp_path / "project" / "chapters.py", """
+        from manim import *
+
+        class Chapter(Scene):
+            pass
+    """)
+    main = write(tmp_path / "project" / "main.py", """
+        from manim import *
+        from chapters import Chapter
+
+        class Intro(Chapter):
+            pass
+
+        class Outro(Scene):
+            pass
+    """)
+
+    scenes = discover_scenes(main)
+
+    assert select_scenes(scenes, [chapters]) == ["Intro"]
+    assert select_scenes(scenes, [main]) == ["Intro", "Outro"]
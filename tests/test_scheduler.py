@@ -0,0 +1,71 @@
+import time
+import threading
+
+from utils.scheduler import Scheduler
+
+
+def record_memory(scheduler, peaks, duration=0.05):
+    def func(slot):
+        with scheduler._condition:
+            peaks.append(scheduler._memory_in_use)
+        time.sleep(duration)
+    return func
+
+
+def test_memory_budget_is_not_exceeded():
+    scheduler = Scheduler(workers=4, memory_budget=10)
+    peaks = []
+    for index, memory in enumerate([5, 5, 5, 3, 2]):
+        scheduler.add(f"job{index}", record_memory(scheduler, peaks), memory=memory)
+
+    jobs = scheduler.run()
+
+    assert all(job.status == "done" for job in jobs.values())
+    assert max(peaks) <= 10
+
+
+def test_small_jobs_fill_the_memory_left():
+    scheduler = Scheduler(workers=3, memory_budget=10)
+    small_started = threading.Event()
+    running_with_first = []
+
+    def first(slot):
+        # keeps its memory until the small job started next to it
+        running_with_first.append(small_started.wait(timeout=2))
+
+    def small(slot):
+        small_started.set()
+
+    scheduler.add("first", first, memory=6)
+    scheduler.add("second", lambda slot: None, memory=6)
+    scheduler.add("small", small, memory=3)
+
+    jobs = scheduler.run()
+
+    assert running_with_first == [True]
+    assert jobs["second"].skipped >= 1
+    assert all(job.status == "done" for job in jobs.values())
+
+
+def test_job_bigger_than_the_budget_runs_alone():
+    scheduler = Scheduler(workers=2, memory_budget=10)
+    peaks = []
+    scheduler.add("huge", record_memory(scheduler, peaks), memory=20)
+    scheduler.add("small", record_memory(scheduler, peaks), memory=2, priority=1)
+
+    jobs = scheduler.run()
+
+    assert jobs["huge"].status == "done"
+    # the small job waits until the huge one finished
+    assert sorted(peaks) == [2, 20]
+
+
+def test_without_budget_memory_is_ignored():
+    scheduler = Scheduler(workers=2)
+    peaks = []
+    scheduler.add("a", record_memory(scheduler, peaks), memory=20)
+    scheduler.add("b", record_memory(scheduler, peaks), memory=20)
+
+    jobs = scheduler.run()
+
+    assert all(job.status == "done" for job in jobs.values())
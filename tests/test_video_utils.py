@@ -0,0 +1,39 @@
+from utils.video_utils import ManimRunner
+
+
+def test_get_quality():
+    assert ManimRunner.get_quality(["-ql"]) == "low_quality"
+    assert ManimRunner.get_quality(["-pqm"]) == "medium_quality"
+    assert ManimRunner.get_quality(["--quality", "k"]) == "fourk_quality"
+    assert ManimRunner.get_quality(["--production_quality"]) == "production_quality"
+
+
+def test_get_quality_default():
+    assert ManimRunner.get_quality(["-p"]) == "high_quality"
+    assert ManimRunner.get_quality(["-p"], default=None) is None
+
+
+def test_replace_quality():
+    assert ManimRunner.replace_quality(["-qh", "-p"], ["-ql"]) == ["-p", "-ql"]
+    assert ManimRunner.replace_quality(["-pqh"], ["-ql"]) == ["-p", "-ql"]
+    assert ManimRunner.replace_quality(["--quality", "m", "-p"], ["-qk"]) == ["-p", "-qk"]
+    assert ManimRunner.replace_quality(["-p"], ["-ql"]) == ["-p", "-ql"]
+
+
+def test_get_media_output_folder():
+    assert ManimRunner.get_media_output_folder(["-ql"]) == "480p15"
+    assert ManimRunner.get_media_output_folder(["-p"]) == "1080p60"
+
+
+def test_get_video_path_with_quality(tmp_path):
+    runner = ManimRunner({"Intro": ["-ql", "-p"]}, tmp_path / "main.py", output_dir=tmp_path)
+
+    assert runner.get_video_path("Intro", runner.scenes["Intro"]) == (
+        tmp_path / "videos" / "main" / "480p15" / "Intro.mp4")
+
+
+def test_get_video_path_without_quality(tmp_path):
+    runner = ManimRunner({"Intro": ["-p"]}, tmp_path / "main.py", output_dir=tmp_path)
+
+    assert runner.get_video_path("Intro", runner.scenes["Intro"]) == (
+        tmp_path / "videos" / "main" / "1080p60" / "Intro.mp4")
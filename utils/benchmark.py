@@ -0,0 +1,410 @@
+"""
+    Render benchmark of a fixed set of representative scenes.
+
+    From the repository folder:
+
+        python -m utils.benchmark run -o bench.json
+        python -m utils.benchmark run -o bench.json --baseline baseline.json
+        python -m utils.benchmark compare bench.json baseline.json
+        python -m utils.benchmark profiles
+
+    Every scene is rendered at the same quality with manim's cache
+    (and the pickles of the prebuilt timelines) disabled, the result stores wall time, frames per second, peak
+    memory and the duration of every play() call. Comparing against a
+    baseline exits with code 1 when a scene got slower than the threshold.
+
+    'profiles' encodes the video of a reference scene with every encoding
+    profile (see ffmpeg_utils.PROFILES) and reports throughput and size.
+
+    'timeline' builds presets.TimeLine with more and more entries and
+    measures its construction and its re-layout (position_elements), next
+    to the layout with one point_from_proportion call per entry and to
+    the construction of a WindowedTimeLine with the same entries.
+"""
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+
+from pathlib import Path
+from fractions import Fraction
+
+from utils import ffmpeg_utils
+from utils.render_process import format_bytes
+from utils.video_utils import ManimRunner, ROOT_PATH
+
+
+# (scene file relative to the repository, scene name)
+BENCHMARK_SCENES = [
+    ("statistics_history/main.py", "Intro"),
+    ("statistics_history/main.py", "FirstChapter"),
+    ("statistics_history/main.py", "BC3000"),
+    ("statistics_history/main.py", "Outro"),
+    ("ft_form/main.py", "Conclusions"),
+    ("template/main.py", "Intro"),
+]
+
+BENCHMARK_ARGS = ["-ql", "--disable_caching"]
+
+# a scene is a regression when it's this much slower than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+# scene whose video is encoded by the profile benchmark and its args,
+# the video is kept (and cached) in PROFILE_MEDIA_DIR between runs
+PROFILE_SCENE = ("statistics_history/main.py", "FirstChapter")
+PROFILE_ARGS = ["-qh"]
+PROFILE_MEDIA_DIR = Path.home() / "Videos" / "Manim" / "benchmark"
+
+# entries of the timelines built by the timeline benchmark
+TIMELINE_SIZES = [12, 1000, 10000]
+
+# distance between the entries of the windowed timelines
+TIMELINE_SPACING = 1.5
+
+# labels of the timeline entries, repeated so LaTeX compiles each one once
+TIMELINE_LABELS = [f"{year} A.C." for year in range(3000, 0, -250)]
+
+
+def get_scene_key(file_path, scene_name):
+    return f"{file_path}::{scene_name}"
+
+
+def get_fps(args):
+    # '480p15' -> 15
+    folder = ManimRunner.get_media_output_folder(args)
+    return int(folder.split("p")[1])
+
+
+def run_benchmark(scenes=None, args=None, output_dir=None):
+    """
+        renders 'scenes' one at a time (so timings don't compete
+        for cpu) and returns the benchmark as a dict
+    """
+    scenes = scenes or BENCHMARK_SCENES
+    args = list(args or BENCHMARK_ARGS)
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="godofredo_bench_"))
+    fps = get_fps(args)
+
+    files = {}
+    for file_path, scene_name in scenes:
+        files.setdefault(file_path, []).append(scene_name)
+
+    benchmark = {
+        "args": args,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenes": {},
+    }
+
+    for file_path, scene_names in files.items():
+        # every project has a main.py, each one gets its own media folder
+        project_dir = output_dir / Path(file_path).parent.name
+        timings_dir = project_dir / "timings"
+        runner = ManimRunner(
+            {name: args for name in scene_names},
+            ROOT_PATH / file_path,
+            output_dir=project_dir,
+            workers=1,
+            use_cache=False,
+        )
+        runner.cwd = (ROOT_PATH / file_path).parent
+        runner.add_wrapper("instrument", report_dir=str(timings_dir))
+        # the prebuilt timelines are built in every run, pickles of
+        # earlier runs would make the timings depend on them
+        with tempfile.TemporaryDirectory(prefix="godofredo_timelines_") as timeline_cache:
+            runner.timeline_cache = Path(timeline_cache)
+            results = runner.run_scenes()
+
+        for scene_name in scene_names:
+            result = results.get(scene_name)
+            timings_path = timings_dir / f"{scene_name}.json"
+            timings = {}
+            if timings_path.exists():
+                with open(timings_path) as f:
+                    timings = json.load(f)
+
+            plays = timings.get("plays", [])
+            frames = round(fps * sum(
+                play["duration"] for play in plays if not play["skipped"]))
+            wall_time = result.wall_time if result else None
+
+            benchmark["scenes"][get_scene_key(file_path, scene_name)] = {
+                "status": result.status if result else "failed",
+                "wall_time": wall_time,
+                "cpu_time": result.cpu_time if result else None,
+                "peak_rss": result.peak_rss if result else None,
+                "frames": frames,
+                "fps": frames / wall_time if wall_time else None,
+                "plays": plays,
+            }
+
+    return benchmark
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+        returns (report lines, regressions), a regression is a scene or
+        a play() call whose wall time grew more than 'threshold'
+    """
+    lines = [f"{'scene':<40}{'baseline':>10}{'current':>10}{'change':>9}"]
+    regressions = []
+
+    for key, scene in current["scenes"].items():
+        base = baseline["scenes"].get(key)
+        if not base or not base.get("wall_time") or not scene.get("wall_time"):
+            lines.append(f"{key:<40}{'-':>10}{'-':>10}{'-':>9}")
+            continue
+
+        change = scene["wall_time"] / base["wall_time"] - 1
+        mark = " !" if change > threshold else ""
+        lines.append(
+            f"{key:<40}{base['wall_time']:>9.1f}s{scene['wall_time']:>9.1f}s"
+            f"{change:>+8.0%}{mark}"
+        )
+        if change > threshold:
+            regressions.append(key)
+
+        base_plays = {play["index"]: play for play in base.get("plays", [])}
+        for play in scene.get("plays", []):
+            base_play = base_plays.get(play["index"])
+            # very short calls are mostly noise
+            if not base_play or base_play["wall_time"] < 0.5:
+                continue
+            play_change = play["wall_time"] / base_play["wall_time"] - 1
+            if play_change > threshold:
+                regressions.append(f"{key}#play{play['index']}")
+                label = f"    play {play['index']}"
+                lines.append(
+                    f"{label:<40}{base_play['wall_time']:>9.2f}s"
+                    f"{play['wall_time']:>9.2f}s{play_change:>+8.0%}"
+                )
+
+    return lines, regressions
+
+
+def get_reference_video(scene=PROFILE_SCENE, args=None, output_dir=None):
+    """
+        video of 'scene', rendered only when it's not up to date
+    """
+    file_path, scene_name = scene
+    args = list(args or PROFILE_ARGS)
+    runner = ManimRunner(
+        {scene_name: args}, ROOT_PATH / file_path,
+        output_dir=Path(output_dir or PROFILE_MEDIA_DIR),
+    )
+    runner.cwd = (ROOT_PATH / file_path).parent
+    runner.run_scenes()
+
+    video = runner.get_video_path(scene_name, args)
+    if not video.exists():
+        raise FileNotFoundError(f"{scene_name} could not be rendered")
+    return video
+
+
+def run_profile_benchmark(video, profiles=None, output_dir=None):
+    """
+        encodes 'video' once per profile, decoding the reference is part
+        of every measure but costs the same for all of them
+    """
+    profiles = profiles or list(ffmpeg_utils.PROFILES)
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="godofredo_profiles_"))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    info = ffmpeg_utils.probe(video)
+    frames = info["frames"] or round(info["duration"] * float(Fraction(info["fps"])))
+
+    benchmark = {
+        "video": str(video),
+        "resolution": f"{info['width']}x{info['height']}",
+        "frames": frames,
+        "duration": info["duration"],
+        "profiles": {},
+    }
+
+    for name in profiles:
+        output_path = output_dir / f"{name}.mp4"
+        start = time.perf_counter()
+        ffmpeg_utils.run_ffmpeg([
+            "-i", video,
+            *ffmpeg_utils.get_profile_args(name), "-c:a", "copy",
+            *ffmpeg_utils.get_muxer_args(name),
+            output_path,
+        ])
+        wall_time = time.perf_counter() - start
+        size = output_path.stat().st_size
+
+        benchmark["profiles"][name] = {
+            "wall_time": wall_time,
+            "fps": frames / wall_time if wall_time else None,
+            "size": size,
+            "bitrate": size * 8 / info["duration"] if info["duration"] else None,
+        }
+
+    return benchmark
+
+
+def layout_by_proportion(timeline):
+    """
+        position_elements as it was, the line is walked once per entry
+    """
+    point_distance = 1 / (timeline.size - 1)
+    line = timeline.get_line()
+    for n in range(timeline.size):
+        position = line.point_from_proportion(point_distance * n)
+        timeline.times[n].next_to(
+            position, timeline.directions["times"], buff=timeline.time_buff)
+        timeline.dots[n].move_to(position)
+
+
+def run_timeline_benchmark(sizes=None, repeat=3):
+    """
+        seconds to build a TimeLine of every size and the best of
+        'repeat' layouts, vectorized and by proportion
+    """
+    # presets imports manim, the other benchmarks don't need it here
+    from manim import RIGHT
+    from utils import presets
+
+    sizes = sizes or TIMELINE_SIZES
+    benchmark = {"sizes": {}}
+
+    for size in sizes:
+        times = [TIMELINE_LABELS[n % len(TIMELINE_LABELS)] for n in range(size)]
+
+        start = time.perf_counter()
+        timeline = presets.TimeLine(times=times, direction=RIGHT)
+        construction = time.perf_counter() - start
+
+        layouts = {}
+        for name, layout in [
+            ("layout", timeline.position_elements),
+            ("proportion_layout", lambda: layout_by_proportion(timeline)),
+        ]:
+            measures = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                layout()
+                measures.append(time.perf_counter() - start)
+            layouts[name] = min(measures)
+
+        start = time.perf_counter()
+        presets.WindowedTimeLine(times=times, spacing=TIMELINE_SPACING, direction=RIGHT)
+        windowed = time.perf_counter() - start
+
+        benchmark["sizes"][str(size)] = {
+            "construction": construction,
+            "windowed_construction": windowed,
+            **layouts,
+        }
+
+    return benchmark
+
+
+def format_timeline(benchmark):
+    lines = [
+        f"{'entries':>8}{'build':>10}{'windowed':>10}{'layout':>10}"
+        f"{'by prop.':>10}{'speedup':>9}"
+    ]
+    for size, measure in benchmark["sizes"].items():
+        speedup = measure["proportion_layout"] / measure["layout"] if measure["layout"] else 0
+        lines.append(
+            f"{size:>8}{measure['construction']:>9.3f}s"
+            f"{measure['windowed_construction']:>9.3f}s{measure['layout']:>9.4f}s"
+            f"{measure['proportion_layout']:>9.4f}s{speedup:>8.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def format_profiles(benchmark):
+    lines = [
+        f"{benchmark['video']} ({benchmark['resolution']}, {benchmark['frames']} frames)",
+        f"{'profile':<12}{'wall':>9}{'fps':>9}{'size':>9}{'kbit/s':>9}",
+    ]
+    for name, profile in benchmark["profiles"].items():
+        bitrate = f"{profile['bitrate'] / 1000:.0f}" if profile["bitrate"] else "-"
+        lines.append(
+            f"{name:<12}{profile['wall_time']:>8.1f}s{profile['fps']:>9.1f}"
+            f"{format_bytes(profile['size']):>9}{bitrate:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="render the benchmark scenes")
+    run_parser.add_argument("-o", "--output", default="benchmark.json")
+    run_parser.add_argument("--baseline", help="benchmark json to compare with")
+    run_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    run_parser.add_argument("--media_dir", help="defaults to a temporary folder")
+
+    compare_parser = commands.add_parser("compare", help="compare two benchmark files")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+
+    profiles_parser = commands.add_parser(
+        "profiles", help="encode a reference video with every encoding profile")
+    profiles_parser.add_argument("--video", help="defaults to the video of FirstChapter")
+    profiles_parser.add_argument("--profile", action="append", dest="profiles",
+                                 choices=sorted(ffmpeg_utils.PROFILES),
+                                 help="profiles to measure, all by default")
+    profiles_parser.add_argument("--media_dir", help=f"defaults to {PROFILE_MEDIA_DIR}")
+    profiles_parser.add_argument("-o", "--output", help="json file for the results")
+
+    timeline_parser = commands.add_parser(
+        "timeline", help="build and lay out presets.TimeLine with many entries")
+    timeline_parser.add_argument("--size", action="append", dest="sizes", type=int,
+                                 help=f"entries of a timeline, {TIMELINE_SIZES} by default")
+    timeline_parser.add_argument("-o", "--output", help="json file for the results")
+
+    options = parser.parse_args(argv)
+
+    if options.command == "timeline":
+        benchmark = run_timeline_benchmark(options.sizes)
+        print(format_timeline(benchmark))
+        if options.output:
+            with open(options.output, 'w') as f:
+                json.dump(benchmark, f, indent=2)
+        return 0
+
+    if options.command == "profiles":
+        video = options.video or get_reference_video(output_dir=options.media_dir)
+        benchmark = run_profile_benchmark(video, options.profiles)
+        print(format_profiles(benchmark))
+        if options.output:
+            with open(options.output, 'w') as f:
+                json.dump(benchmark, f, indent=2)
+        return 0
+
+    if options.command == "run":
+        current = run_benchmark(output_dir=options.media_dir)
+        with open(options.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"[BENCHMARK INFO] Saved at {options.output}")
+        baseline_path = options.baseline
+    else:
+        with open(options.current) as f:
+            current = json.load(f)
+        baseline_path = options.baseline
+
+    if not baseline_path:
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    lines, regressions = compare(current, baseline, options.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"[BENCHMARK WARNING] Slower than baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
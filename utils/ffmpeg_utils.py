@@ -0,0 +1,567 @@
+"""
+    ffmpeg helpers used by ManimRunner: probing, conforming and
+    concatenating the videos rendered by manim.
+"""
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+
+from pathlib import Path
+from fractions import Fraction
+from collections import Counter
+
+
+FFMPEG = "ffmpeg"
+FFPROBE = "ffprobe"
+
+# codec reported by ffprobe: encoder used to re-encode it
+ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "prores": "prores_ks",
+    "gif": "gif",
+}
+
+
+# name: codec, encoder preset, crf, threads (0 lets the encoder
+# decide) and pixel format of the encoded videos, 'movflags' is
+# applied when the mp4 is written
+PROFILES = {
+    "draft": {
+        "codec": "libx264", "preset": "ultrafast", "crf": 30,
+        "threads": 0, "pix_fmt": "yuv420p",
+    },
+    # manim's own settings plus the index at the start of the file
+    "web": {
+        "codec": "libx264", "preset": "medium", "crf": 23,
+        "threads": 0, "pix_fmt": "yuv420p", "movflags": "+faststart",
+    },
+    "archive": {
+        "codec": "libx264", "preset": "slower", "crf": 14,
+        "threads": 0, "pix_fmt": "yuv444p",
+    },
+}
+
+
+def get_profile(profile):
+    """
+        profile: <str or dict> name in PROFILES or the profile itself
+    """
+    if isinstance(profile, dict):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"unknown encoding profile {profile!r}, use one of {sorted(PROFILES)}")
+    return PROFILES[profile]
+
+
+def get_profile_args(profile, codec=True):
+    """
+        ffmpeg output args of the video encoder, without 'codec'
+        the codec and pixel format are left to the caller
+    """
+    profile = get_profile(profile)
+    args = []
+    if codec:
+        args += ["-c:v", profile["codec"], "-pix_fmt", profile["pix_fmt"]]
+    if profile.get("preset"):
+        args += ["-preset", profile["preset"]]
+    if profile.get("crf") is not None:
+        args += ["-crf", str(profile["crf"])]
+    if profile.get("threads") is not None:
+        args += ["-threads", str(profile["threads"])]
+    return args
+
+
+def get_muxer_args(profile):
+    profile = get_profile(profile)
+    if profile.get("movflags"):
+        return ["-movflags", profile["movflags"]]
+    return []
+
+
+def matches_profile(info, profile):
+    """
+        True when the video described by 'info' (see probe) is
+        encoded with the codec and pixel format of 'profile'
+    """
+    profile = get_profile(profile)
+    return (ENCODERS.get(info["codec"]) == profile["codec"] and
+            info["pix_fmt"] == profile["pix_fmt"])
+
+
+# container of a derived video: ffmpeg output args
+CONTAINER_ARGS = {
+    ".mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p",
+             "-c:a", "aac", "-movflags", "+faststart"],
+    ".webm": ["-c:v", "libvpx-vp9", "-b:v", "0", "-crf", "33",
+              "-row-mt", "1", "-pix_fmt", "yuv420p", "-c:a", "libopus"],
+    ".gif": ["-an", "-loop", "0"],
+}
+
+
+# transition between two videos: xfade transition drawing it, a
+# 'cut' joins them as they are (see concatenate)
+TRANSITIONS = {
+    "cut": None,
+    "crossfade": "fade",
+    "fadeblack": "fadeblack",
+}
+
+DEFAULT_TRANSITION_DURATION = 0.5
+
+# seconds two timestamps may differ and still be the same frame
+TIME_TOLERANCE = 1e-3
+
+
+def run_ffmpeg(args, ffmpeg=FFMPEG):
+    command = [ffmpeg, "-hide_banner", "-loglevel", "error", "-y", *map(str, args)]
+    subprocess.run(command, check=True)
+
+
+def probe(path, ffprobe=FFPROBE):
+    """
+        codec, resolution, fps, timebase and pixel format of the
+        first video stream plus the audio codec (None without audio)
+    """
+    output = subprocess.run(
+        [ffprobe, "-v", "error", "-show_streams", "-show_format",
+         "-of", "json", str(path)],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    info = json.loads(output)
+
+    streams = info.get("streams", [])
+    video = next(s for s in streams if s.get("codec_type") == "video")
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    return {
+        "codec": video.get("codec_name"),
+        "width": int(video.get("width", 0)),
+        "height": int(video.get("height", 0)),
+        "fps": str(Fraction(video.get("r_frame_rate", "0/1"))),
+        "time_base": video.get("time_base"),
+        "pix_fmt": video.get("pix_fmt"),
+        "audio": audio.get("codec_name") if audio else None,
+        "audio_rate": int(audio.get("sample_rate", 0)) if audio else None,
+        "duration": float(info.get("format", {}).get("duration", 0) or 0),
+        "frames": int(video.get("nb_frames", 0) or 0),
+    }
+
+
+def get_keyframes(path, ffprobe=FFPROBE):
+    """
+        {pts: dts} in seconds of the keyframes of the first video stream,
+        read from the packets so nothing is decoded
+    """
+    output = subprocess.run(
+        [ffprobe, "-v", "error", "-select_streams", "v:0",
+         "-show_entries", "packet=pts_time,dts_time,flags", "-of", "json", str(path)],
+        check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+
+    keyframes = {}
+    for packet in json.loads(output).get("packets", []):
+        pts = packet.get("pts_time")
+        if "K" not in packet.get("flags", "") or pts in (None, "N/A"):
+            continue
+        dts = packet.get("dts_time")
+        keyframes[float(pts)] = float(dts) if dts not in (None, "N/A") else float(pts)
+    return keyframes
+
+
+def get_duration(info):
+    """
+        seconds of video, from the frame count when the container has it
+    """
+    fps = Fraction(info["fps"])
+    if info["frames"] and fps:
+        return float(info["frames"] / fps)
+    return info["duration"]
+
+
+def get_signature(info):
+    """
+        values that must be equal to concatenate two videos
+        with stream copy
+    """
+    keys = ["codec", "width", "height", "fps", "time_base",
+            "pix_fmt", "audio", "audio_rate"]
+    return tuple(info[key] for key in keys)
+
+
+def get_reference(infos):
+    """
+        the most common format among 'infos', first one on ties
+    """
+    counts = Counter(get_signature(info) for info in infos)
+    top = max(counts.values())
+    return next(info for info in infos if counts[get_signature(info)] == top)
+
+
+def get_encoding_args(reference, profile=None):
+    """
+        ffmpeg output args that produce videos stream copy compatible
+        with 'reference', the preset, crf and threads of 'profile' are
+        used when given (codec and pixel format must be the reference's)
+    """
+    args = [
+        "-c:v", ENCODERS.get(reference["codec"], "libx264"),
+        "-pix_fmt", reference["pix_fmt"],
+    ]
+    if profile:
+        args += get_profile_args(profile, codec=False)
+
+    time_base = reference["time_base"]
+    if time_base and "/" in time_base:
+        args += ["-video_track_timescale", time_base.split("/")[1]]
+
+    if reference["audio"]:
+        args += ["-c:a", "aac", "-ar", str(reference["audio_rate"])]
+    return args
+
+
+def conform(path, reference, output_path, ffmpeg=FFMPEG, profile=None):
+    """
+        re-encodes 'path' with the format of 'reference'
+    """
+    info = probe(path)
+    video_filter = (
+        f"scale={reference['width']}:{reference['height']}:flags=lanczos,"
+        f"fps={reference['fps']},format={reference['pix_fmt']}"
+    )
+
+    inputs = ["-i", path]
+    maps = ["-map", "0:v:0"]
+    if reference["audio"]:
+        if info["audio"]:
+            maps += ["-map", "0:a:0"]
+        else:
+            # silent track so every segment has the same streams
+            inputs += ["-f", "lavfi", "-i",
+                       f"anullsrc=r={reference['audio_rate']}:cl=stereo"]
+            maps += ["-map", "1:a:0", "-shortest"]
+
+    run_ffmpeg(
+        [*inputs, *maps, "-vf", video_filter,
+         *get_encoding_args(reference, profile), output_path],
+        ffmpeg=ffmpeg
+    )
+    return Path(output_path)
+
+
+def transcode(path, output_path, height, fps, ffmpeg=FFMPEG, profile=None):
+    """
+        derives a smaller (or equal) version of the video 'path', the
+        container comes from the suffix of 'output_path' (see CONTAINER_ARGS),
+        mp4 videos are encoded with 'profile' when given
+    """
+    output_path = Path(output_path)
+    suffix = output_path.suffix.lower()
+    if suffix not in CONTAINER_ARGS:
+        raise ValueError(f"can't transcode to {suffix}, use one of {sorted(CONTAINER_ARGS)}")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    video_filter = f"fps={fps},scale=-2:{height}:flags=lanczos"
+    if suffix == ".gif":
+        # a palette of the video itself, the default one bands gradients
+        filter_args = ["-filter_complex",
+                       f"[0:v]{video_filter},split[a][b];[a]palettegen[p];[b][p]paletteuse"]
+    else:
+        filter_args = ["-vf", video_filter]
+
+    container_args = CONTAINER_ARGS[suffix]
+    if suffix == ".mp4" and profile:
+        container_args = [*get_profile_args(profile), "-c:a", "aac", *get_muxer_args(profile)]
+
+    partial_path = output_path.with_name(f".{output_path.name}.partial{suffix}")
+    run_ffmpeg(
+        ["-i", path, *filter_args, *container_args, partial_path],
+        ffmpeg=ffmpeg
+    )
+    os.replace(partial_path, output_path)
+    return output_path
+
+
+def parse_transition(spec):
+    """
+        'cut', 'crossfade', 'fadeblack:1.5', ('crossfade', 0.5) or
+        {'type': 'fadeblack', 'duration': 1} -> (name, seconds)
+    """
+    if spec is None:
+        return ("cut", 0.0)
+
+    if isinstance(spec, dict):
+        name, duration = spec.get("type", "cut"), spec.get("duration")
+    elif isinstance(spec, (tuple, list)):
+        name, duration = (list(spec) + [None])[:2]
+    else:
+        name, _, duration = str(spec).partition(":")
+        duration = duration or None
+
+    if name not in TRANSITIONS:
+        raise ValueError(f"transition must be one of {sorted(TRANSITIONS)}, not {name!r}")
+    if name == "cut":
+        return ("cut", 0.0)
+
+    duration = DEFAULT_TRANSITION_DURATION if duration is None else float(duration)
+    if duration <= 0:
+        raise ValueError(f"{name} needs a positive duration, not {duration}")
+    return (name, duration)
+
+
+def plan_transitions(paths, durations, keyframes, transitions):
+    """
+        splits the output in ranges stream copied from the videos and
+        chunks that must be encoded, a chunk goes from the last keyframe
+        before a transition to the first keyframe after it. Videos too
+        short to have a keyframe outside their transitions end up whole
+        inside the chunk.
+
+        returns ('copy', video index, start, end) and ('chunk', clips,
+        transitions) items in output order, clips are (path, start, end)
+        in seconds
+    """
+    plan = []
+    clips, clip_transitions = [], []
+    cut = ("cut", 0.0)
+
+    for n, path in enumerate(paths):
+        before = transitions[n - 1] if n > 0 else cut
+        after = transitions[n] if n < len(paths) - 1 else cut
+        duration = durations[n]
+
+        start = 0.0
+        if before != cut:
+            start = min(
+                (pts for pts in keyframes[n] if pts >= before[1] - TIME_TOLERANCE),
+                default=duration)
+        end = duration
+        if after != cut:
+            end = max(
+                (pts for pts in keyframes[n] if pts <= duration - after[1] + TIME_TOLERANCE),
+                default=0.0)
+
+        if end - start <= TIME_TOLERANCE:
+            # nothing to copy, the whole video is part of the chunk
+            clips.append((path, 0.0, duration))
+            if after != cut:
+                clip_transitions.append(after)
+            else:
+                plan.append(("chunk", clips, clip_transitions))
+                clips, clip_transitions = [], []
+            continue
+
+        if clips:
+            clips.append((path, 0.0, start))
+            plan.append(("chunk", clips, clip_transitions))
+        plan.append(("copy", n, start, end))
+        clips, clip_transitions = [], []
+        if after != cut:
+            clips, clip_transitions = [(path, end, duration)], [after]
+
+    return plan
+
+
+def encode_chunks(chunks, reference, temp_dir, ffmpeg=FFMPEG, profile=None):
+    """
+        encodes every transition chunk in a single ffmpeg run, each clip
+        is an input seeked to its keyframe so the frames between chunks
+        are never decoded. Returns the path of every chunk.
+    """
+    inputs, filters, outputs, chunk_paths = [], [], [], []
+    suffix = Path(chunks[0][0][0][0]).suffix
+
+    for n, (clips, clip_transitions) in enumerate(chunks):
+        labels = []
+        for k, (path, start, end) in enumerate(clips):
+            before = clip_transitions[k - 1][1] if k > 0 else 0.0
+            after = clip_transitions[k][1] if k < len(clip_transitions) else 0.0
+            if end - start < before + after - TIME_TOLERANCE:
+                raise ValueError(
+                    f"{Path(path).name} is shorter than its transitions "
+                    f"({end - start:.2f}s for {before + after:.2f}s)")
+
+            index = len(labels) + sum(len(chunk[0]) for chunk in chunks[:n])
+            if start > TIME_TOLERANCE:
+                inputs += ["-ss", f"{start:.6f}"]
+            inputs += ["-t", f"{end - start:.6f}", "-i", path]
+            # xfade wants a constant frame rate on both inputs
+            filters.append(
+                f"[{index}:v]setpts=PTS-STARTPTS,fps={reference['fps']}[c{n}v{k}]")
+            if reference["audio"]:
+                filters.append(f"[{index}:a]asetpts=PTS-STARTPTS[c{n}a{k}]")
+            labels.append(index)
+
+        video, audio = f"[c{n}v0]", f"[c{n}a0]"
+        elapsed = clips[0][2] - clips[0][1]
+        for k, (name, duration) in enumerate(clip_transitions, start=1):
+            offset = elapsed - duration
+            filters.append(
+                f"{video}[c{n}v{k}]xfade=transition={TRANSITIONS[name]}:"
+                f"duration={duration:.6f}:offset={offset:.6f}[c{n}x{k}]")
+            video = f"[c{n}x{k}]"
+            if reference["audio"]:
+                filters.append(f"{audio}[c{n}a{k}]acrossfade=d={duration:.6f}[c{n}f{k}]")
+                audio = f"[c{n}f{k}]"
+            elapsed += clips[k][2] - clips[k][1] - duration
+
+        chunk_path = Path(temp_dir) / f"transition_{n:04d}{suffix}"
+        outputs += ["-map", video]
+        if reference["audio"]:
+            outputs += ["-map", audio]
+        outputs += [*get_encoding_args(reference, profile), chunk_path]
+        chunk_paths.append(chunk_path)
+
+    run_ffmpeg(
+        [*inputs, "-filter_complex", ";".join(filters), *outputs],
+        ffmpeg=ffmpeg
+    )
+    return chunk_paths
+
+
+def add_transitions(paths, transitions, reference, temp_dir, ffmpeg=FFMPEG, profile=None):
+    """
+        concat list entries, (path, inpoint, outpoint), of 'paths' joined
+        with 'transitions' (one per boundary, see parse_transition).
+        Only the frames around each transition are encoded, the
+        rest is stream copied between keyframes.
+    """
+    durations = [get_duration(probe(path)) for path in paths]
+    keyframes = [get_keyframes(path) for path in paths]
+    plan = plan_transitions(paths, durations, keyframes, transitions)
+
+    chunks = [(item[1], item[2]) for item in plan if item[0] == "chunk"]
+    chunk_paths = iter(encode_chunks(chunks, reference, temp_dir, ffmpeg, profile))
+
+    entries = []
+    for item in plan:
+        if item[0] == "chunk":
+            entries.append((next(chunk_paths), None, None))
+            continue
+
+        _, n, start, end = item
+        path = paths[n]
+        inpoint = start if start > TIME_TOLERANCE else None
+        outpoint = None
+        if end < durations[n] - TIME_TOLERANCE:
+            # the demuxer stops at decoding timestamps, the keyframe
+            # that starts the chunk must not be copied as well
+            outpoint = keyframes[n][end]
+        entries.append((path, inpoint, outpoint))
+    return entries
+
+
+def escape_concat_path(path):
+    # concat demuxer quoting: ' must be written as '\''
+    return str(Path(path).resolve()).replace("'", "'\\''")
+
+
+def write_concat_list(paths, list_path):
+    """
+        paths: <list> of paths or (path, inpoint, outpoint) in seconds,
+            None reads the video from its start or until its end
+    """
+    with open(list_path, 'w', encoding="utf-8") as f:
+        for entry in paths:
+            path, inpoint, outpoint = entry if isinstance(entry, tuple) else (entry, None, None)
+            f.write(f"file '{escape_concat_path(path)}'\n")
+            if inpoint is not None:
+                f.write(f"inpoint {inpoint:.6f}\n")
+            if outpoint is not None:
+                f.write(f"outpoint {outpoint:.6f}\n")
+
+
+def concatenate(paths, output_path, ffmpeg=FFMPEG, verbose=True, profile=None,
+                transitions=None):
+    """
+        paths: <list> videos in the order they are concatenated
+        output_path: <str or Path>
+        profile: <str or dict> encoding profile (see PROFILES) of an mp4 output
+        transitions: <list> one per boundary between videos, such as
+            'cut', 'crossfade:0.5' or ('fadeblack', 1), see parse_transition.
+            Only the frames between the keyframes around a transition
+            are encoded, in a single ffmpeg run for all of them
+
+        segments that match the most common format are stream copied,
+        only the mismatched ones are re-encoded. When that format is not
+        the one of 'profile' the whole output is encoded with it instead.
+        Every temporary file lives in a private folder so concurrent runs
+        can't collide.
+    """
+    paths = [Path(path) for path in paths]
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix.lower() != ".mp4":
+        # profiles describe mp4 videos, webm or gif outputs keep their codec
+        profile = None
+
+    transitions = [parse_transition(spec) for spec in (transitions or [])]
+    if transitions and len(transitions) != len(paths) - 1:
+        raise ValueError(
+            f"{len(paths)} videos have {len(paths) - 1} transitions, not {len(transitions)}")
+
+    infos = [probe(path) for path in paths]
+    reference = get_reference(infos)
+    reference_signature = get_signature(reference)
+
+    with tempfile.TemporaryDirectory(prefix="godofredo_concat_") as temp_dir:
+        segments = []
+        for n, (path, info) in enumerate(zip(paths, infos)):
+            if get_signature(info) == reference_signature:
+                segments.append(path)
+                continue
+
+            if verbose:
+                print(f"[RUNNER INFO] Re-encoding {path.name} to match "
+                      f"{reference['width']}x{reference['height']}@{reference['fps']}")
+            segments.append(
+                conform(path, reference,
+                        Path(temp_dir) / f"{n:04d}{path.suffix}",
+                        ffmpeg=ffmpeg, profile=profile)
+            )
+
+        codec_args = ["-c", "copy"]
+        if profile and not matches_profile(reference, profile):
+            if verbose:
+                print(f"[RUNNER INFO] Encoding {output_path.name} with the profile")
+            codec_args = [*get_profile_args(profile), "-c:a", "aac"]
+        elif len(segments) == 1 and not profile:
+            shutil.copyfile(segments[0], output_path)
+            return output_path
+
+        if any(name != "cut" for name, _ in transitions):
+            if verbose:
+                print(f"[RUNNER INFO] Encoding the transitions of {output_path.name}")
+            segments = add_transitions(
+                segments, transitions, reference, temp_dir, ffmpeg=ffmpeg, profile=profile)
+
+        list_path = Path(temp_dir) / "segments.txt"
+        write_concat_list(segments, list_path)
+
+        muxer_args = get_muxer_args(profile) if profile else []
+
+        # written next to the output and renamed once complete
+        partial_path = output_path.with_name(f".{output_path.name}.partial{output_path.suffix}")
+        run_ffmpeg(
+            ["-f", "concat", "-safe", "0", "-i", list_path,
+             "-map", "0", *codec_args, *muxer_args, partial_path],
+            ffmpeg=ffmpeg
+        )
+        os.replace(partial_path, output_path)
+
+    return output_path
+
+
+def open_file(path):
+    """
+        opens 'path' with the default application of the system
+    """
+    if hasattr(os, "startfile"):
+        os.startfile(str(path))
+    elif shutil.which("open"):
+        subprocess.Popen(["open", str(path)])
+    else:
+        subprocess.Popen(["xdg-open", str(path)])
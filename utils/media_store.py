@@ -0,0 +1,276 @@
+"""
+    Videos stored by the fingerprint of their render (see render_cache),
+    shared by every project that writes into the same output folder.
+
+    Two scenes (or segments) whose sources, assets and args hash the
+    same render the same video, whichever project asks for it first
+    renders it and the rest copy the blob:
+
+        blobs/3f/3fa9...c1.mp4
+
+    manifest.json maps the scenes of every scene file to their blobs,
+    blobs no scene points to any more are the first ones collected:
+
+        python -m utils.media_store status ~/Videos/Manim/Godofredo/store
+        python -m utils.media_store gc ~/Videos/Manim/Godofredo/store --max_size 20G \\
+            --media_dir ~/Videos/Manim/Godofredo
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import threading
+
+from pathlib import Path
+
+from utils.render_process import format_bytes, parse_bytes, merge_entries, save_entries
+
+
+# folders manim fills with intermediate files, the final videos don't need them
+PARTIAL_FOLDERS = ("partial_movie_files",)
+
+# media folders of runner workers, only used while rendering
+WORKER_FOLDERS = ("workers",)
+
+
+class MediaStore(object):
+    """
+        store_path: <str or Path> folder of the blobs and the manifest,
+            created when missing
+    """
+
+    def __init__(self, store_path):
+        self.store_path = Path(store_path)
+        self.manifest_path = self.store_path / "manifest.json"
+        self._lock = threading.Lock()
+        self._manifest = self.load()
+        # (file path, render name) removed since the last save
+        self._removed = set()
+
+    def load(self):
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        # every project writing into the store shares the manifest
+        with self._lock:
+            self._manifest = save_entries(
+                self.manifest_path, self._manifest, removed=self._removed)
+            self._removed = set()
+
+    def get_blob_path(self, fingerprint, ext=".mp4"):
+        return self.store_path / "blobs" / fingerprint[:2] / f"{fingerprint}{ext}"
+
+    def get(self, fingerprint, ext=".mp4"):
+        """
+            blob of 'fingerprint', None when it's not stored. Using a
+            blob marks it as recently used for the garbage collector.
+        """
+        blob_path = self.get_blob_path(fingerprint, ext)
+        try:
+            os.utime(blob_path)
+        except OSError:
+            return None
+        return blob_path
+
+    def put(self, fingerprint, video_path):
+        """
+            copies 'video_path' into the store, a blob that already
+            exists is only marked as used. Returns the blob path.
+        """
+        video_path = Path(video_path)
+        stored = self.get(fingerprint, video_path.suffix)
+        if stored:
+            return stored
+
+        blob_path = self.get_blob_path(fingerprint, video_path.suffix)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        # other runners may store the same blob at the same time
+        temp_path = blob_path.with_name(f"{blob_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.copyfile(video_path, temp_path)
+        os.replace(temp_path, blob_path)
+        return blob_path
+
+    def restore(self, fingerprint, video_path):
+        """
+            copies the blob of 'fingerprint' to 'video_path',
+            False when it's not stored
+        """
+        video_path = Path(video_path)
+        blob_path = self.get(fingerprint, video_path.suffix)
+        if blob_path is None:
+            return False
+
+        video_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = video_path.with_name(f"{video_path.stem}.restoring{video_path.suffix}")
+        shutil.copyfile(blob_path, temp_path)
+        os.replace(temp_path, video_path)
+        return True
+
+    def link(self, file_path, render_name, fingerprint, video_path):
+        """
+            records in the manifest that 'render_name' of 'file_path'
+            is the blob of 'fingerprint', written to 'video_path'
+        """
+        with self._lock:
+            file_entries = self._manifest.setdefault(
+                str(Path(file_path).resolve()), {})
+            file_entries[render_name] = {
+                "fingerprint": fingerprint,
+                "blob": str(self.get_blob_path(fingerprint, Path(video_path).suffix)),
+                "video": str(video_path),
+            }
+
+    def get_manifest(self):
+        with self._lock:
+            return json.loads(json.dumps(self._manifest))
+
+    def get_blobs(self):
+        """
+            [(path, size, last use)] of every stored blob
+        """
+        blobs_dir = self.store_path / "blobs"
+        if not blobs_dir.is_dir():
+            return []
+        blobs = []
+        for path in blobs_dir.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            stat = path.stat()
+            blobs.append((path, stat.st_size, stat.st_mtime))
+        return blobs
+
+    def get_linked_blobs(self):
+        return {
+            entry["blob"]
+            for file_entries in self._manifest.values()
+            for entry in file_entries.values()
+        }
+
+    def collect_garbage(self, max_size, media_dir=None):
+        """
+            removes blobs until the store fits in 'max_size' bytes, the
+            ones no scene points to go first and then the least recently
+            used. With 'media_dir' it also removes manim's partial movie
+            files, the worker folders and the videos that can be restored
+            from a blob.
+
+            returns (removed blobs, freed bytes)
+        """
+        # links saved by other projects since this store was loaded
+        with self._lock:
+            self._manifest = merge_entries(self.load(), self._manifest)
+        linked = self.get_linked_blobs()
+        blobs = sorted(
+            self.get_blobs(),
+            key=lambda blob: (str(blob[0]) in linked, blob[2]))
+
+        size = sum(blob_size for _, blob_size, _ in blobs)
+        removed = []
+        freed = 0
+        for path, blob_size, _ in blobs:
+            if size <= max_size:
+                break
+            path.unlink()
+            removed.append(path)
+            size -= blob_size
+            freed += blob_size
+
+        removed_names = {str(path) for path in removed}
+        with self._lock:
+            for file_path, file_entries in self._manifest.items():
+                for render_name, entry in list(file_entries.items()):
+                    if entry["blob"] in removed_names:
+                        del file_entries[render_name]
+                        self._removed.add((file_path, render_name))
+        self.save()
+
+        if media_dir:
+            freed += self.prune_media_dir(media_dir)
+        return removed, freed
+
+    def prune_media_dir(self, media_dir):
+        """
+            removes what a render can get back without rendering,
+            returns the freed bytes
+        """
+        media_dir = Path(media_dir).resolve()
+        freed = 0
+
+        folders = [
+            path for name in PARTIAL_FOLDERS for path in media_dir.rglob(name)
+            if path.is_dir()
+        ]
+        folders += [
+            media_dir / name for name in WORKER_FOLDERS if (media_dir / name).is_dir()
+        ]
+        for folder in folders:
+            freed += sum(path.stat().st_size for path in folder.rglob("*") if path.is_file())
+            shutil.rmtree(folder, ignore_errors=True)
+
+        for file_entries in self._manifest.values():
+            for entry in file_entries.values():
+                video_path = Path(entry["video"]).resolve()
+                if media_dir not in video_path.parents:
+                    continue
+                if not video_path.exists() or not Path(entry["blob"]).exists():
+                    continue
+                freed += video_path.stat().st_size
+                video_path.unlink()
+
+        return freed
+
+    def get_size(self):
+        return sum(blob_size for _, blob_size, _ in self.get_blobs())
+
+
+def format_status(store):
+    blobs = store.get_blobs()
+    linked = store.get_linked_blobs()
+    lines = [
+        f"{len(blobs)} blobs, {format_bytes(sum(size for _, size, _ in blobs))}, "
+        f"{sum(str(path) not in linked for path, _, _ in blobs)} not linked"
+    ]
+    for file_path, file_entries in store.get_manifest().items():
+        lines.append(file_path)
+        for render_name, entry in file_entries.items():
+            lines.append(f"    {render_name:<28}{entry['fingerprint'][:12]}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    status_parser = commands.add_parser("status", help="print the blobs and the manifest")
+    status_parser.add_argument("store")
+
+    gc_parser = commands.add_parser("gc", help="remove blobs over the size cap")
+    gc_parser.add_argument("store")
+    gc_parser.add_argument("--max_size", required=True,
+                           help="size cap of the store, such as 20G or 512M")
+    gc_parser.add_argument("--media_dir",
+                           help="also prune this media folder")
+
+    options = parser.parse_args(argv)
+    store = MediaStore(options.store)
+
+    if options.command == "gc":
+        removed, freed = store.collect_garbage(
+            parse_bytes(options.max_size), media_dir=options.media_dir)
+        print(f"[STORE INFO] Removed {len(removed)} blobs, freed {format_bytes(freed)}")
+        return 0
+
+    print(format_status(store))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,21 @@
 import os
 import math
+import pickle
+import bisect
+import hashlib
+import weakref
+from pathlib import Path
 from itertools import cycle
 from manim import *
+from manim import __version__ as manim_version
+
+
+# pickles of the timelines built by TimeLine.prebuilt
+TIMELINE_CACHE_DIR = Path.home() / "Videos" / "Manim" / "timelines"
+
+# environment variable that replaces TIMELINE_CACHE_DIR, ManimRunner
+# sets it to the timelines folder of its output folder
+TIMELINE_CACHE_ENV = "GODOFREDO_TIMELINE_CACHE"
 
 
 class TimeLine(VGroup):
@@ -20,9 +34,15 @@ class TimeLine(VGroup):
         arrow_config: dict = {},
         time_config: dict = {},
         dot_config: dict = {},
+        rigid_scroll: bool = False,
         *args,
         **kwargs,
     ):
+        """
+        rigid_scroll: times that follow their dots are placed next to them
+        once and scroll with the line and the dots as one group, instead of
+        an updater per time that runs on every frame (and disables caching)
+        """
         super().__init__(*args, **kwargs)
 
         self.length = length or Camera(None).frame_width / 2
@@ -31,6 +51,10 @@ class TimeLine(VGroup):
         # control next time index and next dot index
         self.index_reference = {"times": 0, "dots": 0}
 
+        self.rigid_scroll = rigid_scroll
+        # times that follow their dots when scrolling with rigid_scroll
+        self.attached_times = VGroup()
+
         if direction is RIGHT:
             height_buff = 1.3
 
@@ -96,24 +120,21 @@ class TimeLine(VGroup):
         if not dot_colors:
             dot_colors = [default_dots_color]
 
-        dot_colors = cycle(dot_colors)
+        self.dot_colors = list(dot_colors)
+        self.time_strings = list(times)
+        # time: index of its first entry
+        self.time_indices = {}
+        for index, time in enumerate(self.time_strings):
+            self.time_indices.setdefault(time, index)
+        self.time_config = time_config
+        self.time_scale = time_scale
 
-        point_distance = 1 / (self.size - 1)
+        # every dot is a copy of the same one
+        self.dot_template = Dot(z_index=1, **dot_config).scale(dot_scale)
 
         # create dots and times
 
-        for n, time in enumerate(times):
-            position = self.line.point_from_proportion(point_distance * n)
-
-            dot = Dot(z_index=1, **dot_config).scale(dot_scale).move_to(position)
-            dot.set_color(next(dot_colors))
-
-            self.dots.add(dot)
-
-            time_mob = Tex(time, z_index=1, **time_config).scale(time_scale)
-            time_mob.next_to(dot, self.directions["times"], self.time_buff)
-
-            self.times.add(time_mob)
+        self.create_entries()
 
         # create arrow
 
@@ -122,13 +143,126 @@ class TimeLine(VGroup):
         ).scale(arrow_scale)
 
         # predefine buff for next_time method works properly
-        self.arrow.next_to(self.dots[0], self.directions["arrow"], buff=self.arrow_buff)
+        self.arrow.next_to(self.get_dot(0), self.directions["arrow"], buff=self.arrow_buff)
 
         if not "color" in arrow_config:
             self.arrow.set_color(default_arrow_color)
 
         self.add(self.line, *self.dots, *self.times, self.arrow)
 
+    @classmethod
+    def prebuilt(
+        cls,
+        config: dict,
+        next_to: tuple = None,
+        target_time: str = None,
+        scene: "Scene" = None,
+        with_arrow: bool = True,
+        cache_dir: str = None,
+    ) -> "TimeLine":
+        """
+        timeline of 'config' placed with the args of 'next_to', such as
+        (point, DOWN, 0), and preloaded up to 'target_time'. It's built
+        once and pickled with its points, colors and indices, the next
+        calls with the same arguments only load it. With 'scene' the
+        times already shown are added to it, like preload_for_scene.
+
+        the pickle is built again when the arguments, this file
+        or the manim version change. It's kept in 'cache_dir', the
+        folder of TIMELINE_CACHE_ENV or TIMELINE_CACHE_DIR.
+        """
+        cache_dir = Path(
+            cache_dir or os.environ.get(TIMELINE_CACHE_ENV) or TIMELINE_CACHE_DIR)
+        key = cls.get_prebuilt_key(config, next_to, target_time)
+        cache_path = cache_dir / f"{cls.__name__}_{key[:16]}.pickle"
+
+        timeline = cls.load_prebuilt(cache_path)
+
+        if timeline is None:
+            timeline = cls(**config)
+            if next_to:
+                timeline.next_to(*next_to)
+            if target_time:
+                timeline.preload(target_time)
+
+            cls.save_prebuilt(timeline, cache_path)
+
+        if scene is not None:
+            timeline.add_preloaded(scene, with_arrow=with_arrow)
+
+        return timeline
+
+    @classmethod
+    def get_prebuilt_key(
+        cls, config: dict, next_to: tuple = None, target_time: str = None
+    ) -> str:
+        camera = Camera(None)
+        parts = [
+            cls.__name__,
+            repr(sorted(config.items())),
+            repr(next_to),
+            repr(target_time),
+            repr((camera.frame_width, camera.frame_height)),
+            manim_version,
+            Path(__file__).read_text(encoding="utf-8"),
+        ]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def load_prebuilt(cache_path: Path) -> "TimeLine":
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # a pickle of other classes or cut by a killed render, it's built again
+            return None
+
+    @staticmethod
+    def save_prebuilt(timeline: "TimeLine", cache_path: Path) -> None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # scenes rendering at the same time may build the same timeline
+        temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump(timeline, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except (pickle.PicklingError, TypeError, AttributeError, OSError):
+            # the timeline still works, it's only built again next time
+            if temp_path.exists():
+                temp_path.unlink()
+
+    def create_dot(self, index: int) -> Dot:
+        return self.dot_template.copy().set_color(
+            self.dot_colors[index % len(self.dot_colors)]
+        )
+
+    def create_time(self, index: int) -> Tex:
+        return Tex(self.time_strings[index], z_index=1, **self.time_config).scale(
+            self.time_scale
+        )
+
+    def create_entries(self) -> None:
+        """
+        create the dot and the time of every entry in their place
+        """
+        for index in range(self.size):
+            self.dots.add(self.create_dot(index))
+            self.times.add(self.create_time(index))
+
+        positions = self.get_positions()
+        self.move_each(self.dots, positions)
+
+        # times start next to the edge of their dot, not its center
+        dot_edge = (
+            self.dot_template.get_critical_point(self.directions["times"])
+            - self.dot_template.get_center()
+        )
+        self.next_to_each(
+            self.times, positions + dot_edge, self.directions["times"], self.time_buff
+        )
+
     def shift(self, direction: "ndarray") -> "TimeLine":
         self.line.shift(direction)
         current_dot = self.get_current_dot()
@@ -143,38 +277,83 @@ class TimeLine(VGroup):
 
         return self
 
-    def position_dots(self) -> None:
-        point_distance = 1 / (self.size - 1)
+    def get_proportions(self) -> "ndarray":
+        """
+        proportion of the line where every entry goes, evenly
+        spaced, subclasses may space the entries differently
+        """
+        return np.linspace(0, 1, self.size)
+
+    def get_positions(self) -> "ndarray":
+        """
+        (size, 3) array with the point of every entry, the line is
+        straight so they are interpolated between its ends
+        """
         line = self.get_line()
-        dots = self.get_dots()
+        start, end = line.get_start(), line.get_end()
 
-        for n, dot in enumerate(dots):
-            dot.move_to(line.point_from_proportion(point_distance * n))
+        return start + np.outer(self.get_proportions(), end - start)
 
-    def position_times(self) -> None:
-        point_distance = 1 / (self.size - 1)
-        line = self.get_line()
-        times = self.get_times()
+    @staticmethod
+    def shift_each(mobjects: VGroup, offsets: "ndarray") -> None:
+        """
+        shift of every mobject by its row of 'offsets', the points of all
+        of them are shifted together in a single array
+        """
+        members, rows = [], []
+        for row, mob in enumerate(mobjects):
+            for member in mob.family_members_with_points():
+                members.append(member)
+                rows.append(row)
+
+        if not members:
+            return
+
+        counts = [len(member.points) for member in members]
+        points = np.concatenate([member.points for member in members]).astype(float)
+        points += np.repeat(np.asarray(offsets, dtype=float)[rows], counts, axis=0)
+
+        for member, member_points in zip(members, np.split(points, np.cumsum(counts)[:-1])):
+            member.points = member_points
+
+    @staticmethod
+    def move_each(mobjects: VGroup, positions: "ndarray") -> None:
+        """
+        move_to of every mobject to its row of 'positions'
+        """
+        centers = np.array([mob.get_center() for mob in mobjects])
+
+        TimeLine.shift_each(mobjects, positions - centers)
+
+    @staticmethod
+    def next_to_each(
+        mobjects: VGroup, points: "ndarray", direction: "ndarray", buff: float
+    ) -> None:
+        """
+        next_to of every mobject to its row of 'points'
+        """
+        edges = np.array([mob.get_critical_point(-direction) for mob in mobjects])
 
-        for n, time in enumerate(times):
-            time.move_to(line.point_from_proportion(point_distance * n))
+        TimeLine.shift_each(mobjects, points + buff * direction - edges)
+
+    def position_dots(self) -> None:
+        self.move_each(self.get_dots(), self.get_positions())
+
+    def position_times(self) -> None:
+        self.move_each(self.get_times(), self.get_positions())
 
     def position_elements(self) -> None:
         """
         Position dots, times and arrow
         """
-        point_distance = 1 / (self.size - 1)
+        positions = self.get_positions()
 
-        line = self.get_line()
-        times = self.get_times()
-        dots = self.get_dots()
         arrow = self.get_arrow()
 
-        for n in range(self.size):
-            position = line.point_from_proportion(point_distance * n)
-
-            times[n].next_to(position, self.directions["times"], buff=self.time_buff)
-            dots[n].move_to(position)
+        self.next_to_each(
+            self.get_times(), positions, self.directions["times"], self.time_buff
+        )
+        self.move_each(self.get_dots(), positions)
 
         current_dot = self.get_current_dot()
 
@@ -192,13 +371,19 @@ class TimeLine(VGroup):
     def get_arrow(self) -> Arrow:
         return self.arrow
 
+    def get_dot(self, index: int) -> Dot:
+        return self.dots[index]
+
+    def get_time(self, index: int) -> Tex:
+        return self.times[index]
+
     def get_next_time(self, increment: bool = True) -> Tex:
         if self.index_reference["times"] > self.size:
             raise Exception("Next time exceeds size")
 
         index = self.index_reference["times"]
 
-        next_time = self.times[index]
+        next_time = self.get_time(index)
         if not increment:
             return next_time
 
@@ -211,7 +396,7 @@ class TimeLine(VGroup):
         if current_time_index < 0:
             current_time_index = 0
 
-        return self.times[current_time_index]
+        return self.get_time(current_time_index)
 
     def get_next_dot(self) -> Dot:
         if self.index_reference["dots"] > self.size:
@@ -219,7 +404,7 @@ class TimeLine(VGroup):
 
         index = self.index_reference["dots"]
 
-        next_dot = self.dots[index]
+        next_dot = self.get_dot(index)
         self.index_reference["dots"] += 1
 
         return next_dot
@@ -229,7 +414,7 @@ class TimeLine(VGroup):
         if current_dot_index < 0:
             current_dot_index = 0
 
-        return self.dots[current_dot_index]
+        return self.get_dot(current_dot_index)
 
     def create(
         self, with_arrow: bool = False, with_time: bool = False
@@ -240,7 +425,7 @@ class TimeLine(VGroup):
 
         if with_time:
             self.index_reference["times"] += 1  # increased next time index
-            animations.append(Write(self.times[0]))
+            animations.append(Write(self.get_time(0)))
 
         self.index_reference["dots"] += 1  # increases next dot index
         return AnimationGroup(*animations)
@@ -271,23 +456,35 @@ class TimeLine(VGroup):
 
         dots_distance = abs(current_dot.get_center() - next_dot.get_center())
 
-        first_time = self.get_times()[0]
+        # the current time is the first one until the first scroll
+        is_first_time = self.index_reference["times"] <= 1
         current_time = self.get_current_time()
         target_time = self.get_next_time()
 
-        target_time.add_updater(
-            lambda mob: mob.next_to(next_dot, self.directions["times"], self.time_buff)
-        )
+        if is_first_time:
 
-        if current_time is first_time:
+            first_dot = self.get_dot(0)
 
-            first_dot = self.get_dots()[0]
+            self._attach_to_dot(current_time, first_dot)
 
-            current_time.add_updater(
-                lambda mob: mob.next_to(
-                    first_dot, self.directions["times"], self.time_buff
-                )
-            )
+        if self.rigid_scroll:
+            scroll_group = VGroup(self.line, self.dots, *self.attached_times)
+
+            # written next to its dot, the scroll moves it after every frame
+            self._attach_to_dot(target_time, next_dot)
+
+            animations = [
+                Write(target_time),
+                Scroll(
+                    scroll_group,
+                    self.directions["scroll"] * dots_distance,
+                    followers=[target_time],
+                ),
+            ]
+
+            return AnimationGroup(*animations)
+
+        self._attach_to_dot(target_time, next_dot)
 
         animations = [
             self.line.animate.shift(self.directions["scroll"] * dots_distance),
@@ -306,39 +503,45 @@ class TimeLine(VGroup):
         ]
         return AnimationGroup(*animations)
 
+    def get_time_index(self, target_time: str) -> int:
+        if target_time not in self.time_indices:
+            raise Exception(f"{target_time} is not a valid time")
+
+        return self.time_indices[target_time]
+
     def _load_from(self, target_time: str, scene_class: "Scene" = None) -> VGroup:
         """
         - get times that should have been shown
         before 'time' including 'target_time'
         - shift arrow to 'time'
         """
-        times_string = [mob_time.get_tex_string() for mob_time in self.times]
-
-        if not target_time in set(times_string):
-            raise Exception(f"{target_time} is not a valid time")
-
-        self.times[0].get_tex_string()
-
-        target_index = [
-            index
-            for index, time_str in enumerate(times_string)
-            if time_str == target_time
-        ][0]
+        target_index = self.get_time_index(target_time)
 
         return self.times[: target_index + 1]
 
     def _attach_to_dot(self, target_time: Tex, dot: Dot) -> Tex:
+        if self.rigid_scroll:
+            # placed once, from now on it only moves with the scroll
+            target_time.next_to(dot, self.directions["times"], self.time_buff)
+            if target_time not in self.attached_times.submobjects:
+                self.attached_times.add(target_time)
+            return target_time
+
         target_time.add_updater(
             lambda mob: mob.next_to(dot, self.directions["times"], self.time_buff)
         )
         return target_time
 
-    def preload_for_scene(
-        self, target_time: str, scene: "Scene", with_arrow: bool = True
-    ) -> None:
+    def get_entry_indices(self) -> list:
         """
-        load times previous to 'target_time' (including target_time) and
-        add them directly to the scene_class
+        indices of the entries that have a dot and a time
+        """
+        return list(range(self.size))
+
+    def preload(self, target_time: str) -> None:
+        """
+        leave the timeline as if every time up to 'target_time'
+        (included) had been shown, without a scene
         """
         previous_times = self._load_from(target_time)
         new_index = len(previous_times)
@@ -359,15 +562,468 @@ class TimeLine(VGroup):
         line.shift(self.directions["scroll"] * shift_size)
         dots.shift(self.directions["scroll"] * shift_size)
 
+    def add_preloaded(self, scene: "Scene", with_arrow: bool = True) -> None:
+        """
+        add the line, the dots and the times already shown to the scene
+        """
+        new_index = self.index_reference["times"]
+
         # add updaters to the times
 
-        [self._attach_to_dot(time, dot) for time, dot in zip(previous_times, dots)]
+        previous_times = [
+            self._attach_to_dot(self.get_time(index), self.get_dot(index))
+            for index in self.get_entry_indices()
+            if index < new_index
+        ]
 
-        scene.add(line, dots, *previous_times)
+        scene.add(self.line, self.dots, *previous_times)
 
         if with_arrow:
             scene.add(self.arrow)
 
+    def preload_for_scene(
+        self, target_time: str, scene: "Scene", with_arrow: bool = True
+    ) -> None:
+        """
+        load times previous to 'target_time' (including target_time) and
+        add them directly to the scene_class
+        """
+        self.preload(target_time)
+        self.add_preloaded(scene, with_arrow=with_arrow)
+
+
+class WindowedTimeLine(TimeLine):
+    """
+    TimeLine for long lists of times, only the entries inside the frame
+    (or 'frame_buff' units around it) have a dot and the times are compiled
+    the first time they are used. Entries that scroll out of the frame
+    are released and their dots are recycled for the entries coming in.
+
+    spacing: distance between two entries, the length of the line is
+    spacing * (len(times) - 1), 'length' is used without it
+    """
+
+    def __init__(
+        self,
+        times: list,
+        spacing: float = None,
+        frame_buff: float = 1,
+        **kwargs,
+    ):
+        if spacing:
+            kwargs["length"] = spacing * (len(times) - 1)
+
+        camera = Camera(None)
+        self.frame_size = np.array([camera.frame_width, camera.frame_height]) / 2
+        self.frame_buff = frame_buff
+
+        # index: dot or time of the entries that exist
+        self.live_dots = {}
+        self.live_times = {}
+        # released dots, reused by the next entries
+        self.spare_dots = []
+        # scene the entries are shown in, see set_scene
+        self.scene_ref = None
+
+        super().__init__(times, **kwargs)
+
+        # the groups change with the window, they are the submobjects
+        self.remove(*self.submobjects)
+        self.add(self.line, self.dots, self.times, self.arrow)
+
+    def create_entries(self) -> None:
+        self.update_window()
+
+    def set_scene(self, scene: "Scene") -> None:
+        """
+        the window follows the camera frame of 'scene' and the times
+        released are removed from it, add_preloaded calls it
+        """
+        # a weak reference, copies of the timeline don't copy the scene
+        self.scene_ref = weakref.ref(scene)
+
+    def get_scene(self) -> "Scene":
+        return self.scene_ref() if self.scene_ref else None
+
+    def get_frame(self) -> tuple:
+        """
+        (center, half of the size) of the camera frame of the scene,
+        the default frame without a moving camera
+        """
+        frame = getattr(getattr(self.get_scene(), "camera", None), "frame", None)
+        if frame is None:
+            return ORIGIN, self.frame_size
+
+        return frame.get_center(), np.array([frame.width, frame.height]) / 2
+
+    def get_window(self, offset: "ndarray" = ORIGIN) -> set:
+        """
+        indices of the entries inside the frame, grown by
+        frame_buff, once the line is shifted by 'offset'
+        """
+        center, frame_size = self.get_frame()
+        positions = self.get_positions() + offset - center
+        inside = np.all(
+            np.abs(positions[:, :2]) <= frame_size + self.frame_buff, axis=1
+        )
+        return set(np.flatnonzero(inside).tolist())
+
+    def update_window(self, offset: "ndarray" = None) -> None:
+        """
+        creates the dots of the entries inside the frame now (and after
+        shifting the line by 'offset') and releases the rest
+        """
+        wanted = self.get_window()
+        if offset is not None:
+            wanted |= self.get_window(offset)
+
+        # the current and the next entries are used by the API
+        for index in self.index_reference.values():
+            wanted |= {n for n in (index - 1, index) if 0 <= n < self.size}
+
+        for index in set(self.live_dots) - wanted:
+            dot = self.live_dots.pop(index)
+            self.dots.remove(dot)
+            self.spare_dots.append(dot)
+
+        for index in set(self.live_times) - wanted:
+            self.release_time(self.live_times.pop(index))
+
+        for index in sorted(wanted):
+            self.get_dot(index)
+
+    def release_time(self, time: Tex) -> None:
+        """
+        forget 'time', a time written to the scene is removed from it
+        (times written to a scene not given to set_scene stay there)
+        """
+        self.times.remove(time)
+        if time in self.attached_times.submobjects:
+            self.attached_times.remove(time)
+
+        time.clear_updaters()
+
+        scene = self.get_scene()
+        if scene is not None:
+            scene.remove(time)
+
+    def get_dot(self, index: int) -> Dot:
+        if index not in self.live_dots:
+            if self.spare_dots:
+                dot = self.spare_dots.pop()
+                dot.set_color(self.dot_colors[index % len(self.dot_colors)])
+            else:
+                dot = self.create_dot(index)
+
+            dot.move_to(self.get_positions()[index])
+            self.live_dots[index] = dot
+            self.dots.add(dot)
+
+        return self.live_dots[index]
+
+    def get_time(self, index: int) -> Tex:
+        if index not in self.live_times:
+            time = self.create_time(index)
+            time.next_to(self.get_dot(index), self.directions["times"], self.time_buff)
+
+            self.live_times[index] = time
+            self.times.add(time)
+
+        return self.live_times[index]
+
+    def get_live(self, entries: dict) -> tuple:
+        """
+        (mobjects, positions) of the 'entries' that exist
+        """
+        indices = sorted(entries)
+        return [entries[index] for index in indices], self.get_positions()[indices]
+
+    def position_dots(self) -> None:
+        self.move_each(*self.get_live(self.live_dots))
+
+    def position_times(self) -> None:
+        self.move_each(*self.get_live(self.live_times))
+
+    def position_elements(self) -> None:
+        """
+        Position dots, times and arrow
+        """
+        self.update_window()
+
+        times, positions = self.get_live(self.live_times)
+        self.next_to_each(times, positions, self.directions["times"], self.time_buff)
+        self.position_dots()
+
+        current_dot = self.get_current_dot()
+
+        self.arrow.next_to(current_dot, self.directions["arrow"], self.arrow_buff)
+
+    def next_time_scroll(self) -> AnimationGroup:
+        """
+        entries that come into the frame with the scroll are created before
+        it, the ones that left with the previous scroll are released
+        """
+        positions = self.get_positions()
+        current_index = max(self.index_reference["dots"] - 1, 0)
+        next_index = min(self.index_reference["dots"], self.size - 1)
+
+        dots_distance = abs(positions[current_index] - positions[next_index])
+        self.update_window(self.directions["scroll"] * dots_distance)
+
+        return super().next_time_scroll()
+
+    def _load_from(self, target_time: str, scene_class: "Scene" = None) -> list:
+        """
+        existing times up to 'target_time' included
+        """
+        target_index = self.get_time_index(target_time)
+
+        return [
+            self.get_time(index) for index in sorted(self.live_dots)
+            if index <= target_index
+        ]
+
+    def get_entry_indices(self) -> list:
+        return sorted(self.live_dots)
+
+    def add_preloaded(self, scene: "Scene", with_arrow: bool = True) -> None:
+        self.set_scene(scene)
+        # the window of the camera frame, it may not be at the origin
+        self.update_window()
+        super().add_preloaded(scene, with_arrow=with_arrow)
+
+    def preload(self, target_time: str) -> None:
+        """
+        shift the line to 'target_time' and create the entries around it
+        """
+        new_index = self.get_time_index(target_time) + 1
+
+        self.index_reference["dots"] = new_index
+        self.index_reference["times"] = new_index
+
+        positions = self.get_positions()
+        shift_size = abs(positions[0] - positions[new_index - 1])
+
+        self.line.shift(self.directions["scroll"] * shift_size)
+        self.dots.shift(self.directions["scroll"] * shift_size)
+
+        self.update_window()
+
+
+class DatedTimeLine(TimeLine):
+    """
+    TimeLine whose entries are numeric dates (years, -3000 for 3000 A.C.),
+    sorted from the oldest. Entries are placed by their dates instead of
+    evenly, times and dates can be used wherever a time is expected.
+
+    labels: times shown for every date, format_date of each one by default
+    spacing: 'linear' keeps distances proportional to the elapsed time,
+    'log' compresses the distant past: distances are proportional to the
+    logarithm of the time left until the last date
+    log_unit: elapsed time that counts as one for the logarithm
+    """
+
+    def __init__(
+        self,
+        dates: list,
+        labels: list = None,
+        spacing: str = "linear",
+        log_unit: float = 1,
+        **kwargs,
+    ):
+        if any(later < earlier for earlier, later in zip(dates, dates[1:])):
+            raise Exception("Expecting dates sorted from the oldest")
+
+        if labels is None:
+            labels = [self.format_date(date) for date in dates]
+
+        if len(labels) != len(dates):
+            raise Exception("Expecting one label for every date")
+
+        self.dates = list(dates)
+        self.proportions = self.get_date_proportions(spacing, log_unit)
+
+        camera = Camera(None)
+        self.frame_size = np.array([camera.frame_width, camera.frame_height]) / 2
+
+        super().__init__(labels, **kwargs)
+
+    @staticmethod
+    def format_date(date: float) -> str:
+        if date == int(date):
+            date = int(date)
+        return f"{-date} A.C." if date < 0 else str(date)
+
+    def get_date_proportions(self, spacing: str, log_unit: float) -> "ndarray":
+        dates = np.array(self.dates, dtype=float)
+        total = dates[-1] - dates[0]
+
+        if total == 0:
+            return np.linspace(0, 1, len(dates))
+
+        if spacing == "linear":
+            return (dates - dates[0]) / total
+
+        if spacing == "log":
+            remaining = np.log1p((dates[-1] - dates) / log_unit)
+            return 1 - remaining / np.log1p(total / log_unit)
+
+        raise Exception("Expecting 'linear' or 'log' spacing only")
+
+    def get_proportions(self) -> "ndarray":
+        return self.proportions
+
+    def get_date_index(self, date: float) -> int:
+        """
+        index of the last entry at or before 'date'
+        """
+        index = bisect.bisect_right(self.dates, date) - 1
+        if index < 0:
+            raise Exception(f"{date} is before the first date")
+
+        return index
+
+    def get_time_index(self, target_time) -> int:
+        if isinstance(target_time, str):
+            return super().get_time_index(target_time)
+
+        return self.get_date_index(target_time)
+
+    def get_range(self, start: float, end: float) -> range:
+        """
+        indices of the entries dated between 'start' and 'end', both included
+        """
+        return range(
+            bisect.bisect_left(self.dates, start), bisect.bisect_right(self.dates, end)
+        )
+
+    def get_visible_range(self, buff: float = 0) -> range:
+        """
+        indices of the entries whose dots are inside the
+        frame (grown by 'buff') where the line is now
+        """
+        line = self.get_line()
+        start, end = line.get_start(), line.get_end()
+
+        axis = end - start
+        length = np.linalg.norm(axis)
+        unit = axis / length
+
+        # the frame projected on the line, in proportions of the line
+        center = np.dot(ORIGIN - start, unit)
+        extent = np.dot(np.abs(unit[:2]), self.frame_size + buff)
+        low, high = (center - extent) / length, (center + extent) / length
+
+        return range(
+            bisect.bisect_left(self.proportions, low),
+            bisect.bisect_right(self.proportions, high),
+        )
+
+    def get_visible_entries(self, buff: float = 0) -> list:
+        """
+        (date, time) of every entry inside the frame
+        """
+        return [
+            (self.dates[index], self.get_time(index))
+            for index in self.get_visible_range(buff)
+        ]
+
+    def seek(self, target_time, lag_ratio: float = 0.2) -> AnimationGroup:
+        """
+        scroll from the current entry to 'target_time' (a time or a date)
+        in a single animation, writing every time in between
+        """
+        target_index = self.get_time_index(target_time)
+        current_index = max(self.index_reference["dots"] - 1, 0)
+
+        if target_index <= current_index:
+            raise Exception(f"{target_time} is not after the current time")
+
+        positions = self.get_positions()
+        scroll = self.directions["scroll"] * abs(
+            positions[current_index] - positions[target_index]
+        )
+
+        # the current time is the first one until the first scroll
+        if self.index_reference["times"] <= 1:
+            self._attach_to_dot(self.get_current_time(), self.get_dot(0))
+
+        new_indices = range(self.index_reference["times"], target_index + 1)
+        new_times = [self.get_time(index) for index in new_indices]
+
+        self.index_reference["dots"] = target_index + 1
+        self.index_reference["times"] = target_index + 1
+
+        writes = LaggedStart(*[Write(time) for time in new_times], lag_ratio=lag_ratio)
+
+        if self.rigid_scroll:
+            scroll_group = VGroup(self.line, self.dots, *self.attached_times)
+
+            # written next to their dots, the scroll moves them after every frame
+            for index, time in zip(new_indices, new_times):
+                self._attach_to_dot(time, self.get_dot(index))
+
+            return AnimationGroup(
+                writes,
+                Scroll(scroll_group, scroll, followers=new_times, run_time=writes.run_time),
+            )
+
+        for index, time in zip(new_indices, new_times):
+            self._attach_to_dot(time, self.get_dot(index))
+
+        animations = [
+            self.line.animate.shift(scroll),
+            self.dots.animate.shift(scroll),
+            writes,
+        ]
+
+        return AnimationGroup(*animations)
+
+
+class Scroll(Animation):
+    """
+    shifts 'mobject' by 'vector' as a single rigid group, a frame
+    costs one shift of its points whatever it contains
+
+    followers: mobjects that another animation of the same play rewrites
+    on every frame (Write), after it they are shifted by the whole offset
+    so far. Scroll must go after that animation in the AnimationGroup
+    """
+
+    def __init__(
+        self, mobject: Mobject, vector: "ndarray", followers: list = None, **kwargs
+    ):
+        self.vector = np.array(vector, dtype=float)
+        self.followers = list(followers or [])
+        self.offset = np.zeros(3)
+        super().__init__(mobject, **kwargs)
+
+    def create_starting_mobject(self) -> Mobject:
+        # nothing is interpolated from a copy of the group
+        return Mobject()
+
+    def begin(self) -> None:
+        self.offset = np.zeros(3)
+        super().begin()
+
+        # a follower inside the group would be shifted twice
+        family = set(self.mobject.get_family())
+        self.followers = [
+            follower for follower in self.followers if follower not in family
+        ]
+
+    def get_all_mobjects(self) -> list:
+        return [self.mobject]
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        offset = self.rate_func(alpha) * self.vector
+
+        self.mobject.shift(offset - self.offset)
+        self.offset = offset
+
+        for follower in self.followers:
+            follower.shift(offset)
+
 
 class PTex(Tex):
     def __init__(
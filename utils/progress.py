@@ -0,0 +1,334 @@
+"""
+    Live progress of the renders.
+
+    The 'progress' scene wrapper (see scene_wrappers) makes every render
+    write json lines to <report dir>/<render name>.jsonl while it runs:
+
+        {"event": "progress", "scene": "BC3000", "animation": 12,
+         "frames": 1520, "total_frames": 3400, "animation_frames": 40,
+         "animation_total": 90, "fps": 24.3, "eta": 77.4, "time": ...}
+
+    'total_frames' comes from the last render of the same scene and
+    grows with the animations started when they add up to more (always
+    the first time). ProgressDashboard follows those files from the
+    runner and draws one line per render, typing the name (or number)
+    of a render and enter cancels it.
+"""
+import sys
+import json
+import time
+import threading
+
+from pathlib import Path
+from collections import deque
+
+
+# seconds of samples used to measure the current frames per second
+FPS_WINDOW = 5.0
+
+# seconds between two progress events of a render
+EVENT_INTERVAL = 0.5
+
+
+def read_last_event(path, event=None):
+    """
+        last json line of 'path' (whose 'event' is 'event' when given), None without one
+    """
+    last = None
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if event is None or message.get("event") == event:
+                    last = message
+    except OSError:
+        return None
+    return last
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressWriter(object):
+    """
+        side of the events that runs inside the render, the scene
+        tells it when animations start and when frames are added
+    """
+
+    def __init__(self, path, scene_name, frame_rate, interval=EVENT_INTERVAL):
+        self.path = Path(path)
+        self.scene_name = scene_name
+        self.frame_rate = frame_rate
+        self.interval = interval
+
+        previous = read_last_event(self.path, "done")
+        self.total_frames = previous["frames"] if previous else None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, 'w', encoding="utf-8")
+
+        # frames of the animations already finished
+        self.finished_frames = 0
+        self.animation = None
+        self.animation_total = 0
+        self.animation_start = 0.0
+        self.current_time = 0.0
+        self.last_event = 0.0
+        # (wall time, frames) of the last FPS_WINDOW seconds
+        self.samples = deque()
+
+        self.emit("start", force=True)
+
+    def get_animation_frames(self):
+        frames = round((self.current_time - self.animation_start) * self.frame_rate)
+        return max(0, min(self.animation_total, frames))
+
+    def get_frames(self):
+        return self.finished_frames + self.get_animation_frames()
+
+    def start_animation(self, index, frames, scene_time):
+        """
+            frames: <int> frames the animation writes, 0 when it's skipped
+        """
+        self.finished_frames += self.animation_total
+        self.animation = index
+        self.animation_total = frames
+        self.animation_start = self.current_time = scene_time
+        # the frames of the animations started so far are a lower bound
+        # of the total, the only one of a first render, and they pass
+        # the last render's total when the scene got longer
+        self.total_frames = max(self.total_frames or 0, self.finished_frames + frames) or None
+        self.emit("animation", force=True)
+
+    def update(self, scene_time):
+        self.current_time = scene_time
+        self.emit("progress")
+
+    def finish(self, status="done"):
+        self.finished_frames += self.animation_total
+        self.animation_total = 0
+        self.emit(status, force=True)
+        self.file.close()
+
+    def get_fps(self, now, frames):
+        self.samples.append((now, frames))
+        while len(self.samples) > 2 and now - self.samples[0][0] > FPS_WINDOW:
+            self.samples.popleft()
+        elapsed = now - self.samples[0][0]
+        if elapsed <= 0:
+            return None
+        return (frames - self.samples[0][1]) / elapsed
+
+    def emit(self, event, force=False):
+        now = time.time()
+        if not force and now - self.last_event < self.interval:
+            return
+        self.last_event = now
+
+        frames = self.get_frames()
+        fps = self.get_fps(now, frames)
+        eta = None
+        if fps and self.total_frames:
+            eta = max(0, self.total_frames - frames) / fps
+
+        message = {
+            "event": event,
+            "scene": self.scene_name,
+            "animation": self.animation,
+            "frames": frames,
+            "total_frames": self.total_frames,
+            "animation_frames": self.get_animation_frames(),
+            "animation_total": self.animation_total,
+            "fps": fps,
+            "eta": eta,
+            "time": now,
+        }
+        if self.file.closed:
+            return
+        self.file.write(json.dumps(message) + "\n")
+        self.file.flush()
+
+
+class CommandReader(object):
+    """
+        reads what is typed in the terminal, a single thread per process
+        whatever the amount of dashboards, the lines go to the one shown
+    """
+
+    def __init__(self):
+        self.dashboard = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def attach(self, dashboard):
+        with self._lock:
+            self.dashboard = dashboard
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._read, daemon=True)
+                self._thread.start()
+
+    def detach(self, dashboard):
+        with self._lock:
+            if self.dashboard is dashboard:
+                self.dashboard = None
+
+    def _read(self):
+        for line in sys.stdin:
+            with self._lock:
+                dashboard = self.dashboard
+            if dashboard is not None:
+                dashboard.run_command(line.strip())
+
+
+# reader shared by the dashboards of the process
+command_reader = CommandReader()
+
+
+class ProgressDashboard(object):
+    """
+        report_dir: <str or Path> folder the renders write their events to
+        cancel: <callable> receives the name of a render to cancel
+        is_running: <callable> False for a render that stopped without
+            saying so (killed), those leave the table
+        stream: <file> where the dashboard is drawn
+    """
+
+    def __init__(self, report_dir, cancel=None, is_running=None, interval=1.0,
+                 stream=None):
+        self.report_dir = Path(report_dir)
+        self.cancel = cancel
+        self.is_running = is_running
+        self.interval = interval
+        self.stream = stream or sys.stdout
+
+        # render name: last event
+        self.renders = {}
+        # path: offset read so far
+        self._offsets = {}
+        self._drawn_lines = 0
+        self._started = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._started = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        if self.cancel and sys.stdin and sys.stdin.isatty():
+            command_reader.attach(self)
+        return self
+
+    def stop(self):
+        command_reader.detach(self)
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.poll()
+        if self.renders:
+            self.draw()
+
+    def poll(self):
+        """
+            reads the events written since the last poll
+        """
+        if not self.report_dir.is_dir():
+            return
+        for path in self.report_dir.glob("*.jsonl"):
+            try:
+                if path.stat().st_mtime < self._started:
+                    continue
+                offset = self._offsets.get(path, 0)
+                if path.stat().st_size < offset:
+                    # the render started again, the file was truncated
+                    offset = 0
+                with open(path, encoding="utf-8") as f:
+                    f.seek(offset)
+                    lines = f.readlines()
+                    # a line being written is read on the next poll
+                    if lines and not lines[-1].endswith("\n"):
+                        lines.pop()
+                    self._offsets[path] = offset + sum(len(line.encode("utf-8")) for line in lines)
+            except OSError:
+                continue
+
+            for line in lines:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if message.get("time", 0) >= self._started:
+                    self.renders[path.stem] = message
+
+    def get_running(self):
+        return {
+            name: message for name, message in self.renders.items()
+            if message["event"] not in ("done", "failed") and
+            (self.is_running is None or self.is_running(name))
+        }
+
+    def get_lines(self):
+        running = self.get_running()
+        done = len(self.renders) - len(running)
+
+        etas = [message["eta"] for message in running.values() if message["eta"] is not None]
+        slowest = max(etas) if len(etas) > 1 else None
+
+        lines = [f"{'':>3} {'render':<26}{'anim':>5}{'frames':>14}{'fps':>8}{'eta':>9}"]
+        for number, (name, message) in enumerate(sorted(running.items()), start=1):
+            total = message["total_frames"]
+            frames = f"{message['frames']}/{total if total else '?'}"
+            fps = f"{message['fps']:.1f}" if message["fps"] else "-"
+            mark = " <" if slowest is not None and message["eta"] == slowest else ""
+            animation = message["animation"] if message["animation"] is not None else "-"
+            lines.append(
+                f"{number:>3} {name:<26}{animation:>5}{frames:>14}{fps:>8}"
+                f"{format_seconds(message['eta']):>9}{mark}"
+            )
+        lines.append(f"    {len(running)} rendering, {done} done")
+        return lines
+
+    def draw(self):
+        lines = self.get_lines()
+        if self.stream.isatty() and self._drawn_lines:
+            # back to the first line of the last drawing and clear it
+            self.stream.write(f"\x1b[{self._drawn_lines}F\x1b[J")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._drawn_lines = len(lines)
+
+    def get_render_name(self, command):
+        """
+            render name from what was typed, its name or its number in the table
+        """
+        running = sorted(self.get_running())
+        if command.isdigit() and 0 < int(command) <= len(running):
+            return running[int(command) - 1]
+        return command
+
+    def run_command(self, command):
+        """
+            cancels the render typed in the terminal
+        """
+        if command:
+            self.cancel(self.get_render_name(command))
+            self._drawn_lines = 0
+
+    def _run(self):
+        # a terminal is redrawn in place, logs get one table now and then
+        interval = self.interval if self.stream.isatty() else self.interval * 10
+        while not self._stop.wait(interval):
+            self.poll()
+            if self.renders:
+                self.draw()
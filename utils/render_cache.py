@@ -0,0 +1,154 @@
+"""
+    Fingerprints of rendered scenes, a scene is rendered again
+    only when something it depends on has changed.
+"""
+import json
+import threading
+
+from pathlib import Path
+
+from utils import scene_parser
+from utils.render_process import save_entries
+
+
+# args that change how manim behaves but not the rendered video
+IGNORED_ARGS = {
+    "-p", "--preview",
+    "-f", "--show_in_file_browser",
+    "--disable_caching", "--flush_cache",
+}
+
+
+# entry of every file that keeps the hash of each symbol of the last build
+SYMBOLS_KEY = "__symbols__"
+
+
+def normalize_args(args):
+    return sorted(arg for arg in args if arg not in IGNORED_ARGS)
+
+
+class RenderCache(object):
+    """
+        keeps, for every scene file, the fingerprint of the last
+        successful render of each video of a scene, one per quality
+        (the drafts and the finals of a progressive run both stay fresh):
+
+        {'/abs/path/main.py': {'BC3000': {'renders': {'.../480p15/BC3000.mp4': ...}}}}
+    """
+
+    def __init__(self, cache_path):
+        self.cache_path = Path(cache_path)
+        self.reader = scene_parser.DependencyReader()
+        self._lock = threading.Lock()
+        self._entries = self.load()
+
+    def refresh(self):
+        """
+            forget the parsed sources, files may have changed since
+        """
+        self.reader = scene_parser.DependencyReader()
+
+    def load(self):
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        # runners of other scene files may share the cache, the
+        # symbol hashes of a file are merged too
+        with self._lock:
+            self._entries = save_entries(self.cache_path, self._entries, depth=4)
+
+    def get_fingerprint(self, file_path, scene_name, args, symbols=None,
+                        include_assets=True):
+        """
+            hash of the scene source, its base classes, the module and
+            preset definitions it uses, the asset files it references
+            and the quality args
+
+            symbols: <set> dependencies of the scene when they are
+                already known (see scene_parser.SceneGraph)
+            include_assets: <bool> False hashes only the code and the args
+        """
+        file_path = Path(file_path).resolve()
+        if symbols is None:
+            symbols = self.reader.get_dependencies((file_path, scene_name))
+        return self.hash_parts(file_path, symbols, args, include_assets=include_assets)
+
+    def get_segment_fingerprint(self, file_path, scene_name, method_name,
+                                segment_methods, args):
+        """
+            like get_fingerprint but only with the parts of the class a
+            segment uses, editing a segment method invalidates only it
+        """
+        file_path = Path(file_path).resolve()
+        sources, symbols = self.reader.get_segment_dependencies(
+            file_path, scene_name, method_name, segment_methods)
+        return self.hash_parts(file_path, symbols, args, extra_parts=sources)
+
+    def hash_parts(self, file_path, symbols, args, extra_parts=(), include_assets=True):
+        parts = [
+            f"{Path(module_file).name}:{name}:{self.reader.get_symbol_hash((module_file, name))}"
+            for module_file, name in symbols
+        ]
+        parts.extend(
+            f"source:{scene_parser.hash_bytes(part.encode('utf-8'))}"
+            for part in extra_parts
+        )
+
+        assets_dir = file_path.parent / "assets"
+        assets = self.reader.get_asset_files(symbols, [assets_dir]) if include_assets else []
+        for asset in assets:
+            relative = asset.relative_to(assets_dir).as_posix()
+            parts.append(f"asset:{relative}:{scene_parser.hash_file(asset)}")
+
+        parts.append("args:" + " ".join(normalize_args(args)))
+
+        return scene_parser.hash_bytes("\n".join(sorted(parts)).encode("utf-8"))
+
+    def get_entry(self, file_path, scene_name):
+        file_entries = self._entries.get(str(Path(file_path).resolve()), {})
+        return file_entries.get(scene_name)
+
+    def get_changed_symbols(self, file_path, symbol_hashes):
+        """
+            symbol_hashes: <dict> {'presets.TimeLine': hash}
+            returns the labels whose hash differs from the last build
+        """
+        previous = self.get_entry(file_path, SYMBOLS_KEY)
+        if previous is None:
+            return set()
+        return {
+            label for label, symbol_hash in symbol_hashes.items()
+            if previous.get(label) != symbol_hash
+        }
+
+    def update_symbols(self, file_path, symbol_hashes):
+        with self._lock:
+            file_entries = self._entries.setdefault(
+                str(Path(file_path).resolve()), {})
+            file_entries.setdefault(SYMBOLS_KEY, {}).update(symbol_hashes)
+
+    def is_fresh(self, file_path, scene_name, fingerprint):
+        """
+            True when a video of the scene was rendered with the same
+            fingerprint (the quality args are part of it) and it's
+            still on disk
+        """
+        renders = (self.get_entry(file_path, scene_name) or {}).get("renders", {})
+        return any(
+            render_fingerprint == fingerprint and Path(video).exists()
+            for video, render_fingerprint in renders.items()
+        )
+
+    def update(self, file_path, scene_name, fingerprint, video_path):
+        with self._lock:
+            file_entries = self._entries.setdefault(
+                str(Path(file_path).resolve()), {})
+            entry = file_entries.setdefault(scene_name, {})
+            # a video has the fingerprint of its last render
+            entry.setdefault("renders", {})[str(video_path)] = fingerprint
@@ -0,0 +1,350 @@
+"""
+    Runs render commands as subprocesses and measures them.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import subprocess
+
+from pathlib import Path
+from collections import deque
+
+
+STDERR_TAIL_LINES = 20
+
+# niceness of the processes started with a lower cpu priority
+LOW_PRIORITY = 10
+
+# failures of the machine rather than of the scene, another attempt may work
+TRANSIENT_ERRORS = (
+    "MemoryError", "Cannot allocate memory", "BrokenPipeError",
+    "Resource temporarily unavailable", "warm worker exited",
+)
+
+# errors of the scene itself, every attempt fails the same way
+PERMANENT_ERRORS = (
+    "LaTeX Error", "latex error", "FileNotFoundError", "No such file or directory",
+    "SyntaxError", "NameError", "AttributeError", "TypeError", "ValueError",
+    "KeyError", "IndexError", "ImportError",
+)
+
+
+class RenderError(Exception):
+    def __init__(self, result):
+        self.result = result
+        super().__init__(
+            f"{result.scene_name} exited with code {result.exit_code}")
+
+
+class RenderCancelled(RenderError):
+    def __init__(self, result):
+        super().__init__(result)
+        self.args = (f"{result.scene_name} was cancelled",)
+
+
+def get_low_priority_kwargs():
+    """
+        Popen kwargs that start the process with a lower cpu priority,
+        only on windows: elsewhere lower_priority is called once it started
+        (preexec_fn isn't safe in a process running threads)
+    """
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.BELOW_NORMAL_PRIORITY_CLASS}
+    return {}
+
+
+def lower_priority(process):
+    """
+        lowers the cpu priority of a started 'process', the processes
+        it starts afterwards (ffmpeg) inherit it
+    """
+    if sys.platform == "win32":
+        # started with BELOW_NORMAL_PRIORITY_CLASS already
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, process.pid, LOW_PRIORITY)
+    except OSError:
+        # it already exited
+        pass
+
+
+class SceneResult(object):
+    """
+        outcome of a single scene render
+    """
+
+    def __init__(self, scene_name, command=None, status="rendered",
+                 exit_code=0, wall_time=0.0, cpu_time=None, peak_rss=None,
+                 stderr_tail=None, output_path=None, startup_time=None):
+        self.scene_name = scene_name
+        self.command = command or []
+        # 'rendered', 'stitched', 'failed', 'cancelled' or 'cached'
+        self.status = status
+        self.exit_code = exit_code
+        self.wall_time = wall_time
+        # both are None where the platform can't measure them
+        self.cpu_time = cpu_time
+        self.peak_rss = peak_rss
+        self.stderr_tail = stderr_tail or []
+        self.output_path = output_path
+        # time spent before rendering (interpreter, imports), only
+        # measured apart from wall_time by the warm backend
+        self.startup_time = startup_time
+
+    @property
+    def succeeded(self):
+        return self.status not in ("failed", "cancelled")
+
+    def to_dict(self):
+        return {
+            "scene": self.scene_name,
+            "command": [str(part) for part in self.command],
+            "status": self.status,
+            "exit_code": self.exit_code,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "stderr_tail": self.stderr_tail,
+            "output_path": str(self.output_path) if self.output_path else None,
+            "startup_time": self.startup_time,
+        }
+
+    def __repr__(self):
+        return (f"SceneResult({self.scene_name!r}, status={self.status!r}, "
+                f"exit_code={self.exit_code}, wall_time={self.wall_time:.2f})")
+
+
+def is_transient_failure(result):
+    """
+        True when 'result' failed in a way another attempt may not (killed,
+        out of memory, ffmpeg died), False for errors of the scene such
+        as a LaTeX error or a missing asset
+    """
+    if result.exit_code is not None and result.exit_code < 0:
+        # killed by a signal, the oom killer or a closed terminal
+        return True
+    text = "\n".join(result.stderr_tail)
+    if any(error in text for error in TRANSIENT_ERRORS):
+        return True
+    if any(error in text for error in PERMANENT_ERRORS):
+        return False
+    # any other exception raised by the scene is a bug of the scene
+    return "Traceback" not in text
+
+
+def _rusage_to_bytes(max_rss):
+    # linux reports kilobytes, macOS reports bytes
+    if sys.platform == "darwin":
+        return max_rss
+    return max_rss * 1024
+
+
+def run_process(scene_name, command, echo=True, tail_lines=STDERR_TAIL_LINES,
+                on_start=None, **popen_kwargs):
+    """
+        runs 'command' until it exits, stderr is forwarded to the
+        console when 'echo' and its last lines are kept in the result
+
+        on_start: <callable> receives the Popen object once started
+    """
+    tail = deque(maxlen=tail_lines)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [str(part) for part in command],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        errors="replace",
+        **popen_kwargs
+    )
+
+    if on_start:
+        on_start(process)
+
+    def read_stderr():
+        for line in process.stderr:
+            tail.append(line.rstrip("\n"))
+            if echo:
+                sys.stderr.write(line)
+
+    reader = threading.Thread(target=read_stderr, daemon=True)
+    reader.start()
+
+    cpu_time = peak_rss = None
+    exit_code = None
+    if hasattr(os, "wait4"):
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
+        except ChildProcessError:
+            # reaped by Popen first (a cancel polls the process before
+            # signaling it), its resource usage is lost
+            pass
+        else:
+            # kept apart from process.returncode, a poll of another
+            # thread sets it to 0 once the pid is gone
+            exit_code = os.waitstatus_to_exitcode(status)
+            process.returncode = exit_code
+            cpu_time = usage.ru_utime + usage.ru_stime
+            peak_rss = _rusage_to_bytes(usage.ru_maxrss)
+    if exit_code is None:
+        exit_code = process.wait()
+
+    wall_time = time.perf_counter() - start
+    reader.join()
+    process.stderr.close()
+
+    return SceneResult(
+        scene_name,
+        command=command,
+        status="rendered" if exit_code == 0 else "failed",
+        exit_code=exit_code,
+        wall_time=wall_time,
+        cpu_time=cpu_time,
+        peak_rss=peak_rss,
+        stderr_tail=list(tail),
+    )
+
+
+def parse_bytes(size):
+    """
+        '8G', '512M', '1.5GB' or a number of bytes -> <int> bytes
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    text = str(size).strip().upper().rstrip("B")
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(float(text))
+
+
+class MemoryHistory(object):
+    """
+        peak memory of the last render of every scene, by quality
+        since the frame size changes it:
+
+        {'/abs/path/main.py': {'BC3000@1080p60': 1288490188}}
+    """
+
+    def __init__(self, history_path):
+        self.history_path = Path(history_path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(history_path) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def get_key(scene_name, quality_folder):
+        return f"{scene_name}@{quality_folder}"
+
+    def get(self, file_path, scene_name, quality_folder):
+        file_entries = self._entries.get(str(file_path), {})
+        return file_entries.get(MemoryHistory.get_key(scene_name, quality_folder))
+
+    def update(self, file_path, scene_name, quality_folder, peak_rss):
+        with self._lock:
+            file_entries = self._entries.setdefault(str(file_path), {})
+            file_entries[MemoryHistory.get_key(scene_name, quality_folder)] = peak_rss
+
+    def save(self):
+        # runners of other projects may share the history
+        with self._lock:
+            self._entries = save_entries(self.history_path, self._entries)
+
+
+def merge_entries(saved, entries, depth=2):
+    """
+        updates 'saved' with 'entries', the dicts of both are merged
+        'depth' levels deep and replaced below that
+    """
+    for key, value in entries.items():
+        if depth > 1 and isinstance(value, dict) and isinstance(saved.get(key), dict):
+            merge_entries(saved[key], value, depth - 1)
+        else:
+            saved[key] = value
+    return saved
+
+
+def save_entries(path, entries, removed=(), depth=2):
+    """
+        writes the json 'entries' to 'path' merged with what other
+        processes saved there since they were loaded, under a lock of
+        the file so no writer drops the entries of another. Returns
+        the merged entries.
+
+        removed: <iterable> of key tuples deleted since the last save,
+            deleted from the saved file too
+        depth: <int> levels of dicts merged (see merge_entries)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_suffix(".lock"), 'w') as lock_file:
+        if sys.platform != "win32":
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+
+        for keys in removed:
+            parent = saved
+            for key in keys[:-1]:
+                parent = parent.get(key, {})
+            parent.pop(keys[-1], None)
+        merge_entries(saved, entries, depth)
+
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'w') as f:
+            json.dump(saved, f, indent=2)
+        os.replace(temp_path, path)
+    # the lock is released when its file is closed
+    return saved
+
+
+def format_bytes(size):
+    if size is None:
+        return "-"
+    for unit in ["B", "KB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.0f}{unit}"
+        size /= 1024
+    return f"{size:.1f}TB"
+
+
+def format_report(results):
+    """
+        results: <list> of SceneResult, slowest first
+    """
+    # the startup column only shows up when a backend measured it
+    show_startup = any(result.startup_time is not None for result in results)
+
+    header = f"{'scene':<24}{'status':<10}{'code':>5}{'wall':>9}{'cpu':>9}{'rss':>9}"
+    if show_startup:
+        header += f"{'startup':>9}"
+    lines = [header, "-" * len(header)]
+
+    for result in sorted(results, key=lambda r: r.wall_time, reverse=True):
+        cpu = f"{result.cpu_time:.1f}s" if result.cpu_time is not None else "-"
+        line = (
+            f"{result.scene_name:<24}{result.status:<10}{result.exit_code:>5}"
+            f"{result.wall_time:>8.1f}s{cpu:>9}{format_bytes(result.peak_rss):>9}"
+        )
+        if show_startup:
+            startup = f"{result.startup_time:.1f}s" if result.startup_time is not None else "-"
+            line += f"{startup:>9}"
+        lines.append(line)
+
+    for result in results:
+        if not result.succeeded and result.stderr_tail:
+            lines.append(f"\n[{result.scene_name}] last stderr lines:")
+            lines.extend("    " + line for line in result.stderr_tail)
+
+    return "\n".join(lines)
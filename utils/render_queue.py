@@ -0,0 +1,398 @@
+"""
+    Render jobs kept in a sqlite file, so a build can be stopped (or
+    the machine restarted) and resumed without rendering again what
+    was already done.
+
+    ManimRunner.submit adds the scenes that need a render, any number of
+    workers (other terminals, or machines sharing the folder) drain it:
+
+        python -m utils.render_queue work path/to/render_queue.db
+        python -m utils.render_queue status path/to/render_queue.db
+
+    A worker claims a job inside a write transaction, so two workers
+    never get the same job. While rendering it renews a lease, when a
+    worker dies its job goes back to the queue once the lease expires.
+    Sharing the file between machines needs a filesystem with working
+    file locks (sqlite's requirement).
+"""
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import traceback
+
+from pathlib import Path
+
+from utils.render_process import RenderError, SceneResult, STDERR_TAIL_LINES
+
+
+# seconds a claimed job belongs to a worker without a heartbeat
+DEFAULT_LEASE = 60
+
+# seconds between polls of a worker waiting for jobs
+DEFAULT_POLL = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT UNIQUE NOT NULL,
+    file TEXT NOT NULL,
+    scene TEXT NOT NULL,
+    args TEXT NOT NULL,
+    media_dir TEXT NOT NULL,
+    cwd TEXT,
+    fingerprint TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    submitted REAL,
+    started REAL,
+    finished REAL,
+    wall_time REAL,
+    cpu_time REAL,
+    peak_rss INTEGER,
+    exit_code INTEGER,
+    stderr_tail TEXT
+)
+"""
+
+# 'pending', 'running', 'done' or 'failed'
+STATUSES = ("pending", "running", "done", "failed")
+
+
+def get_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def is_process_alive(pid):
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        # os.kill would terminate it, assume it's alive and let the lease expire
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_job_key(file_path, scene_name, args, fingerprint):
+    """
+        same scene, args and sources is the same job, submitting
+        it again doesn't render it twice
+    """
+    return json.dumps([str(file_path), scene_name, list(args), fingerprint])
+
+
+class RenderQueue(object):
+    """
+        queue_path: <str or Path> sqlite file, created when missing
+    """
+
+    def __init__(self, queue_path):
+        self.queue_path = Path(queue_path)
+        self.queue_path.parent.mkdir(parents=True, exist_ok=True)
+        # autocommit, transactions are opened explicitly
+        self.connection = sqlite3.connect(
+            str(self.queue_path), timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def submit(self, file_path, scene_name, args, media_dir, cwd=None,
+               fingerprint=None, priority=0):
+        """
+            adds a job, a job submitted before keeps its status
+            unless it failed, failed jobs are queued again
+        """
+        self.connection.execute(
+            """
+            INSERT INTO jobs (key, file, scene, args, media_dir, cwd,
+                              fingerprint, priority, submitted)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET status = 'pending', worker = NULL
+            WHERE status = 'failed'
+            """,
+            (get_job_key(file_path, scene_name, args, fingerprint),
+             str(file_path), scene_name, json.dumps(list(args)), str(media_dir),
+             str(cwd) if cwd else None, fingerprint, priority, time.time())
+        )
+        return self.get_job(get_job_key(file_path, scene_name, args, fingerprint))
+
+    def claim(self, worker_id, lease=DEFAULT_LEASE):
+        """
+            next pending job (or one whose worker stopped renewing
+            its lease) now owned by 'worker_id', None when empty
+        """
+        now = time.time()
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.connection.execute(
+                """
+                SELECT * FROM jobs
+                WHERE status = 'pending' OR (status = 'running' AND lease_until < ?)
+                ORDER BY priority, id LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row is None:
+                self.connection.execute("COMMIT")
+                return None
+
+            self.connection.execute(
+                """
+                UPDATE jobs SET status = 'running', worker = ?, lease_until = ?,
+                                started = ?, attempts = attempts + 1
+                WHERE id = ?
+                """,
+                (worker_id, now + lease, now, row["id"])
+            )
+            self.connection.execute("COMMIT")
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        return self.get_job(row["key"])
+
+    def heartbeat(self, job_id, worker_id, lease=DEFAULT_LEASE):
+        """
+            extends the lease, False when the job is no longer owned by 'worker_id'
+        """
+        cursor = self.connection.execute(
+            """
+            UPDATE jobs SET lease_until = ?
+            WHERE id = ? AND worker = ? AND status = 'running'
+            """,
+            (time.time() + lease, job_id, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def finish(self, job_id, worker_id, result):
+        """
+            result: <SceneResult> of the render
+        """
+        self.connection.execute(
+            """
+            UPDATE jobs SET status = ?, finished = ?, wall_time = ?, cpu_time = ?,
+                            peak_rss = ?, exit_code = ?, stderr_tail = ?,
+                            lease_until = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+            """,
+            ("done" if result.succeeded else "failed", time.time(),
+             result.wall_time, result.cpu_time, result.peak_rss, result.exit_code,
+             json.dumps(result.stderr_tail), job_id, worker_id)
+        )
+
+    def release_dead_workers(self):
+        """
+            jobs of workers of this machine whose process is gone go back
+            to the queue now, without waiting for their lease (after a
+            restart), returns the amount of released jobs
+        """
+        released = 0
+        prefix = f"{socket.gethostname()}-"
+        for job in self.get_jobs("running"):
+            worker = job["worker"] or ""
+            pid = worker[len(prefix):]
+            if not worker.startswith(prefix) or not pid.isdigit():
+                continue
+            if is_process_alive(int(pid)):
+                continue
+            cursor = self.connection.execute(
+                """
+                UPDATE jobs SET status = 'pending', worker = NULL, lease_until = NULL
+                WHERE id = ? AND worker = ? AND status = 'running'
+                """,
+                (job["id"], worker)
+            )
+            released += cursor.rowcount
+        return released
+
+    def retry_failed(self):
+        cursor = self.connection.execute(
+            "UPDATE jobs SET status = 'pending', worker = NULL WHERE status = 'failed'")
+        return cursor.rowcount
+
+    def get_job(self, key):
+        row = self.connection.execute(
+            "SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def get_jobs(self, status=None):
+        if status:
+            rows = self.connection.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY id", (status,))
+        else:
+            rows = self.connection.execute("SELECT * FROM jobs ORDER BY id")
+        return [dict(row) for row in rows]
+
+    def get_counts(self):
+        counts = dict.fromkeys(STATUSES, 0)
+        for row in self.connection.execute(
+                "SELECT status, COUNT(*) AS amount FROM jobs GROUP BY status"):
+            counts[row["status"]] = row["amount"]
+        return counts
+
+    def is_drained(self):
+        counts = self.get_counts()
+        return counts["pending"] == 0 and counts["running"] == 0
+
+
+def render_job(job):
+    """
+        renders a claimed job in a media folder of its own, the
+        video is moved to the media folder of the job afterwards
+    """
+    # imported here, video_utils imports this module
+    from utils.video_utils import ManimRunner
+
+    args = json.loads(job["args"])
+    runner = ManimRunner(
+        {job["scene"]: args}, job["file"],
+        output_dir=Path(job["media_dir"]), use_cache=False)
+    runner.cwd = job["cwd"]
+
+    media_dir = Path(job["media_dir"]) / "workers" / f"queue_{get_worker_id()}"
+    result = None
+    try:
+        result = runner.run_scene(job["scene"], args, media_dir=media_dir)
+        runner.collect_worker_video(job["scene"], args, media_dir)
+    except RenderError as error:
+        return error.result
+    except FileNotFoundError as error:
+        # raised by run_scene when manim can't be started, by
+        # collect_worker_video when the render left no video
+        if result is None:
+            result = SceneResult(job["scene"], status="failed", exit_code=1)
+        result.status = "failed"
+        result.stderr_tail.append(str(error))
+    return result
+
+
+def work(queue_path, worker_id=None, lease=DEFAULT_LEASE,
+         poll_interval=DEFAULT_POLL, wait=False):
+    """
+        renders jobs until the queue is drained, with 'wait' it keeps
+        polling for new jobs instead. Returns the amount of rendered jobs.
+    """
+    worker_id = worker_id or get_worker_id()
+    queue = RenderQueue(queue_path)
+    rendered = 0
+
+    released = queue.release_dead_workers()
+    if released:
+        print(f"[QUEUE INFO] {released} jobs of stopped workers queued again")
+
+    try:
+        while True:
+            job = queue.claim(worker_id, lease)
+            if job is None:
+                # jobs running in other workers may come back
+                # to the queue if their lease expires
+                if not wait and queue.is_drained():
+                    return rendered
+                time.sleep(poll_interval)
+                continue
+
+            print(f"[QUEUE INFO] {worker_id} rendering {job['scene']} "
+                  f"(attempt {job['attempts']})")
+
+            stop = threading.Event()
+
+            def renew(job_id=job["id"]):
+                # sqlite connections belong to the thread that opened them
+                heartbeat_queue = RenderQueue(queue_path)
+                try:
+                    while not stop.wait(lease / 3):
+                        try:
+                            owned = heartbeat_queue.heartbeat(job_id, worker_id, lease)
+                        except sqlite3.OperationalError as error:
+                            # the file is locked by another worker (or the
+                            # share is unavailable), the lease still has
+                            # time left for the next attempt
+                            print(f"[QUEUE WARNING] {worker_id} could not renew "
+                                  f"the lease of job {job_id}: {error}")
+                            continue
+                        if not owned:
+                            print(f"[QUEUE WARNING] {worker_id} lost the lease of job {job_id}")
+                            return
+                finally:
+                    heartbeat_queue.close()
+
+            heartbeat = threading.Thread(target=renew, daemon=True)
+            heartbeat.start()
+            try:
+                result = render_job(job)
+            except Exception:
+                traceback.print_exc()
+                result = SceneResult(
+                    job["scene"], status="failed", exit_code=1,
+                    stderr_tail=traceback.format_exc().splitlines()[-STDERR_TAIL_LINES:])
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            queue.finish(job["id"], worker_id, result)
+            rendered += 1
+    finally:
+        queue.close()
+
+
+def format_status(queue):
+    counts = queue.get_counts()
+    lines = [", ".join(f"{status}: {counts[status]}" for status in STATUSES)]
+    for job in queue.get_jobs():
+        wall = f"{job['wall_time']:.1f}s" if job["wall_time"] is not None else "-"
+        lines.append(
+            f"{job['scene']:<24}{job['status']:<9}{job['attempts']:>3}"
+            f"{wall:>9}  {job['worker'] or '-'}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    work_parser = commands.add_parser("work", help="render jobs of the queue")
+    work_parser.add_argument("queue")
+    work_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE)
+    work_parser.add_argument("--wait", action="store_true",
+                             help="keep waiting for jobs once the queue is drained")
+
+    status_parser = commands.add_parser("status", help="print the jobs of the queue")
+    status_parser.add_argument("queue")
+
+    retry_parser = commands.add_parser("retry", help="queue the failed jobs again")
+    retry_parser.add_argument("queue")
+
+    options = parser.parse_args(argv)
+
+    if options.command == "work":
+        rendered = work(options.queue, lease=options.lease, wait=options.wait)
+        print(f"[QUEUE INFO] Rendered {rendered} jobs")
+        return 0
+
+    queue = RenderQueue(options.queue)
+    try:
+        if options.command == "retry":
+            print(f"[QUEUE INFO] {queue.retry_failed()} jobs queued again")
+        print(format_status(queue))
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
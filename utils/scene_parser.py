@@ -0,0 +1,559 @@
+"""
+    Static reading of manim scene files.
+
+    Everything here works on the source code through 'ast', the scene
+    module (and so manim) is never imported. The scenes of a file can
+    be listed, or selected by the files a commit changed, in milliseconds:
+
+        python -m utils.scene_parser list statistics_history/main.py
+        python -m utils.scene_parser affected statistics_history/main.py \\
+            --changed $(git diff --name-only main)
+"""
+import ast
+import sys
+import json
+import hashlib
+import argparse
+
+from pathlib import Path
+
+
+# files that may be read as dependencies of a scene
+SOURCE_EXT = ".py"
+
+# manim classes a scene inherits from, directly or through other scenes
+SCENE_BASES = {
+    "Scene", "MovingCameraScene", "GraphScene", "ZoomedScene",
+    "ThreeDScene", "SpecialThreeDScene", "VectorScene",
+    "LinearTransformationScene",
+}
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModuleSource(object):
+    """
+        top level definitions and local imports of a python file
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.source = self.path.read_text(encoding="utf-8")
+        self.tree = ast.parse(self.source, filename=str(self.path))
+
+        # name: ast node of the top level class, function or assignment
+        self.definitions = {}
+        # alias: module file, such as 'presets': .../utils/presets.py
+        self.module_imports = {}
+        # name: (module file, name in that module)
+        self.name_imports = {}
+
+        self._read_tree()
+
+    def _read_tree(self):
+        for node in self.tree.body:
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.definitions[node.name] = node
+
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name in ast.walk(target):
+                        if isinstance(name, ast.Name):
+                            self.definitions[name.id] = node
+
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    module_file = self.find_module(alias.name)
+                    if module_file:
+                        self.module_imports[alias.asname or alias.name] = module_file
+
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                for alias in node.names:
+                    local_name = alias.asname or alias.name
+                    # from utils import presets
+                    module_file = self.find_module(f"{node.module}.{alias.name}")
+                    if module_file:
+                        self.module_imports[local_name] = module_file
+                        continue
+                    # from custom import Clock
+                    module_file = self.find_module(node.module)
+                    if module_file and alias.name != "*":
+                        self.name_imports[local_name] = (module_file, alias.name)
+
+    def search_dirs(self):
+        """
+            folders where the scene files look for local modules,
+            its own folder and the parent one (see the sys.path
+            hack at the top of every scene file)
+        """
+        return [self.path.parent, self.path.parent.parent]
+
+    def find_module(self, dotted_name):
+        relative = Path(*dotted_name.split("."))
+        for folder in self.search_dirs():
+            candidate = folder / relative.with_suffix(SOURCE_EXT)
+            if candidate.is_file():
+                return candidate.resolve()
+        return None
+
+    def get_source(self, name):
+        node = self.definitions[name]
+        return ast.get_source_segment(self.source, node) or ast.dump(node)
+
+    def get_class_bases(self, name):
+        """
+            names of the direct bases of the class 'name'
+        """
+        node = self.definitions.get(name)
+        if not isinstance(node, ast.ClassDef):
+            return []
+        return [get_dotted_name(base) for base in node.bases]
+
+
+def get_dotted_name(node):
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return f"{get_dotted_name(node.value)}.{node.attr}"
+    return ast.dump(node)
+
+
+def get_string_literals(node):
+    literals = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Constant) and isinstance(child.value, str):
+            literals.add(child.value)
+    return literals
+
+
+class DependencyReader(object):
+    """
+        resolves every definition a scene class needs to be rendered:
+        its own source, its base classes, module level names and
+        definitions imported from local modules (presets, configs...)
+
+        symbols are (module file, name) tuples
+    """
+
+    def __init__(self):
+        # module file: ModuleSource, modules are parsed only once
+        self._modules = {}
+
+    def get_module(self, path):
+        path = Path(path).resolve()
+        if path not in self._modules:
+            self._modules[path] = ModuleSource(path)
+        return self._modules[path]
+
+    def get_direct_dependencies(self, symbol):
+        module_file, name = symbol
+        module = self.get_module(module_file)
+        return self.get_node_dependencies(module, module.definitions[name], name)
+
+    def get_node_dependencies(self, module, node, name=None):
+        """
+            symbols used inside 'node', 'name' is skipped so a
+            definition does not depend on itself
+        """
+        dependencies = set()
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and child.id != name:
+                dependencies |= self.resolve_name(module, child.id)
+
+            elif (isinstance(child, ast.Attribute) and
+                    isinstance(child.value, ast.Name) and
+                    child.value.id in module.module_imports):
+                imported = self.get_module(module.module_imports[child.value.id])
+                if child.attr in imported.definitions:
+                    dependencies.add((imported.path, child.attr))
+
+        return dependencies
+
+    def resolve_name(self, module, name):
+        if name in module.definitions:
+            return {(module.path, name)}
+        if name in module.name_imports:
+            module_file, imported_name = module.name_imports[name]
+            if imported_name in self.get_module(module_file).definitions:
+                return {(Path(module_file), imported_name)}
+        return set()
+
+    def get_dependencies(self, symbol):
+        """
+            symbol plus all the symbols it needs, recursively
+        """
+        symbol = (Path(symbol[0]).resolve(), symbol[1])
+        return self.get_closure({symbol})
+
+    def get_closure(self, symbols):
+        seen = set(symbols)
+        pending = list(symbols)
+        while pending:
+            current = pending.pop()
+            for dependency in self.get_direct_dependencies(current):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    pending.append(dependency)
+        return seen
+
+    def get_class_method(self, module, class_name, method_name):
+        """
+            FunctionDef of 'method_name' in 'class_name' or in
+            the first local base class that defines it
+        """
+        node = module.definitions.get(class_name)
+        if not isinstance(node, ast.ClassDef):
+            return None
+        for child in node.body:
+            if isinstance(child, ast.FunctionDef) and child.name == method_name:
+                return child
+        for base in module.get_class_bases(class_name):
+            method = self.get_class_method(module, base, method_name)
+            if method:
+                return method
+        return None
+
+    def get_segment_methods(self, file_path, class_name, decorator="end_with_fadeout"):
+        """
+            methods decorated with 'decorator' in the order construct
+            calls them: Conclusions -> ['scene_dot_plot', ..., 'scene_box_plot']
+        """
+        module = self.get_module(file_path)
+        construct = self.get_class_method(module, class_name, "construct")
+        if construct is None:
+            return []
+
+        methods = []
+        seen = set()
+        for node in ast.walk(construct):
+            if not (isinstance(node, ast.Call) and
+                    isinstance(node.func, ast.Attribute) and
+                    isinstance(node.func.value, ast.Name) and
+                    node.func.value.id == "self"):
+                continue
+
+            method = self.get_class_method(module, class_name, node.func.attr)
+            decorators = [get_dotted_name(d) for d in getattr(method, "decorator_list", [])]
+            if decorator in decorators and method.name not in seen:
+                seen.add(method.name)
+                methods.append((node.lineno, node.col_offset, method.name))
+
+        return [name for _, _, name in sorted(methods)]
+
+    def get_segment_dependencies(self, file_path, class_name, method_name, segment_methods):
+        """
+            what a single segment of 'class_name' depends on: the class
+            without the other segment methods plus 'method_name'
+
+            returns (sources, symbols), the sources of the class parts
+            and the closure of the symbols they use
+        """
+        module = self.get_module(file_path)
+        class_node = module.definitions[class_name]
+        skipped = set(segment_methods) - {method_name}
+
+        nodes = [class_node.bases, *class_node.decorator_list] + [
+            child for child in class_node.body
+            if not (isinstance(child, ast.FunctionDef) and child.name in skipped)
+        ]
+
+        sources = [f"class {class_name}"]
+        symbols = set()
+        for node in nodes:
+            if isinstance(node, list):
+                sources.append(" ".join(get_dotted_name(base) for base in node))
+                for base in node:
+                    symbols |= self.get_node_dependencies(module, base, class_name)
+                continue
+            sources.append(ast.get_source_segment(module.source, node) or ast.dump(node))
+            symbols |= self.get_node_dependencies(module, node, class_name)
+
+        return sources, self.get_closure(symbols)
+
+    def get_symbol_source(self, symbol):
+        return self.get_module(symbol[0]).get_source(symbol[1])
+
+    def get_symbol_hash(self, symbol):
+        return hash_bytes(self.get_symbol_source(symbol).encode("utf-8"))
+
+    def get_asset_files(self, symbols, assets_dirs):
+        """
+            asset files referenced by string literals
+            inside the source of 'symbols'
+        """
+        literals = set()
+        for module_file, name in symbols:
+            module = self.get_module(module_file)
+            literals |= get_string_literals(module.definitions[name])
+
+        assets = set()
+        for assets_dir in assets_dirs:
+            assets |= match_assets(literals, assets_dir)
+        return assets
+
+
+def list_assets(assets_dir):
+    assets_dir = Path(assets_dir)
+    if not assets_dir.is_dir():
+        return {}
+    return {
+        path.relative_to(assets_dir).as_posix(): path
+        for path in assets_dir.rglob("*") if path.is_file()
+    }
+
+
+def match_assets(literals, assets_dir):
+    """
+        literals look like '.\\history\\4_farming.jfif', 'jose.jpg' or
+        '/assets/svg/UIS.svg' (the constant part of an f-string)
+    """
+    assets = list_assets(assets_dir)
+    matches = set()
+    for literal in literals:
+        cleaned = literal.replace("\\", "/").strip()
+        if "assets/" in cleaned:
+            cleaned = cleaned.rsplit("assets/", 1)[1]
+        cleaned = cleaned.lstrip("./")
+        if not cleaned or "." not in cleaned.split("/")[-1]:
+            continue
+
+        for relative, path in assets.items():
+            if relative == cleaned or relative.endswith("/" + cleaned):
+                matches.add(path)
+    return matches
+
+
+def get_symbol_label(symbol):
+    """
+        (.../utils/presets.py, 'TimeLine') -> 'presets.TimeLine'
+    """
+    return f"{Path(symbol[0]).stem}.{symbol[1]}"
+
+
+class SceneGraph(object):
+    """
+        dependency graph of the scenes of a file: every scene points to
+        the classes it inherits from and to the module, presets and
+        configs definitions it uses (directly or through its bases)
+    """
+
+    def __init__(self, file_path, scene_names, reader=None):
+        self.file_path = Path(file_path).resolve()
+        self.reader = reader or DependencyReader()
+        self.module = self.reader.get_module(self.file_path)
+
+        self.scene_names = [
+            name for name in scene_names if name in self.module.definitions
+        ]
+        # scene: every symbol it depends on, itself included
+        self.dependencies = {
+            name: self.reader.get_dependencies((self.file_path, name))
+            for name in self.scene_names
+        }
+
+    def get_symbol_hashes(self):
+        """
+            {'presets.TimeLine': hash} of every symbol used by the scenes
+        """
+        symbols = set().union(*self.dependencies.values()) if self.dependencies else set()
+        return {
+            get_symbol_label(symbol): self.reader.get_symbol_hash(symbol)
+            for symbol in symbols
+        }
+
+    def get_base_chain(self, scene_name):
+        """
+            classes of this file that 'scene_name' inherits from,
+            closest first: BC3000 -> ['AncientTime', 'FirstChapter']
+        """
+        chain = []
+        pending = self.module.get_class_bases(scene_name)
+        while pending:
+            base = pending.pop(0)
+            if base in self.module.definitions and base not in chain:
+                chain.append(base)
+                pending.extend(self.module.get_class_bases(base))
+        return chain
+
+    def get_depth(self, scene_name):
+        return len(self.get_base_chain(scene_name))
+
+    def get_affected(self, changed_labels):
+        """
+            scenes downstream of any of the 'changed_labels'
+            ('presets.TimeLine', 'main.Biblia', ...)
+        """
+        changed_labels = set(changed_labels)
+        return [
+            scene for scene in self.scene_names
+            if changed_labels & {get_symbol_label(s) for s in self.dependencies[scene]}
+        ]
+
+    def get_order(self, scene_names=None):
+        """
+            'scene_names' sorted so base classes come before the
+            scenes inheriting from them
+        """
+        scene_names = self.scene_names if scene_names is None else scene_names
+        return sorted(scene_names, key=lambda name: (
+            self.get_depth(name) if name in self.dependencies else 0
+        ))
+
+
+class SceneInfo(object):
+    """
+        a scene class found by discover_scenes
+
+        bases: <list> classes it inherits from up to the manim one,
+            closest first: BC3000 -> ['AncientTime', 'FirstChapter', 'MovingCameraScene']
+        assets: <list> files of the assets folder its code references
+        modules: <list> source files of everything it depends on
+    """
+
+    def __init__(self, name, file_path, lineno, bases, assets, modules):
+        self.name = name
+        self.file_path = file_path
+        self.lineno = lineno
+        self.bases = bases
+        self.assets = assets
+        self.modules = modules
+
+    @property
+    def scene_base(self):
+        return self.bases[-1]
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "file": str(self.file_path),
+            "line": self.lineno,
+            "bases": self.bases,
+            "assets": [str(asset) for asset in self.assets],
+            "modules": [str(module) for module in self.modules],
+        }
+
+    def __repr__(self):
+        return f"SceneInfo({self.name!r}, bases={self.bases!r})"
+
+
+def get_scene_chain(reader, module, class_name, seen=None):
+    """
+        bases of 'class_name' up to the manim scene class, following
+        classes of the same file and of local modules, None when it
+        doesn't inherit from any of SCENE_BASES
+    """
+    seen = seen or set()
+    if (module.path, class_name) in seen:
+        return None
+    seen.add((module.path, class_name))
+
+    for base in module.get_class_bases(class_name):
+        if isinstance(module.definitions.get(base), ast.ClassDef):
+            chain = get_scene_chain(reader, module, base, seen)
+            if chain is not None:
+                return [base] + chain
+
+        elif base in module.name_imports:
+            module_file, imported_name = module.name_imports[base]
+            chain = get_scene_chain(reader, reader.get_module(module_file), imported_name, seen)
+            if chain is not None:
+                return [base] + chain
+
+        # 'Scene' from 'from manim import *' or 'manim.Scene'
+        if base.rsplit(".", 1)[-1] in SCENE_BASES:
+            return [base.rsplit(".", 1)[-1]]
+
+    return None
+
+
+def discover_scenes(file_path, reader=None):
+    """
+        every scene class defined in 'file_path', in the order of the file,
+        as SceneInfo. Base scenes (FirstChapter) are scenes too.
+    """
+    file_path = Path(file_path).resolve()
+    reader = reader or DependencyReader()
+    module = reader.get_module(file_path)
+    assets_dir = file_path.parent / "assets"
+
+    scenes = []
+    for node in module.tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = get_scene_chain(reader, module, node.name)
+        if bases is None:
+            continue
+
+        symbols = reader.get_dependencies((file_path, node.name))
+        scenes.append(SceneInfo(
+            node.name, file_path, node.lineno, bases,
+            assets=sorted(reader.get_asset_files(symbols, [assets_dir])),
+            modules=sorted({Path(module_file) for module_file, _ in symbols}),
+        ))
+    return scenes
+
+
+def select_scenes(scenes, changed_files):
+    """
+        names of the 'scenes' (SceneInfo) that use any of 'changed_files',
+        a module counts as used as a whole: changing a preset selects
+        every scene that uses any definition of presets.py
+    """
+    changed_files = {Path(path).resolve() for path in changed_files}
+    return [
+        scene.name for scene in scenes
+        if changed_files & (set(scene.modules) | set(scene.assets))
+    ]
+
+
+def format_scenes(scenes):
+    lines = []
+    for scene in scenes:
+        lines.append(f"{scene.name:<28}{' -> '.join(scene.bases)}")
+        lines.extend(f"    {asset.name}" for asset in scene.assets)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="print the scenes of a file")
+    list_parser.add_argument("file")
+    list_parser.add_argument("--json", action="store_true",
+                             help="print the scenes, their bases and assets as json")
+
+    affected_parser = commands.add_parser(
+        "affected", help="print the scenes that use any of the changed files")
+    affected_parser.add_argument("file")
+    affected_parser.add_argument("--changed", nargs="*", default=[],
+                                 help="changed files, such as the output of git diff --name-only")
+
+    options = parser.parse_args(argv)
+    scenes = discover_scenes(options.file)
+
+    if options.command == "affected":
+        print("\n".join(select_scenes(scenes, options.changed)))
+        return 0
+
+    if options.json:
+        print(json.dumps([scene.to_dict() for scene in scenes], indent=2))
+    else:
+        print(format_scenes(scenes))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
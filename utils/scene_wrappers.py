@@ -0,0 +1,453 @@
+"""
+    Builds variations of the scenes of a file without editing it.
+
+    ManimRunner writes a small module that calls build_scene for every
+    variation it needs, manim then renders that module as any other
+    scene file. Wrappers are referenced by name so the spec can be
+    written to that module (or sent to another process) as plain data:
+
+        build_scene("ft_form/main.py", "Conclusions",
+                    [["segment", {"methods": [...], "index": 3}]],
+                    name="ConclusionsPart03", module=__name__)
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+import importlib.util
+
+from pathlib import Path
+
+
+# scene file: imported module, every file is imported only once
+_modules = {}
+
+
+def load_scene_module(file_path):
+    """
+        imports the scene file the same way manim does, its
+        folder is added to sys.path so local imports work
+    """
+    file_path = Path(file_path).resolve()
+    if file_path in _modules:
+        return _modules[file_path]
+
+    for folder in [file_path.parent, file_path.parent.parent]:
+        if str(folder) not in sys.path:
+            sys.path.insert(0, str(folder))
+
+    path_hash = hashlib.md5(str(file_path).encode("utf-8")).hexdigest()[:8]
+    module_name = f"_godofredo_{file_path.stem}_{path_hash}"
+
+    spec = importlib.util.spec_from_file_location(module_name, file_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    _modules[file_path] = module
+    return module
+
+
+def set_skipping(scene, skip):
+    """
+        toggles manim's animation skipping, skipped animations update
+        the mobjects but don't write frames. The renderer restores
+        _original_skipping_status on every play so both are set.
+    """
+    scene.renderer.skip_animations = skip
+    scene.renderer._original_skipping_status = skip
+
+
+def segment_scene(scene_class, methods, index):
+    """
+        methods: <list> names of the segment methods (scene_dot_plot,
+            scene_histogram...) in the order construct calls them
+        index: <int> 0 renders what construct does before the first
+            segment, n renders methods[n - 1] until the next segment
+
+        construct runs completely, everything outside the unit runs
+        with skipped animations so the unit starts with the same state
+        (self.title, self.ignore_mobs...) it has in the full scene.
+        Segments after the unit are not executed.
+    """
+
+    class Segment(scene_class):
+        def setup(self):
+            super().setup()
+            set_skipping(self, index != 0)
+
+    def make_wrapper(method_name, position):
+        method = getattr(scene_class, method_name)
+
+        def wrapper(self, *args, **kwargs):
+            if position > index:
+                set_skipping(self, True)
+                return None
+            set_skipping(self, position != index)
+            return method(self, *args, **kwargs)
+
+        wrapper.__name__ = method_name
+        return wrapper
+
+    for position, method_name in enumerate(methods, start=1):
+        setattr(Segment, method_name, make_wrapper(method_name, position))
+
+    return Segment
+
+
+def instrument_scene(scene_class, report_dir):
+    """
+        times every play (and so every wait) call, the timings are
+        written to report_dir/<scene name>.json once construct ends
+    """
+
+    class Instrumented(scene_class):
+        def setup(self):
+            super().setup()
+            self._play_timings = []
+            self._construct_start = time.perf_counter()
+
+        def play(self, *args, **kwargs):
+            scene_time = getattr(self.renderer, "time", 0)
+            start = time.perf_counter()
+
+            super().play(*args, **kwargs)
+
+            self._play_timings.append({
+                "index": len(self._play_timings),
+                "wall_time": time.perf_counter() - start,
+                # seconds of video produced by this call
+                "duration": getattr(self.renderer, "time", 0) - scene_time,
+                "skipped": bool(getattr(self.renderer, "skip_animations", False)),
+            })
+
+        def tear_down(self):
+            super().tear_down()
+            report_path = Path(report_dir) / f"{type(self).__name__}.json"
+            report_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(report_path, 'w') as f:
+                json.dump({
+                    "construct_time": time.perf_counter() - self._construct_start,
+                    "plays": self._play_timings,
+                }, f, indent=2)
+
+    return Instrumented
+
+
+class FfmpegSubprocess(object):
+    """
+        stands in for the 'subprocess' module of manim's scene_file_writer,
+        the commands it starts go through 'transforms' first:
+        functions(command) -> command
+    """
+
+    def __init__(self):
+        self.transforms = []
+
+    def __getattr__(self, name):
+        return getattr(subprocess, name)
+
+    def Popen(self, command, *args, **kwargs):
+        for transform in list(self.transforms):
+            command = transform(list(command))
+        return subprocess.Popen(command, *args, **kwargs)
+
+
+def get_ffmpeg_subprocess():
+    """
+        FfmpegSubprocess installed in manim's scene_file_writer
+    """
+    from manim.scene import scene_file_writer
+
+    if not isinstance(scene_file_writer.subprocess, FfmpegSubprocess):
+        scene_file_writer.subprocess = FfmpegSubprocess()
+    return scene_file_writer.subprocess
+
+
+def is_movie_pipe(command):
+    # ffmpeg of a partial movie file, frames come as raw video from stdin
+    return "rawvideo" in command and "-" in command
+
+
+def set_output_args(command, args):
+    """
+        adds 'args' before the output file, the last item of manim's command
+    """
+    command[-1:-1] = args
+    return command
+
+
+def elide_holds(scene_class):
+    """
+        waits where nothing moves (manim marks them as static waits,
+        no updaters and no camera motion) write their frame once
+        instead of once per frame of the wait, ffmpeg repeats it so
+        the partial movie file has the same frames
+
+        the ffmpeg of every animation is started with its first frame
+        instead of when the animation begins, by then it's known
+        whether the animation is a hold
+    """
+
+    class HoldElision(scene_class):
+        def setup(self):
+            super().setup()
+            patch_hold_elision(self.renderer)
+
+    return HoldElision
+
+
+def patch_hold_elision(renderer):
+    ffmpeg_subprocess = get_ffmpeg_subprocess()
+
+    file_writer = renderer.file_writer
+    open_movie_pipe = file_writer.open_movie_pipe
+    write_frame = file_writer.write_frame
+    close_movie_pipe = file_writer.close_movie_pipe
+    freeze_current_frame = renderer.freeze_current_frame
+
+    # 'pending': kwargs of the ffmpeg not started yet, 'hold': frames of the hold
+    state = {"pending": None, "hold": 0}
+
+    def open_pending():
+        kwargs, state["pending"] = state["pending"], None
+        if state["hold"] <= 1:
+            open_movie_pipe(**kwargs)
+            return
+
+        loop = ["-vf", f"loop=loop={state['hold'] - 1}:size=1:start=0"]
+
+        def add_loop(command):
+            if is_movie_pipe(command):
+                set_output_args(command, loop)
+            return command
+
+        ffmpeg_subprocess.transforms.append(add_loop)
+        try:
+            open_movie_pipe(**kwargs)
+        finally:
+            ffmpeg_subprocess.transforms.remove(add_loop)
+            state["hold"] = 0
+
+    def deferred_open_movie_pipe(file_path=None):
+        # begin_animation: the path is resolved now, num_plays changes later
+        if file_path is None:
+            file_path = file_writer.partial_movie_files[renderer.num_plays]
+        state["pending"] = {"file_path": file_path}
+
+    def lazy_write_frame(frame):
+        if state["pending"] is not None:
+            open_pending()
+        write_frame(frame)
+
+    def lazy_close_movie_pipe():
+        # an animation without frames still gets its (empty) movie file
+        if state["pending"] is not None:
+            open_pending()
+        close_movie_pipe()
+
+    def single_frame_freeze(duration):
+        dt = 1 / renderer.camera.frame_rate
+        frames = int(duration / dt)
+        if renderer.skip_animations or frames <= 1 or state["pending"] is None:
+            return freeze_current_frame(duration)
+
+        state["hold"] = frames
+        start = renderer.time
+        renderer.add_frame(renderer.get_frame())
+        renderer.time = start + frames * dt
+
+    file_writer.open_movie_pipe = deferred_open_movie_pipe
+    file_writer.write_frame = lazy_write_frame
+    file_writer.close_movie_pipe = lazy_close_movie_pipe
+    renderer.freeze_current_frame = single_frame_freeze
+
+
+def encode_scene(scene_class, profile):
+    """
+        profile: <str or dict> see ffmpeg_utils.PROFILES
+
+        partial movie files are encoded with the codec, preset, crf,
+        threads and pixel format of 'profile' instead of manim's
+        defaults, the final video keeps them (manim stream copies it)
+    """
+    from utils import ffmpeg_utils
+
+    profile_args = ffmpeg_utils.get_profile_args(profile)
+    muxer_args = ffmpeg_utils.get_muxer_args(profile)
+
+    def apply_profile(command):
+        if is_movie_pipe(command):
+            # drop manim's codec and pixel format, after the input only
+            start = command.index("-i") + 2
+            output = command[start:-1]
+            kept = []
+            while output:
+                arg = output.pop(0)
+                if arg in ("-vcodec", "-c:v", "-pix_fmt", "-preset", "-crf", "-threads"):
+                    output.pop(0)
+                    continue
+                kept.append(arg)
+            return command[:start] + kept + profile_args + command[-1:]
+
+        if "concat" in command and command[-1].endswith(".mp4"):
+            # manim joining the partial movie files into the video
+            return set_output_args(command, list(muxer_args))
+        return command
+
+    class Encoded(scene_class):
+        def render(self, *args, **kwargs):
+            # the whole render, manim joins the partial files after tear_down
+            transforms = get_ffmpeg_subprocess().transforms
+            transforms.append(apply_profile)
+            try:
+                return super().render(*args, **kwargs)
+            finally:
+                transforms.remove(apply_profile)
+
+    return Encoded
+
+
+def report_progress(scene_class, report_dir):
+    """
+        writes the progress of the render (animation, frames, frames
+        per second, eta) to report_dir/<scene name>.jsonl while it
+        runs, see utils.progress
+    """
+    from utils.progress import ProgressWriter
+
+    class Progress(scene_class):
+        def setup(self):
+            super().setup()
+            renderer = self.renderer
+            self._progress = ProgressWriter(
+                Path(report_dir) / f"{type(self).__name__}.jsonl",
+                type(self).__name__, renderer.camera.frame_rate)
+
+            add_frame = renderer.add_frame
+
+            def counted_add_frame(*args, **kwargs):
+                add_frame(*args, **kwargs)
+                self._progress.update(renderer.time)
+
+            renderer.add_frame = counted_add_frame
+
+        def begin_animations(self):
+            super().begin_animations()
+            renderer = self.renderer
+            frames = 0
+            if not renderer.skip_animations:
+                frames = int(self.duration * renderer.camera.frame_rate)
+            self._progress.start_animation(renderer.num_plays, frames, renderer.time)
+
+        def render(self, *args, **kwargs):
+            try:
+                result = super().render(*args, **kwargs)
+            except BaseException:
+                if hasattr(self, "_progress"):
+                    self._progress.finish("failed")
+                raise
+            self._progress.finish()
+            return result
+
+    return Progress
+
+
+def get_checkpoints(folder):
+    """
+        (first animation without checkpoint, partial movie files of the
+        animations before it) of a checkpoint folder, see checkpoint_scene
+    """
+    folder = Path(folder)
+    files = []
+    index = 0
+    while True:
+        video = folder / f"{index:05d}.mp4"
+        if video.exists():
+            files.append(video)
+        elif not (folder / f"{index:05d}.skip").exists():
+            return index, files
+        index += 1
+
+
+def save_checkpoint(folder, index, partial_movie_file):
+    video = folder / f"{index:05d}.mp4"
+    if partial_movie_file is None or not Path(partial_movie_file).exists():
+        # the animation wrote nothing (skipped), resuming may skip it too
+        if not video.exists():
+            (folder / f"{index:05d}.skip").touch()
+        return
+
+    temp_path = folder / f"{index:05d}.tmp"
+    shutil.copyfile(partial_movie_file, temp_path)
+    os.replace(temp_path, video)
+
+
+def checkpoint_scene(scene_class, checkpoint_dir):
+    """
+        copies the partial movie file of every finished animation to
+        checkpoint_dir/<scene name>/<animation>.mp4, a render that dies
+        can start again from the first animation without one (manim's
+        -n) and the checkpoints are joined in front of what it renders.
+        Copies, because with --disable_caching manim writes the same
+        uncached_<animation> files again on every render.
+    """
+
+    class Checkpointed(scene_class):
+        def setup(self):
+            super().setup()
+            renderer = self.renderer
+            file_writer = renderer.file_writer
+            end_animation = file_writer.end_animation
+            folder = Path(checkpoint_dir) / type(self).__name__
+            folder.mkdir(parents=True, exist_ok=True)
+
+            def checkpointed_end_animation(*args, **kwargs):
+                end_animation(*args, **kwargs)
+                # num_plays grows once the animation ends
+                index = renderer.num_plays
+                partial_movie_files = file_writer.partial_movie_files
+                partial = partial_movie_files[index] if index < len(partial_movie_files) else None
+                save_checkpoint(folder, index, partial)
+
+            file_writer.end_animation = checkpointed_end_animation
+
+    return Checkpointed
+
+
+# name used in the spec: function(scene_class, **kwargs) -> scene class
+WRAPPERS = {
+    "segment": segment_scene,
+    "instrument": instrument_scene,
+    "hold": elide_holds,
+    "encode": encode_scene,
+    "progress": report_progress,
+    "checkpoint": checkpoint_scene,
+}
+
+
+def apply_wrappers(scene_class, wrappers):
+    for wrapper_name, kwargs in wrappers:
+        scene_class = WRAPPERS[wrapper_name](scene_class, **kwargs)
+    return scene_class
+
+
+def build_scene(file_path, scene_name, wrappers, name=None, module=None):
+    """
+        file_path: <str or Path> scene file
+        scene_name: <str> class inside that file
+        wrappers: <list> [[wrapper name, kwargs], ...] applied in order
+        name: <str> name of the resulting class, manim names the video after it
+        module: <str> module the class is registered in, manim only
+            renders classes defined in the module it imports
+    """
+    scene_class = getattr(load_scene_module(file_path), scene_name)
+    scene_class = apply_wrappers(scene_class, wrappers)
+
+    # a new class, so the original one is never renamed
+    return type(name or scene_name, (scene_class,), {
+        "__module__": module or scene_class.__module__,
+    })
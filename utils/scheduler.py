@@ -0,0 +1,158 @@
+"""
+    Small job scheduler used by ManimRunner to render in parallel.
+
+    Jobs run on a fixed amount of worker threads, a job starts once
+    all its dependencies are done and, among the ready jobs, the one
+    with the lowest priority value goes first.
+
+    With a memory budget a job also has to fit in the memory left by
+    the running ones, smaller ready jobs fill the gap meanwhile. A job
+    passed over as many times as there are workers reserves the next
+    start, so big scenes are not postponed forever.
+"""
+import threading
+
+
+class DependencyError(Exception):
+    pass
+
+
+class Job(object):
+    def __init__(self, name, func, dependencies=(), priority=0, order=0, memory=0):
+        """
+            func: <callable> receives the worker slot (<int>)
+            dependencies: <iterable> names of jobs that must succeed before
+            priority: <number> lower runs first
+            memory: <int> estimated peak memory in bytes
+        """
+        self.name = name
+        self.func = func
+        self.dependencies = set(dependencies)
+        self.priority = priority
+        self.order = order
+        self.memory = memory or 0
+        # times other jobs started first because this one didn't fit
+        self.skipped = 0
+
+        self.result = None
+        self.error = None
+        # 'pending', 'running', 'done', 'failed'
+        self.status = "pending"
+
+    def sort_key(self):
+        return (self.priority, self.order)
+
+
+class Scheduler(object):
+    def __init__(self, workers=1, memory_budget=None):
+        """
+            memory_budget: <int> bytes the running jobs may use
+                together, None doesn't limit them
+        """
+        self.workers = max(1, workers)
+        self.memory_budget = memory_budget
+        self.jobs = {}
+        self._condition = threading.Condition()
+        self._running = 0
+        self._memory_in_use = 0
+
+    def add(self, name, func, dependencies=(), priority=0, memory=0):
+        with self._condition:
+            self.jobs[name] = Job(
+                name, func, dependencies, priority, order=len(self.jobs),
+                memory=memory)
+            self._condition.notify_all()
+        return self.jobs[name]
+
+    def _is_finished(self, job):
+        return job.status in ("done", "failed")
+
+    def _next_job(self):
+        """
+            next ready job or None, jobs whose dependencies failed
+            are marked as failed without running
+        """
+        ready = []
+        for job in self.jobs.values():
+            if job.status != "pending":
+                continue
+
+            dependencies = [self.jobs.get(name) for name in job.dependencies]
+            if any(dependency is None or dependency.status == "failed"
+                   for dependency in dependencies):
+                job.status = "failed"
+                job.error = DependencyError(
+                    f"{job.name} skipped, a dependency failed or is missing")
+                self._condition.notify_all()
+                continue
+
+            if all(dependency.status == "done" for dependency in dependencies):
+                ready.append(job)
+
+        if not ready:
+            return None
+        ready.sort(key=Job.sort_key)
+        if self.memory_budget is None:
+            return ready[0]
+        return self._admit(ready)
+
+    def _admit(self, ready):
+        """
+            first ready job that fits in the memory left, a job bigger
+            than the whole budget runs when nothing else is running
+        """
+        free = self.memory_budget - self._memory_in_use
+        passed_over = []
+        for job in ready:
+            if job.memory <= free or self._running == 0:
+                for other in passed_over:
+                    other.skipped += 1
+                return job
+            if job.skipped >= self.workers:
+                # reserved, wait until the running jobs free its memory
+                return None
+            passed_over.append(job)
+        return None
+
+    def _all_finished(self):
+        return all(self._is_finished(job) for job in self.jobs.values())
+
+    def _work(self, slot):
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._all_finished():
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+                job.status = "running"
+                self._running += 1
+                self._memory_in_use += job.memory
+
+            try:
+                result = job.func(slot)
+                status, error = "done", None
+            except Exception as e:
+                # the caller reads job.error once run() returns
+                result, status, error = None, "failed", e
+
+            with self._condition:
+                job.result, job.status, job.error = result, status, error
+                self._running -= 1
+                self._memory_in_use -= job.memory
+                self._condition.notify_all()
+
+    def run(self):
+        """
+            blocks until every job finished, returns the jobs
+        """
+        threads = [
+            threading.Thread(target=self._work, args=(slot,), daemon=True)
+            for slot in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.jobs
@@ -1,19 +1,132 @@
 import traceback
 
 import os
+import re
+import sys
+import json
+import shlex
+import shutil
+import argparse
+import subprocess
+
+import time
+import tempfile
+import threading
 
 from pathlib import Path
+from functools import partial
+
+from utils import ffmpeg_utils, scene_parser, scene_wrappers, warm_render
+from utils.render_queue import RenderQueue
+from utils.scheduler import Scheduler
+from utils.scene_parser import SceneGraph, DependencyReader
+from utils.render_cache import RenderCache
+from utils.media_store import MediaStore
+from utils.progress import ProgressDashboard
+from utils.render_process import (
+    RenderError, RenderCancelled, SceneResult, MemoryHistory, run_process,
+    format_report, format_bytes, parse_bytes, get_low_priority_kwargs, lower_priority,
+    is_transient_failure
+)
+
+
+# folder that contains the utils package
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+# args that only open the video once it's rendered
+PREVIEW_ARGS = {"-p", "--preview", "-f", "--show_in_file_browser"}
+
+# manim quality: (flag letter, height, fps), lowest first
+QUALITIES = {
+    "low_quality": ("l", 480, 15),
+    "medium_quality": ("m", 720, 30),
+    "high_quality": ("h", 1080, 60),
+    "production_quality": ("p", 1440, 60),
+    "fourk_quality": ("k", 2160, 60),
+}
+
+# quality manim renders with when the args don't select one
+DEFAULT_QUALITY = "high_quality"
+
+QUALITY_ARGS = {
+    *(f"-q{flag}" for flag, _, _ in QUALITIES.values()),
+    *(f"--{quality}" for quality in QUALITIES),
+}
+
+# derived videos look like '720p30' or '480p15.gif' (see ManimRunner outputs)
+VARIANT_PATTERN = re.compile(r"^(\d+)p(\d+)(\.\w+)?$")
+
+# ffmpeg transcodes running at the same time, each one is multithreaded
+TRANSCODE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# 'cli' starts manim for every scene, 'warm' renders in
+# interpreters that stay alive between scenes (see warm_render)
+BACKENDS = {"cli", "warm"}
+
+# environment variable of the folder of prebuilt timelines, read by
+# presets.TimeLine.prebuilt (presets needs manim, this module doesn't)
+TIMELINE_CACHE_ENV = "GODOFREDO_TIMELINE_CACHE"
+
+# headroom over the peak memory of the last render of a scene
+MEMORY_MARGIN = 1.2
+
+# a dry pass (-s, every animation skipped) loads the images and
+# mobjects but never holds frames or an encoder, so it's scaled up
+DRY_PASS_MARGIN = 1.5
 
 
 class ManimRunner(object):
     def __init__(self,
-                 scenes, file_path, project_name=None, output_dir=None):
+                 scenes, file_path, project_name=None, output_dir=None,
+                 workers=1, use_cache=False, segments=False, backend="cli",
+                 outputs=None, profile=None, memory_budget=None,
+                 use_store=False, store_max_size=None, progress=False,
+                 checkpoint=False, retries=0):
         """
             scenes: <dict> look like: {'class_name': [arg1, arg2]}
             file_path: <str or Path>
             manim_args: <list> [manim raw args such as '-pql' or '-a'],
             output_dir: <str or Path> place where the media files for each scene will be stored
-
+            workers: <int> amount of scenes rendered at the same time,
+                each worker renders into its own media folder
+            use_cache: <bool> skip scenes whose source, presets, assets
+                and quality args did not change since the last render,
+                what the scene reads from elsewhere (network, environment,
+                files outside its assets) isn't part of the fingerprint
+            segments: <bool> split scenes whose construct calls methods
+                decorated with end_with_fadeout, every segment is rendered
+                on its own (and cached on its own) then stitched in order
+            backend: <str> 'cli' runs the manim command for every scene,
+                'warm' keeps one interpreter per worker with manim already
+                imported, scenes with args it can't map use the cli
+            outputs: <list> videos wanted for every scene, such as
+                ['1080p60', '720p30', '480p15', '720p30.webm', '480p15.gif'],
+                scenes are rendered once at the lowest manim quality that
+                covers all of them and the rest is transcoded from it
+            profile: <str or dict> encoding profile ('draft', 'web',
+                'archive', see ffmpeg_utils.PROFILES) of the rendered
+                videos, the derived mp4 and the concatenated video
+            memory_budget: <int or str> bytes (or '8G', '512M') the scenes
+                rendering at the same time may use together, every scene
+                is admitted with the peak memory of its last render (or
+                of a dry pass) and cheap scenes fill what's left
+            use_store: <bool> keep every rendered scene and segment in
+                output_dir/store by its cache fingerprint, identical renders
+                of any project are copied from there instead of rendered
+                (needs use_cache)
+            store_max_size: <int or str> bytes (or '20G') the store may
+                take, the least recently used videos are removed after a run
+            progress: <bool> renders report their animation, frames, speed
+                and eta to output_dir/progress and a dashboard shows them
+                instead of manim's output, typing the name (or number) of
+                a render and enter cancels it
+            checkpoint: <bool> keep the partial movie file of every finished
+                animation, a render that failed (in this run or an earlier
+                one) starts again from the first animation without one, as
+                long as the code of the scene and its args didn't change
+            retries: <int> attempts after a failure that may not happen
+                again (killed, out of memory), errors of the scene such as
+                LaTeX errors or missing assets fail right away
 
         """
         self.file_path = ManimRunner.read_path(file_path)
@@ -30,74 +143,1409 @@ class ManimRunner(object):
             self.output_dir /= project_name
             ManimRunner.create_folder(output_dir)
 
-        self.scenes = scenes
+        self.outputs = list(outputs or [])
+        for variant in self.outputs:
+            ManimRunner.parse_variant(variant)
+        self.scenes = {
+            scene: self.get_master_args(args) for scene, args in scenes.items()
+        }
+        self.workers = workers or 1
+        self.segments = segments
+
+        if profile:
+            ffmpeg_utils.get_profile(profile)
+        self.profile = profile
+
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {sorted(BACKENDS)}, not {backend!r}")
+        self.backend = backend
+        self._warm_pool = None
+
+        # render name: (scene name, wrappers), see scene_wrappers
+        self.wrapped_scenes = {}
+        # [[wrapper name, kwargs]] applied to every scene, see add_wrapper
+        self.scene_wrappers = []
+        # processes are started with a lower cpu priority
+        self.low_priority = False
+        # working directory of manim, None keeps the current one
+        self.cwd = None
+        # pickles of presets.TimeLine.prebuilt, kept with the videos
+        self.timeline_cache = Path(self.output_dir) / "timelines"
+
+        # render name: running Popen, used to cancel renders
+        self._processes = {}
+        self._cancelled = set()
+        self._process_lock = threading.Lock()
+
+        # scene name: SceneResult of the last run
+        self.results = {}
+
+        self.cache = None
+        if use_cache:
+            self.cache = RenderCache(Path(self.output_dir) / "render_cache.json")
 
-    def run_scenes(self):
+        self.store = None
+        self.store_max_size = parse_bytes(store_max_size) if store_max_size else None
+        if use_store:
+            if not use_cache:
+                raise ValueError("use_store needs use_cache, videos are stored by their fingerprint")
+            self.store = MediaStore(Path(self.output_dir) / "store")
+
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.retries = retries
+
+        self.memory_budget = parse_bytes(memory_budget) if memory_budget else None
+        self.memory_history = MemoryHistory(Path(self.output_dir) / "render_memory.json")
+        # scenes without memory history are measured with a dry pass
+        self.probe_memory = True
+
+        # options of from_discovery, watch mode uses them to pick up
+        # scenes added to (or removed from) the file
+        self.discovery = None
+
+    def run_scenes(self, workers=None):
+        scenes = self.prepare_run()
+        self.render_scenes(scenes, workers or self.workers)
+        return self.finish_run()
+
+    def prepare_run(self):
+        """
+            resets the state of the last run and returns the
+            scenes that need a render
+        """
         assert hasattr(self, 'scenes')
         # scenes meta has the name of the output folder where
         # are the videos of rendered scenes
         self._scenes_meta = {}
+        # scene name: {variant: path} of its derived videos
+        self._variants = {}
+        self._fingerprints = {}
+        # scene name: SceneResult of this run
+        self.results = {}
+        self.wrapped_scenes = {}
+
+        if self.cache:
+            self.cache.refresh()
+        self.graph = self.get_scene_graph()
+
+        if self.cache:
+            return self.skip_cached_scenes()
+        return self.scenes
+
+    def finish_run(self):
+        if self.outputs:
+            self.derive_variants()
+
+        if self.cache and self.graph:
+            self.cache.update_symbols(self.file_path, self.graph.get_symbol_hashes())
+
+        if self.cache:
+            self.cache.save()
+        self.memory_history.save()
+
+        if self.store:
+            self.store.save()
+            if self.store_max_size:
+                removed, freed = self.store.collect_garbage(self.store_max_size)
+                if removed:
+                    print(f"[RUNNER INFO] Removed {len(removed)} videos from the "
+                          f"media store, freed {format_bytes(freed)}")
+
+        # concatenate_videos follows the order of self.scenes
+        self._scenes_meta = {
+            scene: self._scenes_meta[scene]
+            for scene in self.scenes if scene in self._scenes_meta
+        }
+        self.results = {
+            **{scene: self.results[scene]
+               for scene in self.scenes if scene in self.results},
+            **self.results
+        }
+
+        print(self.get_report())
+        return self.results
+
+    def skip_cached_scenes(self):
+        """
+            returns the scenes that need to be rendered, the
+            ones up to date are only registered in _scenes_meta
+        """
+        if self.graph:
+            self.print_changes()
+
+        pending = {}
         for scene, args in self.scenes.items():
+            symbols = None
+            if self.graph and scene in self.graph.dependencies:
+                symbols = self.graph.dependencies[scene]
             try:
-                self.run_scene(scene, args)
-                self._scenes_meta.setdefault(
-                    scene,
-                    ManimRunner.get_media_output_folder(args)
-                )
+                fingerprint = self.cache.get_fingerprint(
+                    self.file_path, scene, self.get_cache_args(args), symbols=symbols)
             except Exception:
+                # can't read the scene source, let manim report it
                 traceback.print_exc()
+                pending[scene] = args
+                continue
+
+            self._fingerprints[scene] = fingerprint
+            if self.cache.is_fresh(self.file_path, scene, fingerprint):
+                print(f"[RUNNER INFO] {scene} is up to date, skipping render")
+                self.store_video(scene, fingerprint, args)
+            elif not self.restore_stored_video(scene, fingerprint, args):
+                pending[scene] = args
                 continue
 
-    def run_scene(self, scene_name, args):
+            self._scenes_meta.setdefault(
+                scene,
+                ManimRunner.get_media_output_folder(args)
+            )
+            self.results[scene] = SceneResult(
+                scene, status="cached",
+                output_path=self.get_video_path(scene, args)
+            )
+
+        return pending
+
+    def store_video(self, render_name, fingerprint, args):
+        """
+            keeps the video of 'render_name' in the media store
+        """
+        video_path = self.get_video_path(render_name, args)
+        if not self.store or not fingerprint or not video_path.exists():
+            return
+        self.store.put(fingerprint, video_path)
+        self.store.link(self.file_path, render_name, fingerprint, video_path)
+
+    def restore_stored_video(self, render_name, fingerprint, args):
+        """
+            copies the stored video with the same fingerprint where manim
+            would write the one of 'render_name', True when there was one
+        """
+        if not self.store or not fingerprint:
+            return False
+        video_path = self.get_video_path(render_name, args)
+        if not self.store.restore(fingerprint, video_path):
+            return False
+
+        print(f"[RUNNER INFO] {render_name} found in the media store, skipping render")
+        self.cache.update(self.file_path, render_name, fingerprint, video_path)
+        self.store.link(self.file_path, render_name, fingerprint, video_path)
+        return True
+
+    def on_scene_rendered(self, scene_name, args):
+        self._scenes_meta.setdefault(
+            scene_name,
+            ManimRunner.get_media_output_folder(args)
+        )
+
+        video_path = self.get_video_path(scene_name, args)
+        if self.cache and scene_name in self._fingerprints and video_path.exists():
+            self.cache.update(
+                self.file_path, scene_name,
+                self._fingerprints[scene_name], video_path
+            )
+            self.store_video(scene_name, self._fingerprints[scene_name], args)
+
+    @classmethod
+    def from_discovery(cls, file_path, args, include=None, exclude=None,
+                       changed_files=None, **kwargs):
+        """
+            runner of every scene class of 'file_path' rendered with 'args',
+            found without importing the file (see scene_parser.discover_scenes)
+
+            include: <list> only these scenes
+            exclude: <list> scenes left out, such as ['Test']
+            changed_files: <list> only the scenes that use any of these
+                files (the scene file, presets, assets...), such as the
+                files changed by a commit
+            kwargs: any other ManimRunner option
+        """
+        runner = cls({}, file_path, **kwargs)
+        runner.discovery = {
+            "args": list(args),
+            "include": include,
+            "exclude": exclude,
+            "changed_files": changed_files,
+        }
+        runner.scenes = runner.discover_scenes()
+        return runner
+
+    @classmethod
+    def from_command_line(cls, scenes, file_path, argv=None, **kwargs):
+        """
+            runner whose optional features are turned on by the command
+            line of the scene file, without flags it's the same as
+            ManimRunner(scenes, file_path, **kwargs):
+
+                python main.py --workers 4 --memory_budget 8G --checkpoint
+                python main.py --cache --segments --retries 1 --wrapper hold
+
+            argv: <list> defaults to sys.argv[1:]
+            kwargs: any other ManimRunner option
+        """
+        parser = argparse.ArgumentParser(description="renders the scenes of the file")
+        parser.add_argument("--cache", action="store_true",
+                            help="skip the scenes that didn't change since their last render")
+        parser.add_argument("--workers", type=int,
+                            help="amount of scenes rendered at the same time")
+        parser.add_argument("--memory_budget",
+                            help="memory the scenes rendering at the same time may use, such as 8G")
+        parser.add_argument("--checkpoint", action="store_true",
+                            help="resume failed renders after their last finished animation")
+        parser.add_argument("--retries", type=int,
+                            help="attempts after a failure that may not happen again")
+        parser.add_argument("--segments", action="store_true",
+                            help="render the segments of the scenes on their own")
+        parser.add_argument("--wrapper", action="append", default=[],
+                            choices=sorted(scene_wrappers.WRAPPERS),
+                            help="wrap every scene, such as 'hold' (repeatable)")
+        options = parser.parse_args(argv)
+
+        for name in ("workers", "memory_budget", "retries"):
+            if getattr(options, name) is not None:
+                kwargs[name] = getattr(options, name)
+        for name in ("checkpoint", "segments"):
+            if getattr(options, name):
+                kwargs[name] = True
+        if options.cache:
+            kwargs["use_cache"] = True
+
+        runner = cls(scenes, file_path, **kwargs)
+        for name in options.wrapper:
+            runner.add_wrapper(name)
+        return runner
+
+    def discover_scenes(self):
+        """
+            {scene: args} of the scenes of the file that match
+            the options given to from_discovery
+        """
+        options = self.discovery
+        found = scene_parser.discover_scenes(self.file_path)
+
+        names = [scene.name for scene in found]
+        if options["changed_files"] is not None:
+            names = scene_parser.select_scenes(found, options["changed_files"])
+        if options["include"] is not None:
+            names = [name for name in names if name in options["include"]]
+        if options["exclude"] is not None:
+            names = [name for name in names if name not in options["exclude"]]
+
+        return {name: self.get_master_args(list(options["args"])) for name in names}
+
+    def update_discovered_scenes(self):
+        """
+            looks for scenes added to or removed from the file since
+            the last discovery, removed scenes stop rendering
+        """
+        try:
+            scenes = self.discover_scenes()
+        except (OSError, SyntaxError):
+            # file being saved, it's read again on the next change
+            return
+
+        added = [scene for scene in scenes if scene not in self.scenes]
+        removed = [scene for scene in self.scenes if scene not in scenes]
+        if added:
+            print(f"[RUNNER INFO] New scenes: {', '.join(added)}")
+        if removed:
+            print(f"[RUNNER INFO] Removed scenes: {', '.join(removed)}")
+            for scene in removed:
+                self.cancel(scene)
+        self.scenes = scenes
+
+    def get_scene_graph(self):
+        """
+            SceneGraph of self.scenes, None when the file can't be parsed
+        """
+        reader = self.cache.reader if self.cache else DependencyReader()
+        try:
+            return SceneGraph(self.file_path, list(self.scenes), reader=reader)
+        except (OSError, SyntaxError):
+            traceback.print_exc()
+            return None
+
+    def print_changes(self):
+        """
+            prints which changed definitions invalidate which scenes
+        """
+        changed = self.cache.get_changed_symbols(
+            self.file_path, self.graph.get_symbol_hashes())
+        for label in sorted(changed):
+            affected = self.graph.get_affected([label])
+            print(f"[RUNNER INFO] {label} changed, affects: {', '.join(affected)}")
+
+    def get_scene_priority(self, scene_name):
+        """
+            base classes render first, errors in shared
+            code show up before the scenes inheriting it
+        """
+        if self.graph and scene_name in self.graph.dependencies:
+            return self.graph.get_depth(scene_name)
+        return 0
+
+    def render_scenes(self, scenes, workers):
+        """
+            render 'scenes' in dependency order using 'workers' at the
+            same time, with more than one worker every worker owns a
+            media folder (so Tex and partial movie files never collide)
+            and moves the final video to the shared output folder
+        """
+        # segments add jobs, so even a single scene can run in parallel
+        parallel = workers > 1
+
+        memory_budget = self.memory_budget if parallel else None
+        scheduler = Scheduler(workers if parallel else 1, memory_budget=memory_budget)
+        for scene, args in scenes.items():
+            methods = self.get_segment_methods(scene)
+            if methods:
+                self.add_segment_jobs(scheduler, scene, args, methods, parallel)
+                continue
+
+            wrappers = self.get_scene_wrappers()
+            if wrappers:
+                self.wrapped_scenes[scene] = (scene, wrappers)
+
+            scheduler.add(
+                scene,
+                partial(self.render_job, scene, args, parallel),
+                priority=self.get_scene_priority(scene),
+                memory=self.get_job_memory(scheduler, scene, args)
+            )
+
+        if self.wrapped_scenes:
+            self.write_wrapper_module()
+
+        dashboard = None
+        if self.progress:
+            dashboard = ProgressDashboard(
+                self.get_progress_dir(), cancel=self.cancel,
+                is_running=self.is_rendering).start()
+        try:
+            jobs = scheduler.run()
+        finally:
+            if dashboard:
+                dashboard.stop()
+
+        for scene, args in scenes.items():
+            error = jobs[scene].error
+            if error is None:
+                self.on_scene_rendered(scene, args)
+            elif isinstance(error, RenderError):
+                print(f"[RUNNER ERROR] {error}")
+            else:
+                traceback.print_exception(type(error), error, error.__traceback__)
+
+    def render_job(self, scene_name, args, use_worker_dir, slot):
+        file_path = None
+        if scene_name in self.wrapped_scenes:
+            file_path = self.get_wrapper_module_path()
+
+        if not use_worker_dir:
+            result = self.run_scene_attempts(scene_name, args, file_path=file_path, slot=slot)
+            self.record_memory(result, args)
+            return result
+
+        media_dir = self.get_worker_dir(slot)
+        result = self.run_scene_attempts(
+            scene_name, args, media_dir=media_dir, file_path=file_path, slot=slot)
+        self.record_memory(result, args)
+        self.collect_worker_video(scene_name, args, media_dir)
+        return result
+
+    def run_scene_attempts(self, scene_name, args, media_dir=None, file_path=None, slot=0):
+        """
+            run_scene again after transient failures (see retries), with
+            checkpoints every attempt starts after the last finished
+            animation and the result is joined with the checkpoints
+        """
+        attempt = 0
+        while True:
+            start, checkpoints = self.get_resume_point(scene_name, args)
+            resume_args = []
+            if start:
+                print(f"[RUNNER INFO] Resuming {scene_name} from animation {start}")
+                resume_args = ["-n", str(start)]
+
+            try:
+                result = self.run_scene(
+                    scene_name, [*args, *resume_args],
+                    media_dir=media_dir, file_path=file_path, slot=slot)
+            except RenderCancelled:
+                raise
+            except RenderError as error:
+                if attempt >= self.retries:
+                    raise
+                if not is_transient_failure(error.result):
+                    print(f"[RUNNER ERROR] {scene_name} failed with an error "
+                          f"of the scene, it won't be retried")
+                    raise
+                attempt += 1
+                print(f"[RUNNER WARNING] {error}, retrying "
+                      f"({attempt}/{self.retries})")
+                continue
+
+            if start:
+                self.join_checkpoints(scene_name, args, checkpoints, media_dir)
+            self.clear_checkpoints(scene_name)
+            return result
+
+    def get_checkpoint_dir(self):
+        path_hash = scene_parser.hash_bytes(
+            str(self.file_path).encode("utf-8"))[:10]
+        return Path(self.output_dir) / "checkpoints" / path_hash
+
+    def get_resume_key(self, scene_name, args):
+        """
+            checkpoints are valid while this doesn't change: the code of
+            the scene (of the whole scene for a segment) and the args.
+            Assets are left out, a render that failed for a missing
+            asset resumes once the asset is there.
+        """
+        scene_name = self.wrapped_scenes.get(scene_name, (scene_name,))[0]
+        cache = self.cache or RenderCache(Path(self.output_dir) / "render_cache.json")
+        return cache.get_fingerprint(
+            self.file_path, scene_name, self.get_cache_args(args), include_assets=False)
+
+    def get_resume_point(self, scene_name, args):
+        """
+            (animation to start from, checkpoint videos before it),
+            checkpoints of other code or args are thrown away
+        """
+        if not self.checkpoint or ManimRunner.has_animation_range(args):
+            return 0, []
+
+        folder = self.get_checkpoint_dir() / scene_name
+        key_path = folder / "key"
+        try:
+            key = self.get_resume_key(scene_name, args)
+        except Exception:
+            traceback.print_exc()
+            key = None
+
+        if not key or not key_path.exists() or key_path.read_text() != key:
+            self.clear_checkpoints(scene_name)
+            if key:
+                ManimRunner.create_folder(folder)
+                key_path.write_text(key)
+            return 0, []
+        return scene_wrappers.get_checkpoints(folder)
+
+    def join_checkpoints(self, scene_name, args, checkpoints, media_dir=None):
+        """
+            puts the checkpoint videos in front of the video of the resumed render
+        """
+        video_path = self.get_video_path(scene_name, args, media_dir=media_dir)
+        # a resume after the last animation renders no video
+        videos = [*checkpoints, *([video_path] if video_path.exists() else [])]
+        if not videos:
+            return
+        joined_path = video_path.with_name(f".{video_path.stem}.joined{video_path.suffix}")
+        ffmpeg_utils.concatenate(videos, joined_path, verbose=False, profile=self.profile)
+        os.replace(joined_path, video_path)
+
+    def clear_checkpoints(self, scene_name):
+        folder = self.get_checkpoint_dir() / scene_name
+        if folder.exists():
+            shutil.rmtree(folder, ignore_errors=True)
+
+    @staticmethod
+    def has_animation_range(args):
+        """
+            True when 'args' already pick the animations to render (-n)
+        """
+        for arg in ManimRunner.split_args(args):
+            if arg == "--from_animation_number":
+                return True
+            if arg.startswith("-") and not arg.startswith("--") and "n" in arg[1:]:
+                return True
+        return False
+
+    def get_job_memory(self, scheduler, render_name, args, scene_name=None):
+        """
+            memory the scheduler reserves for 'render_name' (a scene or a
+            segment of 'scene_name'), scenes never measured get an even
+            share of the budget
+        """
+        if scheduler.memory_budget is None:
+            return 0
+        estimate = self.estimate_memory(render_name, args, scene_name)
+        if estimate is None:
+            return scheduler.memory_budget // scheduler.workers
+        print(f"[RUNNER INFO] {render_name} needs about {format_bytes(estimate)}")
+        return estimate
+
+    def estimate_memory(self, render_name, args, scene_name=None):
+        """
+            peak memory expected when rendering 'render_name' with 'args',
+            from its last render, the last render of its scene or a dry
+            pass of the scene. None when none of them can tell.
+        """
+        scene_name = scene_name or render_name
+        folder = ManimRunner.get_media_output_folder(args)
+        for name in dict.fromkeys([render_name, scene_name]):
+            peak_rss = self.memory_history.get(self.file_path, name, folder)
+            if peak_rss:
+                return int(peak_rss * MEMORY_MARGIN)
+
+        if not self.probe_memory:
+            return None
+        peak_rss = self.probe_scene_memory(scene_name, args)
+        if not peak_rss:
+            return None
+        return int(peak_rss * DRY_PASS_MARGIN)
+
+    def probe_scene_memory(self, scene_name, args):
+        """
+            peak memory of a dry pass of 'scene_name': construct runs with
+            every animation skipped and only the last frame is saved, in
+            a temporary media folder. None when the pass fails.
+        """
+        args = [
+            arg for arg in ManimRunner.split_args(args) if arg not in PREVIEW_ARGS]
+        popen_kwargs = {"env": dict(os.environ, **self.get_env())}
+        if self.cwd:
+            popen_kwargs["cwd"] = str(self.cwd)
+        print(f"[RUNNER INFO] Measuring the memory of {scene_name} with a dry pass")
+
+        with tempfile.TemporaryDirectory(prefix="godofredo_probe_") as media_dir:
+            command = [
+                "manim", self.file_path, scene_name,
+                "--media_dir", media_dir, *args, "-s",
+            ]
+            result = run_process(scene_name, command, echo=False, **popen_kwargs)
+
+        if not result.succeeded:
+            print(f"[RUNNER WARNING] Dry pass of {scene_name} failed, "
+                  f"its memory is unknown")
+            return None
+        return result.peak_rss
+
+    def record_memory(self, result, args):
+        """
+            keeps the peak memory of a cli render for the next runs, a
+            warm worker reports its peak over every scene it rendered
+        """
+        if result.peak_rss is None or result.startup_time is not None:
+            return
+        self.memory_history.update(
+            self.file_path, result.scene_name,
+            ManimRunner.get_media_output_folder(args), result.peak_rss)
+
+    def add_wrapper(self, name, **kwargs):
+        """
+            wraps every scene with scene_wrappers.WRAPPERS[name],
+            the videos keep their names and folders
+        """
+        self.scene_wrappers.append([name, kwargs])
+
+    def get_scene_wrappers(self):
+        """
+            wrappers of every scene, the ones added with add_wrapper
+            plus the encoding profile
+        """
+        wrappers = list(self.scene_wrappers)
+        if self.profile:
+            wrappers.append(["encode", {"profile": self.profile}])
+        if self.progress:
+            wrappers.append(["progress", {"report_dir": str(self.get_progress_dir())}])
+        if self.checkpoint:
+            wrappers.append(["checkpoint", {"checkpoint_dir": str(self.get_checkpoint_dir())}])
+        return wrappers
+
+    def get_progress_dir(self):
+        return Path(self.output_dir) / "progress"
+
+    def get_cache_args(self, args):
+        """
+            'args' as seen by the render cache, the
+            profile changes the video as the quality does
+        """
+        if not self.profile:
+            return args
+        profile = json.dumps(ffmpeg_utils.get_profile(self.profile), sort_keys=True)
+        return [*args, f"profile:{profile}"]
+
+    def get_segment_methods(self, scene_name):
+        if not self.segments or not self.graph:
+            return []
+        if scene_name not in self.graph.dependencies:
+            return []
+        return self.graph.reader.get_segment_methods(self.file_path, scene_name)
+
+    @staticmethod
+    def get_segment_name(scene_name, index):
+        return f"{scene_name}Part{index:02d}"
+
+    def add_segment_jobs(self, scheduler, scene_name, args, methods, parallel):
+        """
+            one job per segment plus the prologue (what construct does
+            before the first segment) and a last job that stitches them
+        """
+        args = [arg for arg in args if arg not in PREVIEW_ARGS]
+        priority = self.get_scene_priority(scene_name)
+
+        units = []
+        unit_jobs = []
+        for index, method in enumerate([None, *methods]):
+            unit = ManimRunner.get_segment_name(scene_name, index)
+            units.append(unit)
+            self.wrapped_scenes[unit] = (scene_name, [
+                ["segment", {"methods": methods, "index": index}],
+                *self.get_scene_wrappers()
+            ])
+
+            fingerprint = None
+            if self.cache:
+                fingerprint = self.cache.get_segment_fingerprint(
+                    self.file_path, scene_name, method, methods,
+                    self.get_cache_args(args))
+                if self.cache.is_fresh(self.file_path, unit, fingerprint):
+                    print(f"[RUNNER INFO] {unit} is up to date, skipping render")
+                    self.store_video(unit, fingerprint, args)
+                    self.results[unit] = SceneResult(
+                        unit, status="cached",
+                        output_path=self.get_video_path(unit, args))
+                    continue
+                if self.restore_stored_video(unit, fingerprint, args):
+                    self.results[unit] = SceneResult(
+                        unit, status="cached",
+                        output_path=self.get_video_path(unit, args))
+                    continue
+
+            scheduler.add(
+                unit,
+                partial(self.render_segment, unit, args, parallel, fingerprint),
+                priority=priority,
+                memory=self.get_job_memory(scheduler, unit, args, scene_name)
+            )
+            unit_jobs.append(unit)
+
+        scheduler.add(
+            scene_name,
+            partial(self.stitch_segments, scene_name, args, units),
+            dependencies=unit_jobs,
+            priority=priority
+        )
+
+    def render_segment(self, unit, args, use_worker_dir, fingerprint, slot):
+        result = self.render_job(unit, args, use_worker_dir, slot)
+
+        video_path = self.get_video_path(unit, args)
+        if self.cache and fingerprint and video_path.exists():
+            self.cache.update(self.file_path, unit, fingerprint, video_path)
+            self.store_video(unit, fingerprint, args)
+        return result
+
+    def stitch_segments(self, scene_name, args, units, slot):
+        """
+            concatenates the segment videos in order into the video
+            manim would have written for the whole scene
+        """
+        start = time.perf_counter()
+
+        # a segment without animations produces no video
+        videos = [self.get_video_path(unit, args) for unit in units]
+        videos = [video for video in videos if video.exists()]
+        if not videos:
+            raise FileNotFoundError(f"{scene_name} segments produced no video")
+
+        output_path = ffmpeg_utils.concatenate(
+            videos, self.get_video_path(scene_name, args), verbose=False,
+            profile=self.profile)
+
+        result = SceneResult(
+            scene_name, status="stitched",
+            wall_time=time.perf_counter() - start,
+            output_path=output_path)
+        self.results[scene_name] = result
+        return result
+
+    def get_wrapper_module_path(self):
+        """
+            generated module keeps the stem of the scene file so manim
+            writes its videos in the same videos/<file name> folder
+        """
+        path_hash = scene_parser.hash_bytes(
+            str(self.file_path).encode("utf-8"))[:10]
+        return (Path(self.output_dir) / "generated" / path_hash /
+                self.get_file_name())
+
+    def write_wrapper_module(self):
+        lines = [
+            "# generated by ManimRunner, changes are overwritten",
+            "import sys",
+            f"sys.path.insert(0, {str(ROOT_PATH)!r})",
+            "",
+            "from utils import scene_wrappers",
+            "",
+        ]
+        for name, (scene_name, wrappers) in self.wrapped_scenes.items():
+            lines += [
+                f"{name} = scene_wrappers.build_scene(",
+                f"    {str(self.file_path)!r}, {scene_name!r}, {wrappers!r},",
+                f"    name={name!r}, module=__name__,",
+                ")",
+            ]
+
+        path = self.get_wrapper_module_path()
+        ManimRunner.create_folder(path.parent)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+    def get_env(self):
+        """
+            variables added to the environment of the render processes
+        """
+        return {TIMELINE_CACHE_ENV: str(self.timeline_cache)}
+
+    def run_scene(self, scene_name, args, media_dir=None, file_path=None, slot=0):
         """
             scene_name: <str>,
-            args: <list>
+            args: <list>,
+            media_dir: <Path> defaults to self.output_dir
+            file_path: <Path> defaults to self.file_path
+            slot: <int> worker rendering the scene, picks the warm interpreter
         """
-        command = ' '.join([
+        media_dir = media_dir or self.output_dir
+
+        if self.backend == "warm":
+            try:
+                warm_render.get_config(ManimRunner.split_args(args))
+            except ValueError as error:
+                print(f"[RUNNER WARNING] {scene_name} uses the cli backend, {error}")
+            else:
+                return self.run_scene_warm(scene_name, args, media_dir, slot)
+
+        command = [
             "manim",
-            ManimRunner.clean_path(self.file_path),
+            file_path or self.file_path,
             scene_name,
             "--media_dir",
-            ManimRunner.clean_path(self.output_dir),
-            *args
-        ])
+            media_dir,
+            *ManimRunner.split_args(args)
+        ]
+
+        print(f"[RUNNER INFO] Executing {' '.join(str(part) for part in command)}")
+
+        def register(process):
+            if self.low_priority:
+                lower_priority(process)
+            with self._process_lock:
+                self._processes[scene_name] = process
+
+        popen_kwargs = get_low_priority_kwargs() if self.low_priority else {}
+        popen_kwargs["env"] = dict(os.environ, **self.get_env())
+        if self.cwd:
+            popen_kwargs["cwd"] = str(self.cwd)
+        try:
+            # the dashboard replaces manim's output, its tail is still kept
+            result = run_process(
+                scene_name, command, echo=not self.progress,
+                on_start=register, **popen_kwargs)
+        finally:
+            cancelled = self.unregister_process(scene_name)
+
+        result.output_path = self.get_video_path(
+            scene_name, args, media_dir=media_dir)
+        return self.check_result(result, cancelled)
+
+    def run_scene_warm(self, scene_name, args, media_dir, slot):
+        """
+            renders 'scene_name' in the warm interpreter of 'slot',
+            the wrappers are sent as data instead of the generated module
+        """
+        if self._warm_pool is None:
+            self._warm_pool = warm_render.WarmPool(
+                cwd=self.cwd,
+                popen_kwargs=get_low_priority_kwargs() if self.low_priority else {},
+                env=self.get_env(),
+                low_priority=self.low_priority)
+        worker = self._warm_pool.get(slot)
+
+        original_scene, wrappers = self.wrapped_scenes.get(scene_name, (scene_name, []))
+        job = {
+            "file": str(self.file_path),
+            "scene": original_scene,
+            "name": scene_name,
+            "wrappers": wrappers,
+            "args": ManimRunner.split_args(args),
+            "media_dir": str(media_dir),
+        }
+        print(f"[RUNNER INFO] Rendering {scene_name} in warm worker {slot}")
+
+        # registered before the worker is started so a
+        # cancel during its startup stops it as well
+        with self._process_lock:
+            self._processes[scene_name] = worker
+        try:
+            answer = worker.render(job)
+        finally:
+            cancelled = self.unregister_process(scene_name)
+
+        if answer is None:
+            exit_code = worker.exit_code()
+            answer = {
+                "status": "failed",
+                "exit_code": -1 if exit_code is None else exit_code,
+                "stderr_tail": ["warm worker exited while rendering"],
+            }
+
+        result = SceneResult(
+            scene_name,
+            command=[warm_render.__name__, *job["args"]],
+            status=answer["status"],
+            exit_code=answer["exit_code"],
+            wall_time=answer.get("wall_time", 0.0),
+            cpu_time=answer.get("cpu_time"),
+            peak_rss=answer.get("peak_rss"),
+            stderr_tail=answer.get("stderr_tail"),
+            output_path=self.get_video_path(scene_name, args, media_dir=media_dir),
+            # interpreter startup and scene module import, not in wall_time
+            startup_time=(answer.get("startup_time") or 0.0) + (answer.get("load_time") or 0.0),
+        )
+        return self.check_result(result, cancelled)
+
+    def unregister_process(self, scene_name):
+        """
+            forgets the process of 'scene_name', returns True when it was cancelled
+        """
+        with self._process_lock:
+            self._processes.pop(scene_name, None)
+            cancelled = scene_name in self._cancelled
+            self._cancelled.discard(scene_name)
+        return cancelled
+
+    def check_result(self, result, cancelled):
+        self.results[result.scene_name] = result
+
+        if cancelled:
+            result.status = "cancelled"
+            raise RenderCancelled(result)
+        if not result.succeeded:
+            raise RenderError(result)
+        return result
+
+    def cancel(self, scene_name):
+        """
+            stops the running render of 'scene_name' (and of its
+            segments), returns True when something was running
+        """
+        with self._process_lock:
+            names = [
+                name for name in self._processes
+                if name == scene_name or
+                self.wrapped_scenes.get(name, (None,))[0] == scene_name
+            ]
+            for name in names:
+                self._cancelled.add(name)
+                self._processes[name].terminate()
+        if names:
+            print(f"[RUNNER INFO] Cancelled {', '.join(names)}")
+        return bool(names)
+
+    def is_rendering(self, scene_name):
+        with self._process_lock:
+            return any(
+                name == scene_name or
+                self.wrapped_scenes.get(name, (None,))[0] == scene_name
+                for name in self._processes
+            )
+
+    def get_stale_renders(self, fingerprints):
+        """
+            scenes being rendered whose fingerprint changed since their
+            render started, 'fingerprints' is a RenderCache used only to
+            compute fingerprints of the files as they are now
+        """
+        stale = []
+        for scene, args in self.scenes.items():
+            started_with = getattr(self, "_fingerprints", {}).get(scene)
+            if not started_with or not self.is_rendering(scene):
+                continue
+            try:
+                current = fingerprints.get_fingerprint(
+                    self.file_path, scene, self.get_cache_args(args))
+            except Exception:
+                # file being saved, it's checked again on the next poll
+                continue
+            if current != started_with:
+                stale.append(scene)
+        return stale
 
-        print(f"[RUNNER INFO] Executing {command}")
-        os.system(command)
+    def get_watched_files(self):
+        """
+            scene file, local modules it imports (presets, configs...)
+            and every file under its assets folder
+        """
+        files = {Path(self.file_path).resolve()}
+
+        try:
+            graph = SceneGraph(self.file_path, list(self.scenes))
+        except (OSError, SyntaxError):
+            # file being edited, the scene file itself is still watched
+            graph = None
+
+        if graph:
+            files.update(
+                Path(module_file) for module_file, _ in
+                set().union(*graph.dependencies.values())
+            )
+            files.update(graph.module.module_imports.values())
+            files.update(module_file for module_file, _ in graph.module.name_imports.values())
+
+        assets_dir = Path(self.file_path).parent / "assets"
+        if assets_dir.is_dir():
+            files.update(path for path in assets_dir.rglob("*") if path.is_file())
+        return files
+
+    @staticmethod
+    def get_snapshot(files):
+        snapshot = {}
+        for path in files:
+            try:
+                stat = path.stat()
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def watch(self, interval=0.5, workers=None):
+        """
+            renders the scenes and keeps watching the scene file, the
+            presets and configs it uses and its assets folder. After a
+            change only the affected scenes are rendered again (the ones
+            whose fingerprint changed), a running render of a scene that
+            became stale is cancelled. A runner made with from_discovery
+            also renders the scenes added to the file. Stops with Ctrl+C.
+        """
+        if not self.cache:
+            self.cache = RenderCache(Path(self.output_dir) / "render_cache.json")
+        fingerprints = RenderCache(self.cache.cache_path)
+
+        state = {"rerun": False}
+        lock = threading.Lock()
+
+        def render():
+            while True:
+                self.run_scenes(workers=workers)
+                with lock:
+                    if not state["rerun"]:
+                        return
+                    state["rerun"] = False
+
+        def start_render():
+            thread = threading.Thread(target=render, daemon=True)
+            thread.start()
+            return thread
+
+        snapshot = ManimRunner.get_snapshot(self.get_watched_files())
+        render_thread = start_render()
+        print(f"[RUNNER INFO] Watching {len(snapshot)} files, Ctrl+C to stop")
+
+        try:
+            while True:
+                time.sleep(interval)
+                current = ManimRunner.get_snapshot(self.get_watched_files())
+                if current == snapshot:
+                    continue
+
+                changed = [
+                    path for path in set(current) | set(snapshot)
+                    if current.get(path) != snapshot.get(path)
+                ]
+                snapshot = current
+                print(f"[RUNNER INFO] Changed: {', '.join(sorted(p.name for p in changed))}")
+
+                if self.discovery:
+                    self.update_discovered_scenes()
+
+                fingerprints.refresh()
+                for scene in self.get_stale_renders(fingerprints):
+                    self.cancel(scene)
+
+                with lock:
+                    if render_thread.is_alive():
+                        state["rerun"] = True
+                        continue
+                render_thread = start_render()
+
+        except KeyboardInterrupt:
+            print("[RUNNER INFO] Stopping watch mode")
+            for scene in self.scenes:
+                self.cancel(scene)
+            render_thread.join()
 
-    def concatenate_videos(self, run_output=False):
+    def get_master_args(self, args):
+        """
+            'args' with the quality every output can be derived from,
+            the quality of 'args' counts as one more output
+        """
+        if not self.outputs:
+            return args
+
+        wanted = [ManimRunner.parse_variant(variant)[:2] for variant in self.outputs]
+        quality = ManimRunner.get_quality(args, default=None)
+        if quality:
+            wanted.append(QUALITIES[quality][1:])
+
+        height = max(height for height, _ in wanted)
+        fps = max(fps for _, fps in wanted)
+        for quality, (flag, quality_height, quality_fps) in QUALITIES.items():
+            if quality_height >= height and quality_fps >= fps:
+                return ManimRunner.replace_quality(args, [f"-q{flag}"])
+
+        raise ValueError(f"no manim quality covers {height}p{fps}")
+
+    @staticmethod
+    def parse_variant(variant):
+        """
+            '480p15.gif' -> (480, 15, '.gif')
+        """
+        match = VARIANT_PATTERN.match(variant)
+        if not match:
+            raise ValueError(f"output {variant!r} doesn't look like '720p30' or '480p15.gif'")
+        height, fps, ext = match.groups()
+        return int(height), int(fps), (ext or ".mp4").lower()
+
+    def get_variant_path(self, scene_name, variant):
+        height, fps, ext = ManimRunner.parse_variant(variant)
+        return (Path(self.output_dir) / 'videos' /
+                self.get_file_name(with_ext=False) /
+                f"{height}p{fps}" / f"{scene_name}{ext}")
+
+    def derive_variants(self):
+        """
+            transcodes the outputs of every scene that has a video from
+            its master video, variants newer than the master are kept
+        """
+        scheduler = Scheduler(TRANSCODE_WORKERS)
+        for scene in self._scenes_meta:
+            master = self.get_video_path(scene, self.scenes[scene])
+            if not master.exists():
+                continue
+
+            for variant in self.outputs:
+                target = self.get_variant_path(scene, variant)
+                self._variants.setdefault(scene, {})[variant] = target
+                if target == master:
+                    continue
+                if target.exists() and target.stat().st_mtime >= master.stat().st_mtime:
+                    continue
+
+                height, fps, _ = ManimRunner.parse_variant(variant)
+                scheduler.add(
+                    f"{scene} {variant}",
+                    partial(self.transcode_job, master, target, height, fps)
+                )
+
+        jobs = scheduler.run()
+        for name, job in jobs.items():
+            if job.error is None:
+                print(f"[RUNNER INFO] Derived {name} at {job.result}")
+            else:
+                print(f"[RUNNER ERROR] Could not derive {name}: {job.error}")
+                scene, variant = name.split(" ")
+                self._variants[scene].pop(variant, None)
+
+    def transcode_job(self, master, target, height, fps, slot):
+        return ffmpeg_utils.transcode(master, target, height, fps, profile=self.profile)
+
+    def get_queue_path(self):
+        return Path(self.output_dir) / "render_queue.db"
+
+    def submit(self, queue_path=None):
+        """
+            adds the scenes that need a render to the queue at
+            'queue_path' (see render_queue), returns {scene: job}
+
+            a job already done with the same fingerprint is not queued
+            again, so submitting after an interruption resumes the build
+        """
+        if self.segments or self.get_scene_wrappers():
+            print("[RUNNER WARNING] Queued scenes are rendered whole and without wrappers")
+
+        scenes = self.prepare_run()
+        fingerprints = self.cache or RenderCache(Path(self.output_dir) / "render_cache.json")
+
+        queue = RenderQueue(queue_path or self.get_queue_path())
+        jobs = {}
+        try:
+            for scene, args in scenes.items():
+                if scene not in self._fingerprints:
+                    self._fingerprints[scene] = fingerprints.get_fingerprint(
+                        self.file_path, scene, self.get_cache_args(args))
+                jobs[scene] = queue.submit(
+                    self.file_path, scene, ManimRunner.split_args(args),
+                    self.output_dir, cwd=self.cwd,
+                    fingerprint=self._fingerprints[scene],
+                    priority=self.get_scene_priority(scene))
+                print(f"[RUNNER INFO] {scene} is {jobs[scene]['status']} in the queue")
+        finally:
+            queue.close()
+        return jobs
+
+    def run_queue(self, workers=None, queue_path=None):
+        """
+            submits the scenes and starts 'workers' local worker
+            processes that render until the queue is drained, workers
+            started elsewhere (python -m utils.render_queue work) help
+        """
+        queue_path = Path(queue_path or self.get_queue_path())
+        jobs = self.submit(queue_path)
+
+        # the workers render with this environment
+        env = dict(os.environ, **self.get_env())
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(ROOT_PATH), env.get("PYTHONPATH")]))
+        popen_kwargs = get_low_priority_kwargs() if self.low_priority else {}
+
+        processes = [
+            subprocess.Popen(
+                [sys.executable, "-m", "utils.render_queue", "work", str(queue_path)],
+                env=env, **popen_kwargs)
+            for _ in range(workers or self.workers)
+        ]
+        for process in processes:
+            if self.low_priority:
+                lower_priority(process)
+        for process in processes:
+            process.wait()
+
+        return self.collect_queue(jobs, queue_path)
+
+    def collect_queue(self, jobs, queue_path=None):
+        """
+            results of the submitted 'jobs', the scenes rendered
+            by any worker are registered in the cache
+        """
+        queue = RenderQueue(queue_path or self.get_queue_path())
+        try:
+            for scene, job in jobs.items():
+                job = queue.get_job(job["key"])
+                if job["status"] not in ("done", "failed"):
+                    print(f"[RUNNER WARNING] {scene} is still {job['status']} in the queue")
+                    continue
+
+                self.results[scene] = SceneResult(
+                    scene,
+                    status="rendered" if job["status"] == "done" else "failed",
+                    exit_code=job["exit_code"] or 0,
+                    wall_time=job["wall_time"] or 0.0,
+                    cpu_time=job["cpu_time"],
+                    peak_rss=job["peak_rss"],
+                    stderr_tail=json.loads(job["stderr_tail"] or "[]"),
+                    output_path=self.get_video_path(scene, self.scenes[scene]),
+                )
+                if job["status"] == "done":
+                    self.on_scene_rendered(scene, self.scenes[scene])
+        finally:
+            queue.close()
+
+        return self.finish_run()
+
+    def run_progressive(self, draft_args=("-ql",), final_args=None,
+                        workers=None, wait=False, poll_interval=1.0):
+        """
+            renders every scene with 'draft_args' as fast as possible and
+            then the final quality ('final_args' or the args of each scene)
+            in a background thread with a lower cpu priority. A final
+            render is cancelled and queued again when the source of its
+            scene changes while it runs.
+
+            returns a ProgressiveRender, call wait() to block until
+            the final renders are done
+        """
+        final_scenes = {
+            scene: list(final_args) if final_args else list(args)
+            for scene, args in self.scenes.items()
+        }
+        draft_scenes = {
+            scene: ManimRunner.replace_quality(args, draft_args)
+            for scene, args in self.scenes.items()
+        }
+
+        draft = self.copy(draft_scenes)
+        # drafts are thrown away, encoding them well is wasted time
+        draft.profile = "draft"
+        print("[RUNNER INFO] Rendering drafts")
+        draft.run_scenes(workers=workers)
+
+        final = self.copy(final_scenes)
+        final.low_priority = True
+        progressive = ProgressiveRender(draft, final, workers, poll_interval)
+        progressive.start()
+
+        if wait:
+            progressive.wait()
+        return progressive
+
+    def copy(self, scenes):
+        """
+            runner with the same file, output folder, options and
+            cache as this one but other scenes
+        """
+        runner = ManimRunner(
+            scenes, self.file_path, output_dir=self.output_dir,
+            workers=self.workers, use_cache=False, segments=self.segments
+        )
+        runner.cache = self.cache
+        runner.scene_wrappers = list(self.scene_wrappers)
+        runner.cwd = self.cwd
+        runner.backend = self.backend
+        runner.profile = self.profile
+        runner.memory_budget = self.memory_budget
+        runner.memory_history = self.memory_history
+        runner.probe_memory = self.probe_memory
+        runner.store = self.store
+        runner.store_max_size = self.store_max_size
+        runner.progress = self.progress
+        runner.checkpoint = self.checkpoint
+        runner.retries = self.retries
+        return runner
+
+    def close(self):
+        """
+            stops the warm interpreters, they are kept between
+            run_scenes calls so watch mode renders stay warm
+        """
+        if self._warm_pool:
+            self._warm_pool.close()
+            self._warm_pool = None
+
+    def get_report(self):
+        """
+            table with exit code, wall time, cpu time and peak
+            memory of every scene of the last run_scenes call
+        """
+        return format_report(list(getattr(self, 'results', {}).values()))
+
+    def save_report(self, path):
+        with open(path, 'w') as f:
+            json.dump(
+                [result.to_dict() for result in self.results.values()],
+                f, indent=2
+            )
+
+    def concatenate_videos(self, run_output=False, output_path=None, variant=None,
+                           transitions=None):
+        """
+            output_path: <str or Path> defaults to
+                output_dir/videos/<file name>/<file name>.mp4
+            variant: <str> one of the outputs, such as '720p30.webm',
+                concatenates those instead of the rendered videos
+            transitions: 'crossfade:0.5', ('fadeblack', 1) or 'cut' (see
+                ffmpeg_utils.parse_transition) for every boundary, a list
+                with one per boundary or {'scene name': transition} for
+                the boundary after that scene, the rest are cuts.
+                ffmpeg draws them, manim doesn't render their frames
+
+            segments that don't share the format of the others
+            (another quality for example) are re-encoded, the
+            rest is stream copied
+        """
         if len(self.scenes) <= 1:
             print("[INFO] Requires 2 or more videos to concatenate.")
             return
-        temp_name = 'temp.txt'
-        output_name = 'out.mp4'
 
-        videos_dict = {}
         manim_file_name = self.get_file_name(with_ext=False)
-        for scene in self.scenes:
-            videos_dict.setdefault(
-                scene.lower(),
-                self.get_video_name(scene)
-            )
+        videos_path = Path(self.output_dir) / 'videos' / manim_file_name
 
-        videos_path = self.output_dir / 'videos' / manim_file_name
+        if output_path is None:
+            if variant:
+                height, fps, ext = ManimRunner.parse_variant(variant)
+                output_path = videos_path / f"{manim_file_name}_{height}p{fps}{ext}"
+            else:
+                output_path = videos_path / f"{manim_file_name}.mp4"
 
-        with open(temp_name, 'w') as f:
-            for scene_name, video_name in videos_dict.items():
-                full_path = videos_path / video_name
-                line = f'file \'{full_path}\'\n'
-                f.write(line)
+        videos = []
+        scenes = []
+        for scene in self.scenes:
+            if scene not in self._scenes_meta:
+                print(f"[RUNNER WARNING] {scene} has no video, it won't be concatenated")
+                continue
+            if variant and variant not in self._variants.get(scene, {}):
+                print(f"[RUNNER WARNING] {scene} has no {variant}, it won't be concatenated")
+                continue
+            videos.append(videos_path / self.get_video_name(scene, variant=variant))
+            scenes.append(scene)
 
-        ffmpeg_command = f'echo y | ( ffmpeg -f concat -safe 0 -i {temp_name} -c copy {output_name} )'
-        os.system(ffmpeg_command)
+        if not videos:
+            print("[RUNNER WARNING] There are no videos to concatenate")
+            return
 
-        os.remove(temp_name)
+        output_path = ffmpeg_utils.concatenate(
+            videos, output_path, profile=self.profile,
+            transitions=ManimRunner.get_transitions(transitions, scenes))
+        print(f"[RUNNER INFO] Concatenated video saved at {output_path}")
 
         if run_output:
-            os.system(f'start {output_name}')
+            ffmpeg_utils.open_file(output_path)
+
+        return output_path
+
+    @staticmethod
+    def get_transitions(transitions, scenes):
+        """
+            one transition per boundary between 'scenes', see concatenate_videos
+        """
+        boundaries = max(0, len(scenes) - 1)
+        if transitions is None:
+            return None
+        if isinstance(transitions, dict):
+            return [transitions.get(scene, "cut") for scene in scenes[:-1]]
+        if isinstance(transitions, list):
+            if len(transitions) != boundaries:
+                raise ValueError(
+                    f"{len(scenes)} videos have {boundaries} transitions, "
+                    f"not {len(transitions)}")
+            return transitions
+        return [transitions] * boundaries
+
+    def get_worker_dir(self, slot):
+        return ManimRunner.create_folder(
+            Path(self.output_dir) / "workers" / f"worker_{slot}"
+        )
+
+    def collect_worker_video(self, scene_name, args, media_dir):
+        """
+            move the video rendered by a worker into the
+            shared videos folder used by concatenate_videos
+        """
+        source = self.get_video_path(scene_name, args, media_dir=media_dir)
+        if not source.exists():
+            raise FileNotFoundError(
+                f"{scene_name} did not produce {source}")
+
+        target = self.get_video_path(scene_name, args)
+        ManimRunner.create_folder(target.parent)
+        os.replace(source, target)
 
-    def get_video_name(self, scene_name, ext=".mp4"):
+        if scene_name in self.results:
+            self.results[scene_name].output_path = target
+
+        return target
+
+    def get_video_path(self, scene_name, args, media_dir=None, ext=".mp4"):
+        """
+            full path of the video manim writes for 'scene_name'
+        """
+        media_dir = media_dir or self.output_dir
+        return (Path(media_dir) / 'videos' /
+                self.get_file_name(with_ext=False) /
+                ManimRunner.get_media_output_folder(args) /
+                f"{scene_name}{ext}")
+
+    def get_video_name(self, scene_name, ext=".mp4", variant=None):
+        """
+            path relative to the videos folder of the file, of the
+            rendered video or of one of its derived 'variant'
+        """
         assert scene_name in self._scenes_meta
+        if variant:
+            height, fps, ext = ManimRunner.parse_variant(variant)
+            return Path(f"{height}p{fps}") / f"{scene_name}{ext}"
         folder_name = self._scenes_meta[scene_name]
         return Path(folder_name) / f"{scene_name}{ext}"
 
@@ -114,6 +1562,41 @@ class ManimRunner(object):
         """
         return f'"{path}"'
 
+    @staticmethod
+    def replace_quality(args, quality_args):
+        """
+            ['-qh', '-p'], ['-ql'] -> ['-p', '-ql']
+            ['-pqh'], ['-ql'] -> ['-p', '-ql']
+        """
+        args = ManimRunner.split_args(args)
+        kept = []
+        skip_next = False
+        for arg in args:
+            if skip_next:
+                skip_next = False
+                continue
+            if arg in ("-q", "--quality"):
+                skip_next = True
+                continue
+            if arg in QUALITY_ARGS:
+                continue
+            if (arg.startswith("-") and not arg.startswith("--") and
+                    ManimRunner.get_quality([arg], default=None)):
+                # '-pql' -> '-p'
+                index = arg.index("q")
+                arg = arg[:index] + arg[index + 2:]
+                if arg == "-":
+                    continue
+            kept.append(arg)
+        return kept + list(quality_args)
+
+    @staticmethod
+    def split_args(args):
+        """
+            ['-qh', '--quality h'] -> ['-qh', '--quality', 'h']
+        """
+        return [part for arg in args for part in shlex.split(arg)]
+
     @staticmethod
     def create_folder(path):
         assert isinstance(path, Path)
@@ -134,23 +1617,99 @@ class ManimRunner(object):
             return Path(Path.cwd() / "/".join(path))
         return Path(path)
 
+    @staticmethod
+    def get_quality(args, default=DEFAULT_QUALITY):
+        """
+            manim quality selected by 'args' ('-ql', '-pql', '--quality l',
+            '--low_quality'...), 'default' when they don't select one
+        """
+        flags = {flag: quality for quality, (flag, _, _) in QUALITIES.items()}
+        args = ManimRunner.split_args(args)
+        quality = default
+        for n, arg in enumerate(args):
+            if arg in ("-q", "--quality") and n + 1 < len(args):
+                quality = flags.get(args[n + 1], quality)
+            elif arg.startswith("--") and arg[2:] in QUALITIES:
+                quality = arg[2:]
+            elif arg.startswith("-") and not arg.startswith("--") and "q" in arg:
+                # combined short flags, '-pql'
+                letters = arg[1:]
+                index = letters.index("q")
+                quality = flags.get(letters[index + 1:index + 2], quality)
+        return quality
+
     @staticmethod
     def get_media_output_folder(args):
         """
             associate 'ql', 'qh'  with folder names
             such as 480p15 or 1080p30
         """
-        str_args = ' '.join(args)
-        if any([arg in str_args for arg in ["-ql", "--low_quality", "--quality l"]]):
-            return "480p15"
-        elif any([arg in str_args for arg in ["-qm", "--medium_quality", "--quality m"]]):
-            return "720p30"
+        _, height, fps = QUALITIES[ManimRunner.get_quality(args)]
+        return f"{height}p{fps}"
+
+
+class ProgressiveRender(object):
+    """
+        final renders of ManimRunner.run_progressive running in the
+        background, a monitor thread compares the fingerprint of the
+        scenes being rendered with the one they started with
+    """
+
+    def __init__(self, draft_runner, final_runner, workers=None, poll_interval=1.0):
+        self.draft_runner = draft_runner
+        self.final_runner = final_runner
+        self.workers = workers
+        self.poll_interval = poll_interval
+
+        # scene name: SceneResult of its last final render
+        self.results = {}
+        self._done = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._render, daemon=True)
+        self._monitor = threading.Thread(target=self._watch_sources, daemon=True)
+
+    @property
+    def draft_results(self):
+        return self.draft_runner.results
+
+    def start(self):
+        self._thread.start()
+        if self.final_runner.cache:
+            self._monitor.start()
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return self.results
+
+    def cancel(self):
+        self._stopped = True
+        for scene in self.final_runner.scenes:
+            self.final_runner.cancel(scene)
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def _render(self):
+        try:
+            while not self._stopped:
+                print("[RUNNER INFO] Rendering final versions in background")
+                results = self.final_runner.run_scenes(workers=self.workers)
+                self.results.update(results)
 
-        elif any([arg in str_args for arg in ["-qh", "--high_quality", "--quality h"]]):
-            return "1080p60"
+                cancelled = [r for r in results.values() if r.status == "cancelled"]
+                if not cancelled:
+                    break
+        finally:
+            self._done.set()
 
-        elif any([arg in str_args for arg in ["-qk", "--fourk_quality", "--quality k"]]):
-            return "2160p60"
+    def _watch_sources(self):
+        # a cache of its own so the fingerprints are read from
+        # the files as they are now, it's never saved
+        fingerprints = RenderCache(self.final_runner.cache.cache_path)
+        runner = self.final_runner
 
-        elif any([arg in str_args for arg in ["-qp", "--production_quality", "--quality p"]]):
-            return "1440p60"
+        while not self._done.wait(self.poll_interval):
+            fingerprints.refresh()
+            for scene in runner.get_stale_renders(fingerprints):
+                print(f"[RUNNER INFO] {scene} changed, restarting its final render")
+                runner.cancel(scene)
@@ -0,0 +1,350 @@
+"""
+    Renders scenes inside long lived interpreters.
+
+    Every 'manim' command imports manim, numpy, cairo, pango and the
+    scene module again before rendering a single frame, on short scenes
+    that startup takes a good part of the time. A warm worker imports
+    them once and renders many scenes, one per request:
+
+        python -m utils.warm_render
+
+    reads one json job per line on stdin:
+
+        {"file": "/abs/ft_form/main.py", "scene": "Conclusions",
+         "name": "ConclusionsPart03", "wrappers": [...],
+         "args": ["-ql"], "media_dir": "/abs/media"}
+
+    and answers one json line per job on its stdout, manim's own output
+    goes to stderr. WarmPool keeps a few of these processes for the runner.
+"""
+import os
+import sys
+import json
+import time
+import traceback
+import subprocess
+
+from pathlib import Path
+
+from utils.render_process import lower_priority
+
+
+# folder that contains the utils package
+ROOT_PATH = Path(__file__).resolve().parent.parent
+
+QUALITY_FLAGS = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+LONG_QUALITY_ARGS = {
+    f"--{quality}": quality for quality in QUALITY_FLAGS.values()
+}
+
+# cli flag: manim config option set to True
+BOOLEAN_ARGS = {
+    "-p": "preview", "--preview": "preview",
+    "-f": "show_in_file_browser", "--show_in_file_browser": "show_in_file_browser",
+    "-s": "save_last_frame", "--save_last_frame": "save_last_frame",
+    "--disable_caching": "disable_caching",
+    "--flush_cache": "flush_cache",
+}
+
+
+def get_config(args):
+    """
+        manim config options equivalent to the cli 'args', combined
+        short flags such as '-pql' are accepted
+
+        raises ValueError with args the warm renderer doesn't know,
+        those scenes must be rendered with the cli
+    """
+    config = {}
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+
+        if arg in LONG_QUALITY_ARGS:
+            config["quality"] = LONG_QUALITY_ARGS[arg]
+        elif arg in BOOLEAN_ARGS:
+            config[BOOLEAN_ARGS[arg]] = True
+        elif arg.startswith("-") and not arg.startswith("--"):
+            letters = list(arg[1:])
+            while letters:
+                letter = letters.pop(0)
+                if letter == "q" and letters and letters[0] in QUALITY_FLAGS:
+                    config["quality"] = QUALITY_FLAGS[letters.pop(0)]
+                elif letter == "n":
+                    # '-n 3', '-n3' or '-n 3,7'
+                    value = "".join(letters) or (args.pop(0) if args else "")
+                    letters = []
+                    numbers = [int(number) for number in value.split(",") if number]
+                    if not numbers:
+                        raise ValueError(f"missing animation number in {arg}")
+                    config["from_animation_number"] = numbers[0]
+                    if len(numbers) > 1:
+                        config["upto_animation_number"] = numbers[1]
+                elif f"-{letter}" in BOOLEAN_ARGS:
+                    config[BOOLEAN_ARGS[f"-{letter}"]] = True
+                else:
+                    raise ValueError(f"unsupported arg -{letter} in {arg}")
+        else:
+            raise ValueError(f"unsupported arg {arg}")
+
+    return config
+
+
+def get_local_modules(search_dirs):
+    """
+        {module name: (file, mtime)} of the imported modules that live in
+        'search_dirs', these are imported again when they change
+    """
+    search_dirs = [Path(folder).resolve() for folder in search_dirs]
+    modules = {}
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file or name in ("__main__", "utils", __name__, "utils.scene_wrappers"):
+            continue
+        module_file = Path(module_file).resolve()
+        if "site-packages" in module_file.parts:
+            continue
+        if any(folder in module_file.parents for folder in search_dirs):
+            try:
+                modules[name] = (module_file, module_file.stat().st_mtime_ns)
+            except OSError:
+                modules[name] = (module_file, None)
+    return modules
+
+
+class Worker(object):
+    """
+        side of the protocol that runs inside the warm interpreter
+    """
+
+    def __init__(self, output):
+        self.output = output
+        # {module name: (file, mtime)} when the last scene file was loaded
+        self.loaded = {}
+        self.search_dirs = set()
+
+    def send(self, message):
+        self.output.write(json.dumps(message) + "\n")
+        self.output.flush()
+
+    def forget_changed_modules(self):
+        """
+            drops every local module (scene files, presets, configs)
+            when any of them changed, manim itself stays imported
+        """
+        from utils import scene_wrappers
+
+        current = get_local_modules(self.search_dirs)
+        changed = [
+            name for name, (module_file, mtime) in self.loaded.items()
+            if not module_file.exists() or module_file.stat().st_mtime_ns != mtime
+        ]
+        if not changed:
+            return
+
+        for name in current:
+            sys.modules.pop(name, None)
+        scene_wrappers._modules.clear()
+        self.loaded = {}
+
+    def render(self, job):
+        from manim import tempconfig
+        from utils import scene_wrappers
+
+        file_path = Path(job["file"]).resolve()
+        self.search_dirs |= {file_path.parent, file_path.parent.parent}
+        self.forget_changed_modules()
+
+        config = get_config(job.get("args", []))
+        config["media_dir"] = str(job["media_dir"])
+        # the videos folder is named after the input file, as with the cli
+        config["input_file"] = str(file_path)
+
+        load_start = time.perf_counter()
+        scene_wrappers.load_scene_module(file_path)
+        load_time = time.perf_counter() - load_start
+        self.loaded = get_local_modules(self.search_dirs)
+
+        with tempconfig(config):
+            scene_class = scene_wrappers.build_scene(
+                file_path, job["scene"], job.get("wrappers", []),
+                name=job.get("name") or job["scene"])
+            scene = scene_class()
+            scene.render()
+
+        file_writer = getattr(scene.renderer, "file_writer", None)
+        output_path = getattr(file_writer, "movie_file_path", None)
+        return load_time, output_path
+
+    def run(self, lines):
+        for line in lines:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            message = {"scene": job.get("name") or job["scene"]}
+            try:
+                load_time, output_path = self.render(job)
+                message.update(
+                    status="rendered", exit_code=0,
+                    load_time=load_time,
+                    output_path=str(output_path) if output_path else None)
+            except Exception:
+                traceback.print_exc()
+                message.update(
+                    status="failed", exit_code=1, load_time=None,
+                    stderr_tail=traceback.format_exc().splitlines()[-20:])
+
+            # importing the scene module is reported as startup
+            message["wall_time"] = time.perf_counter() - start - (message["load_time"] or 0.0)
+            message["cpu_time"] = time.process_time() - cpu_start
+            message["peak_rss"] = get_peak_rss()
+            self.send(message)
+
+
+def get_peak_rss():
+    """
+        peak memory of the whole worker so far, not of a single scene
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def main():
+    # json answers go through the original stdout, anything
+    # printed by manim or the scenes ends up in stderr
+    output = os.fdopen(os.dup(sys.stdout.fileno()), 'w')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    start = time.perf_counter()
+    import manim  # noqa: F401, the point of the worker is importing it once
+    worker = Worker(output)
+    worker.send({"event": "ready", "import_time": time.perf_counter() - start})
+    worker.run(sys.stdin)
+
+
+class WarmWorker(object):
+    """
+        a warm interpreter seen from the runner, it's started on
+        the first job and again after it was killed
+    """
+
+    def __init__(self, cwd=None, popen_kwargs=None, env=None, low_priority=False):
+        self.cwd = cwd
+        self.popen_kwargs = popen_kwargs or {}
+        # variables added to the environment of the interpreter
+        self.env = env or {}
+        self.low_priority = low_priority
+        self.process = None
+        # seconds until the worker was ready, interpreter and manim imports
+        self.startup_time = None
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        env = dict(os.environ, **self.env)
+        env["PYTHONPATH"] = os.pathsep.join(
+            filter(None, [str(ROOT_PATH), env.get("PYTHONPATH")]))
+
+        start = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "utils.warm_render"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            cwd=str(self.cwd) if self.cwd else None,
+            env=env,
+            **self.popen_kwargs
+        )
+        if self.low_priority:
+            lower_priority(self.process)
+        ready = self.process.stdout.readline()
+        if not ready:
+            code = self.process.wait()
+            raise RuntimeError(f"warm worker exited with code {code} while starting")
+        self.startup_time = time.perf_counter() - start
+        return self.startup_time
+
+    def render(self, job):
+        """
+            returns the answer of the worker, None when the
+            worker died (it was cancelled or crashed)
+        """
+        started = None
+        if not self.is_alive():
+            started = self.start()
+
+        try:
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (BrokenPipeError, OSError):
+            line = ""
+
+        if not line:
+            self.process.wait()
+            return None
+
+        answer = json.loads(line)
+        # only the job that had to start the worker pays its startup
+        answer["startup_time"] = started
+        return answer
+
+    def terminate(self):
+        if self.is_alive():
+            self.process.terminate()
+
+    def exit_code(self):
+        return self.process.poll() if self.process else None
+
+    def close(self):
+        if not self.is_alive():
+            return
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class WarmPool(object):
+    """
+        one warm worker per scheduler slot
+    """
+
+    def __init__(self, cwd=None, popen_kwargs=None, env=None, low_priority=False):
+        self.cwd = cwd
+        self.popen_kwargs = popen_kwargs
+        self.env = env
+        self.low_priority = low_priority
+        self.workers = {}
+
+    def get(self, slot):
+        if slot not in self.workers:
+            self.workers[slot] = WarmWorker(
+                self.cwd, self.popen_kwargs, self.env, self.low_priority)
+        return self.workers[slot]
+
+    def close(self):
+        for worker in self.workers.values():
+            worker.close()
+        self.workers = {}
+
+
+if __name__ == "__main__":
+    main()